@@ -1,15 +1,22 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from sqlmodel import SQLModel
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .errors import register_all_errors
-from .middleware import register_middleware
+from .middleware import register_middleware, start_access_log, stop_access_log
 from .auth.routes import auth_router
 from .user.routes import user_router
 from .product.routes import product_router
 from .category.routes import category_router
 from .company.routes import company_router
 from .store.routes import store_router
-from .db import engine
+from .migrations import check_schema, migrate_db
+from .cache import catalog_cache
+from .metrics import registry
+from .config import Config
+from .query_audit import query_auditor
+from .outbox import outbox_worker
+from .auth.revocation import get_revocation_store
 
 version = "v1"
 
@@ -23,8 +30,26 @@ This REST API is able to;
     """
 
 version_prefix =f"/api/{version}"
-SQLModel.metadata.create_all(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_access_log()
+    if Config.DB_MIGRATE_ON_STARTUP:
+        await migrate_db()
+    else:
+        await check_schema()
+    # Se crea al arrancar para que la advertencia del backend en memoria salga en el log
+    get_revocation_store()
+    if Config.OUTBOX_ENABLED:
+        outbox_worker.start()
+    yield
+    await outbox_worker.stop()
+    stop_access_log()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="MiPrecio",
     description=description,
     version=version,
@@ -45,6 +70,22 @@ async def read_root():
     return {"message": "Bv"}
 
 
+@app.get("/cache/stats", tags=["root"], include_in_schema=False, response_model=dict)
+async def read_cache_stats():
+    return catalog_cache.stats()
+
+
+@app.get("/metrics", tags=["root"], include_in_schema=False, response_class=PlainTextResponse)
+async def read_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+if Config.QUERY_AUDIT_ENABLED:
+    @app.get("/debug/queries", tags=["root"], include_in_schema=False, response_model=list[dict])
+    async def read_query_report(limit: int = 20):
+        return query_auditor.report(limit)
+
+
 register_all_errors(app)
 
 register_middleware(app)
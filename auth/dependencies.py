@@ -7,12 +7,15 @@ from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .service import AuthService
-from ..user.model import User
+from .ratelimit import get_rate_limit_backend, parse_limit
+from .schemas import Principal
+from ..cache import principal_cache
 
+from ..config import Config
 from ..db import get_session
 
 from ..user.service import UserService
-from .utils import decode_token
+from .utils import decode_token_cached
 from ..errors import (
     InvalidToken,
     RefreshTokenRequired,
@@ -20,6 +23,7 @@ from ..errors import (
     InsufficientPermission,
     AccountNotVerified,
     RevokedToken,
+    RateLimitExceeded,
 )
 
 user_service = UserService()
@@ -29,7 +33,7 @@ class TokenBearer(HTTPBearer):
     def __init__(self, auto_error=True):
         super().__init__(auto_error=auto_error)
 
-    async def __call__(self, request: Request, session: AsyncSession = Depends(get_session)) -> HTTPAuthorizationCredentials | None:
+    async def __call__(self, request: Request) -> HTTPAuthorizationCredentials | None:
         creds = await super().__call__(request)
 
         token = creds.credentials
@@ -39,23 +43,19 @@ class TokenBearer(HTTPBearer):
             print(cookie)
         else: print("no hay cookie bv") """
 
-        token_data = decode_token(token)
+        token_data = decode_token_cached(token)
 
-        if not self.token_valid(token):
+        if token_data is None:
             raise InvalidToken()
 
-        if await auth_service.get_token(token_data["token"], session=session):
+        if await auth_service.is_token_revoked(token_data["token"]):
            raise RevokedToken()
 
         self.verify_token_data(token_data)
 
+        request.state.token_data = token_data
         return token_data
 
-    def token_valid(self, token: str) -> bool:
-        token_data = decode_token(token)
-
-        return token_data is not None
-
     def verify_token_data(self, token_data):
         raise NotImplementedError("Please Override this method in child classes")
 
@@ -72,12 +72,34 @@ class RefreshTokenBearer(TokenBearer):
             raise RefreshTokenRequired()
 
 
+access_token_bearer = AccessTokenBearer()
+
+
+async def get_current_principal(
+    token_details: dict = Depends(access_token_bearer),
+    session: AsyncSession = Depends(get_session),
+) -> Principal:
+    """Identidad minima del usuario autenticado (uid, rol, verificado), cacheada
+    por poco tiempo e invalidada cuando el usuario cambia."""
+    key = ("principal", token_details["user"]["user_uid"])
+    found, principal = principal_cache.get(key)
+    if found:
+        return principal
+
+    user = await user_service.get_user_by_email(token_details["user"]["email"], session, profile="principal")
+    if user is None:
+        raise InvalidToken()
+
+    principal = Principal(uid=user.uid, email=user.email, role=user.role, is_verified=user.is_verified)
+    principal_cache.set(key, principal)
+    return principal
+
+
 async def get_current_user(
-    token_details: dict = Depends(AccessTokenBearer()),
+    principal: Principal = Depends(get_current_principal),
     session: AsyncSession = Depends(get_session),
 ):
-    user_email = token_details["user"]["email"]
-    user = await user_service.get_user_by_email(user_email, session)
+    user = await user_service.get_user_by_id(principal.uid, session)
 
     return user
 
@@ -86,10 +108,47 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: User = Depends(get_current_user)) -> Any:
+    def __call__(self, current_user: Principal = Depends(get_current_principal)) -> Any:
         if not current_user.is_verified:
             raise AccountNotVerified()
         if current_user.role in self.allowed_roles:
             return True
 
         raise InsufficientPermission()
+
+
+class RateLimit:
+    """Limita una ruta por IP y, opcionalmente, por el campo ``email`` del cuerpo JSON.
+
+    Los limites se escriben como "5/minute": la rafaga permitida es 5 y se recupera
+    un token cada 12 segundos.
+    """
+
+    def __init__(self, scope: str, per_ip: str, per_email: str | None = None) -> None:
+        self.scope = scope
+        self.per_ip = parse_limit(per_ip)
+        self.per_email = parse_limit(per_email) if per_email else None
+
+    async def __call__(self, request: Request) -> None:
+        if not Config.RATE_LIMIT_ENABLED:
+            return
+        backend = get_rate_limit_backend()
+        client = request.client.host if request.client else "unknown"
+        wait = await backend.acquire(f"{self.scope}:ip:{client}", *self.per_ip)
+        # Si la IP ya esta bloqueada no se gasta el bucket de la cuenta
+        if not wait and self.per_email:
+            email = await self._email(request)
+            if email:
+                wait = await backend.acquire(f"{self.scope}:email:{email}", *self.per_email)
+        if wait:
+            raise RateLimitExceeded(wait)
+
+    @staticmethod
+    async def _email(request: Request) -> str | None:
+        # Starlette guarda el cuerpo leido, la ruta lo vuelve a usar sin costo
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        email = body.get("email") if isinstance(body, dict) else None
+        return email.strip().lower()[:254] if isinstance(email, str) else None
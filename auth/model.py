@@ -1,11 +1,13 @@
 from datetime import datetime
 import uuid
 
-from sqlmodel import TEXT, Field, SQLModel
+from sqlmodel import TEXT, Field, Index, SQLModel
 
 
 class TokenBlacklist(SQLModel, table=True):
+    """JTI revocados por el backend ``database`` de auth/revocation.py."""
     __tablename__ = "blacklist"
+    __table_args__ = (Index("ix_blacklist_token", "token"),)
     uid: uuid.UUID = Field(uuid.uuid4, nullable=False, primary_key=True)
     token: str = Field(TEXT, nullable=False)
     created_at: datetime = Field(nullable=True)
@@ -13,4 +15,4 @@ class TokenBlacklist(SQLModel, table=True):
     expiracy: datetime = Field(nullable=True)
 
     def __repr__(self):
-        return f"<Token: {self.token}>"
\ No newline at end of file
+        return f"<Token: {self.token}>"
@@ -0,0 +1,96 @@
+import time
+from abc import ABC, abstractmethod
+
+from ..config import Config
+from ..utils.expiring import ExpiringDict
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(limit: str) -> tuple[float, int]:
+    """Convierte "5/minute" en (tokens por segundo, capacidad del bucket)."""
+    count, period = limit.split("/", 1)
+    capacity = int(count)
+    return capacity / PERIODS[period.strip()], capacity
+
+
+class RateLimitBackend(ABC):
+    """Token buckets por llave. Cada bucket se rellena al consultarlo, no con un temporizador."""
+
+    @abstractmethod
+    async def acquire(self, key: str, rate: float, capacity: int) -> float:
+        """Consume un token. Devuelve 0 si habia, o los segundos hasta el siguiente."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Buckets en un dict del proceso: cada worker limita por separado, asi que el
+    limite efectivo se multiplica por el numero de procesos.
+
+    Cada llave guarda (tokens, ultima actualizacion) y vence cuando el bucket vuelve
+    a estar lleno, porque un bucket lleno equivale a uno inexistente.
+    """
+
+    def __init__(self) -> None:
+        self._buckets = ExpiringDict(time.monotonic)
+
+    async def acquire(self, key: str, rate: float, capacity: int) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key, now)
+        tokens = capacity if bucket is None else min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets.set(key, (tokens, now), now + (capacity - tokens) / rate, now)
+        return wait
+
+
+# El reloj es el de Redis para que todas las instancias compartan la misma hora
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Guarda cada bucket como un hash; el script de Lua lo lee y actualiza de forma atomica."""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:") -> None:
+        from redis import asyncio as aioredis
+
+        self._redis = aioredis.from_url(url)
+        self._script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self._prefix = prefix
+
+    async def acquire(self, key: str, rate: float, capacity: int) -> float:
+        wait = await self._script(keys=[self._prefix + key], args=[rate, capacity])
+        return float(wait)
+
+
+_backend: RateLimitBackend | None = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global _backend
+    if _backend is None:
+        if Config.RATE_LIMIT_BACKEND == "redis":
+            _backend = RedisRateLimitBackend(Config.REDIS_URL)
+        else:
+            _backend = MemoryRateLimitBackend()
+    return _backend
@@ -0,0 +1,109 @@
+import logging
+import math
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlmodel import select
+
+from ..config import Config
+from ..db import async_session
+from .model import TokenBlacklist
+from ..utils.expiring import ExpiringDict
+
+logger = logging.getLogger("miprecio.auth")
+
+
+class RevocationStore(ABC):
+    """Almacen de JTI revocados. Cada entrada vive hasta que el token expira."""
+
+    @abstractmethod
+    async def revoke(self, jti: str, expires_at: float) -> None: ...
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool: ...
+
+
+class MemoryRevocationStore(RevocationStore):
+    """JTI revocados en un dict del proceso, hasta el ``exp`` de cada token. Se pierden
+    al reiniciar y otros workers no los ven: solo sirve con un unico proceso."""
+
+    def __init__(self) -> None:
+        # El exp del token es un timestamp Unix, por eso el reloj es time.time
+        self._revoked = ExpiringDict(time.time)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self._revoked.set(jti, True, expires_at)
+
+    async def is_revoked(self, jti: str) -> bool:
+        return self._revoked.get(jti) is not None
+
+
+class DatabaseRevocationStore(RevocationStore):
+    """Guarda los JTI en la tabla ``blacklist``: persiste entre reinicios y la comparten
+    todos los procesos, a costa de una consulta por peticion autenticada."""
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        now = datetime.now()
+        async with async_session() as session:
+            session.add(TokenBlacklist(uid=uuid.uuid4(), token=jti, created_at=now, expiracy=datetime.fromtimestamp(expires_at)))
+            # Los logouts son poco frecuentes: se aprovechan para borrar los tokens ya vencidos
+            await session.exec(delete(TokenBlacklist).where(TokenBlacklist.expiracy <= now))
+            await session.commit()
+
+    async def is_revoked(self, jti: str) -> bool:
+        async with async_session() as session:
+            result = await session.exec(
+                select(TokenBlacklist.uid)
+                .where(TokenBlacklist.token == jti)
+                .where(TokenBlacklist.expiracy > datetime.now())
+                .limit(1)
+            )
+            return result.first() is not None
+
+
+class RedisRevocationStore(RevocationStore):
+    """Guarda cada JTI como una llave con TTL igual al tiempo de vida restante del token."""
+
+    def __init__(self, url: str, prefix: str = "revoked:") -> None:
+        from redis import asyncio as aioredis
+
+        self._redis = aioredis.from_url(url)
+        self._prefix = prefix
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        ttl = max(1, math.ceil(expires_at - time.time()))
+        await self._redis.set(self._prefix + jti, 1, ex=ttl)
+
+    async def is_revoked(self, jti: str) -> bool:
+        return await self._redis.exists(self._prefix + jti) > 0
+
+
+_store: RevocationStore | None = None
+
+
+def revocation_backend() -> str:
+    """``auto`` usa Redis si REDIS_URL esta configurado y si no la base de datos."""
+    backend = Config.TOKEN_REVOCATION_BACKEND
+    if backend == "auto":
+        return "redis" if "REDIS_URL" in Config.model_fields_set else "database"
+    return backend
+
+
+def get_revocation_store() -> RevocationStore:
+    global _store
+    if _store is None:
+        backend = revocation_backend()
+        if backend == "redis":
+            _store = RedisRevocationStore(Config.REDIS_URL)
+        elif backend == "memory":
+            logger.warning(
+                "TOKEN_REVOCATION_BACKEND=memory: los logouts se pierden al reiniciar y no se "
+                "comparten entre procesos; usa redis o database con mas de un worker"
+            )
+            _store = MemoryRevocationStore()
+        else:
+            _store = DatabaseRevocationStore()
+    return _store
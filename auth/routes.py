@@ -5,7 +5,7 @@ from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..mail import send_email_async, send_email
+from ..outbox import enqueue_email
 
 from ..product.schemas import UserProductsModel
 from ..user.schemas import UserCreateModel
@@ -16,6 +16,7 @@ from .dependencies import (
     AccessTokenBearer,
     RefreshTokenBearer,
     RoleChecker,
+    RateLimit,
     get_current_user,
 )
 from .schemas import (
@@ -28,8 +29,9 @@ from ..user.service import UserService
 from ..auth.service import AuthService
 from .utils import (
     create_access_token,
-    verify_password,
-    generate_passwd_hash,
+    verify_password_async,
+    generate_passwd_hash_async,
+    password_needs_rehash,
     create_url_safe_token,
     decode_url_safe_token,
 )
@@ -43,6 +45,11 @@ user_service = UserService()
 auth_service = AuthService()
 role_checker = RoleChecker(["admin", "user"])
 only_admin_checker = RoleChecker(["admin"])
+login_rate_limit = RateLimit("login", Config.RATE_LIMIT_LOGIN, Config.RATE_LIMIT_LOGIN_EMAIL)
+signup_rate_limit = RateLimit("signup", Config.RATE_LIMIT_SIGNUP, Config.RATE_LIMIT_SIGNUP_EMAIL)
+password_reset_rate_limit = RateLimit(
+    "password-reset", Config.RATE_LIMIT_PASSWORD_RESET, Config.RATE_LIMIT_PASSWORD_RESET_EMAIL
+)
 
 
 REFRESH_TOKEN_EXPIRY = 2
@@ -63,7 +70,7 @@ async def send_mail(emails: EmailModel):
     return {"message": "Correo enviado"}
 
 
-@auth_router.post("/signup", status_code=status.HTTP_201_CREATED)
+@auth_router.post("/signup", status_code=status.HTTP_201_CREATED, dependencies=[Depends(signup_rate_limit)])
 async def create_user_Account(
     user_data: UserCreateModel,
     bg_tasks: BackgroundTasks,
@@ -94,7 +101,7 @@ async def create_user_Account(
 
     subject = "Verifica tu correo"
 
-    #send_email.delay(emails, subject, html)
+    await enqueue_email(emails, subject, html, session)
 
     return {
         "message": "Cuenta creada, verifica tu correo para activar tu cuenta",
@@ -128,7 +135,7 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
     )
 
 
-@auth_router.post("/login", status_code=status.HTTP_200_OK)
+@auth_router.post("/login", status_code=status.HTTP_200_OK, dependencies=[Depends(login_rate_limit)])
 async def login_users(
     login_data: UserLoginModel,
     is_mobile: bool = False,
@@ -140,9 +147,13 @@ async def login_users(
     user = await user_service.get_user_by_email(email, session)
 
     if user is not None:
-        password_valid = verify_password(password, user.password)
+        password_valid = await verify_password_async(password, user.password)
 
         if password_valid:
+            if password_needs_rehash(user.password):
+                new_hash = await generate_passwd_hash_async(password)
+                await user_service.update_user(user, {"password": new_hash}, session)
+
             access_token = create_access_token(
                 user_data={
                     "email": user.email,
@@ -197,10 +208,10 @@ async def get_current_user(
 
 
 @auth_router.get("/logout")
-async def revoke_token(token_details: dict = Depends(AccessTokenBearer()), session: AsyncSession = Depends(get_session)):
+async def revoke_token(token_details: dict = Depends(AccessTokenBearer())):
     token = token_details["token"]
 
-    await auth_service.add_token_to_blocklist(token, session)
+    await auth_service.add_token_to_blocklist(token, token_details["exp"])
 
     return JSONResponse(
         content={"message": "Sesión cerrada correctamente"}, status_code=status.HTTP_200_OK
@@ -208,7 +219,7 @@ async def revoke_token(token_details: dict = Depends(AccessTokenBearer()), sessi
 
 
 
-@auth_router.post("/password-reset-request")
+@auth_router.post("/password-reset-request", dependencies=[Depends(password_reset_rate_limit)])
 async def password_reset_request(email_data: PasswordResetRequestModel, session: AsyncSession = Depends(get_session)):
     email = email_data.email
 
@@ -227,9 +238,7 @@ async def password_reset_request(email_data: PasswordResetRequestModel, session:
     """
     subject = "Reinicio de contraseña"
 
-    await send_email([email], subject, html_message)
-    """ await send_email_async('MiPrecio',user.email,
-    {'token': token, 'fullname': user.fullname}) """
+    await enqueue_email([email], subject, html_message, session)
     return JSONResponse(
         content={
             "message": "Por favor sigue las instrucciones del correo para actualizar tu contraseña",
@@ -262,8 +271,8 @@ async def reset_account_password(
         if not user:
             raise UserNotFound()
 
-        passwd_hash = generate_passwd_hash(new_password)
-        await user_service.update_user(user, {"password_hash": passwd_hash}, session)
+        passwd_hash = await generate_passwd_hash_async(new_password)
+        await user_service.update_user(user, {"password": passwd_hash}, session)
 
         return JSONResponse(
             content={"message": "Contraseña reiniciada exitosamente"},
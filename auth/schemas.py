@@ -1,6 +1,13 @@
 from typing import List
+import uuid
 from pydantic import BaseModel, Field
 
+class Principal(BaseModel):
+    uid: uuid.UUID
+    email: str
+    role: str
+    is_verified: bool
+
 class UserLoginModel(BaseModel):
     email: str = Field(max_length=40)
     password: str = Field(min_length=6)
@@ -1,26 +1,70 @@
+import asyncio
+import hashlib
 import logging
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import bcrypt
 from itsdangerous import URLSafeTimedSerializer
 
 import jwt
+from ..cache import TTLCache
 from ..config import Config
+from ..errors import PasswordHashingBusy
 
 ACCESS_TOKEN_EXPIRY = 48
 
+# bcrypt libera el GIL, asi que un pool de hilos acotado basta para sacar el
+# hashing del event loop sin bloquear las demas peticiones.
+password_executor = ThreadPoolExecutor(
+    max_workers=Config.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+)
+_pending_hashes = 0
+
 
-def generate_passwd_hash(password: str) -> str:
+def generate_passwd_hash(password: str) -> bytes:
     pass_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=Config.BCRYPT_ROUNDS)
     hash = bcrypt.hashpw(password=pass_bytes, salt=salt)
     return hash
 
 
-def verify_password(password: str, hash: str) -> bool:
+def verify_password(password: str, hash: str | bytes) -> bool:
+    if isinstance(hash, str):
+        hash = hash.encode('utf-8')
     return bcrypt.checkpw(password.encode('utf-8'), hash)
 
 
+def password_needs_rehash(hash: str | bytes) -> bool:
+    if isinstance(hash, bytes):
+        hash = hash.decode('utf-8')
+    try:
+        return int(hash.split("$")[2]) != Config.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+async def _run_in_password_executor(func, *args):
+    global _pending_hashes
+    if _pending_hashes >= Config.PASSWORD_HASH_MAX_QUEUE:
+        raise PasswordHashingBusy()
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        _pending_hashes -= 1
+
+
+async def generate_passwd_hash_async(password: str) -> bytes:
+    return await _run_in_password_executor(generate_passwd_hash, password)
+
+
+async def verify_password_async(password: str, hash: str | bytes) -> bool:
+    return await _run_in_password_executor(verify_password, password, hash)
+
+
 def create_access_token(
     user_data: dict, expiry: timedelta = None, refresh: bool = False
 ):
@@ -53,6 +97,23 @@ def decode_token(token: str) -> dict:
         logging.exception(e)
         return None
 
+verified_tokens = TTLCache(maxsize=Config.TOKEN_CACHE_MAXSIZE, ttl=0)
+
+
+def decode_token_cached(token: str) -> dict | None:
+    """Como decode_token, pero recuerda los claims ya verificados hasta su ``exp``."""
+    key = ("token", hashlib.sha256(token.encode()).digest())
+    found, token_data = verified_tokens.get(key)
+    if found:
+        return token_data
+
+    token_data = decode_token(token)
+    if token_data is not None:
+        ttl = token_data.get("exp", 0) - time.time()
+        if ttl > 0:
+            verified_tokens.set(key, token_data, ttl=ttl)
+    return token_data
+
 serializer = URLSafeTimedSerializer(
     secret_key=Config.JWT_SECRET, salt="email-configuration"
 )
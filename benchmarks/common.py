@@ -0,0 +1,141 @@
+"""Utilidades compartidas por los benchmarks.
+
+Los scripts se ejecutan directamente (``python benchmarks/<script>.py``) y
+cargan la aplicacion desde el directorio padre, apuntando la base de datos a
+un archivo temporal para no tocar ``database.db``.
+"""
+import asyncio
+import importlib
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_app(database_path: str, **settings):
+    """Importa el paquete de la aplicacion usando ``database_path`` como base de datos."""
+    for line in (ROOT / "env-example").read_text().splitlines():
+        if "=" in line:
+            key, value = line.split("=", 1)
+            os.environ.setdefault(key.strip(), value.strip())
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{database_path}"
+    for key, value in settings.items():
+        os.environ[key] = str(value)
+    # El paquete crea archivos relativos al directorio actual al importarse
+    os.chdir(Path(database_path).parent)
+    sys.path.insert(0, str(ROOT.parent))
+    return importlib.import_module(ROOT.name)
+
+
+def temp_database() -> str:
+    return str(Path(tempfile.mkdtemp(prefix="miprecio-bench-")) / "bench.db")
+
+
+def create_schema(database_path: str) -> None:
+    """Crea el esquema completo (tablas, indices, FTS) con un engine sincrono."""
+    from sqlmodel import create_engine
+
+    db = importlib.import_module(f"{ROOT.name}.db")
+    engine = create_engine(f"sqlite:///{database_path}")
+    with engine.begin() as connection:
+        db.create_schema(connection)
+    engine.dispose()
+
+
+def seed(database_path: str, users: int = 10, categories: int = 20, companies: int = 50,
+         products: int = 2000, listings_per_product: int = 5) -> dict:
+    """Inserta un catalogo sintetico directamente con sqlite3."""
+    conn = sqlite3.connect(database_path)
+    hexid = lambda: uuid.uuid4().hex
+    user_ids = [hexid() for _ in range(users)]
+    conn.executemany(
+        "INSERT INTO users (uid, email, fullname, role, is_verified, password) VALUES (?, ?, ?, ?, 1, '')",
+        [(uid, f"user{i}@bench.local", f"Usuario {i}", "socio") for i, uid in enumerate(user_ids)],
+    )
+    category_ids = [hexid() for _ in range(categories)]
+    conn.executemany(
+        "INSERT INTO categories (uid, name, description) VALUES (?, ?, ?)",
+        [(uid, f"Categoria {i}", "Categoria de prueba") for i, uid in enumerate(category_ids)],
+    )
+    company_ids = [hexid() for _ in range(companies)]
+    conn.executemany(
+        "INSERT INTO companies (uid, name, description, is_deleted, user_uid, partner_uid) VALUES (?, ?, ?, 0, ?, ?)",
+        [(uid, f"Compañia {i}", "Compañia de prueba", user_ids[i % users], user_ids[i % users])
+         for i, uid in enumerate(company_ids)],
+    )
+    product_ids = [hexid() for _ in range(products)]
+    conn.executemany(
+        "INSERT INTO products (uid, name, price, description, user_uid, category_uid) VALUES (?, ?, 0, ?, ?, ?)",
+        [(uid, f"Producto {i:07d}", "Producto de prueba", user_ids[i % users], category_ids[i % categories])
+         for i, uid in enumerate(product_ids)],
+    )
+    rows = []
+    for i, product_uid in enumerate(product_ids):
+        for j in range(listings_per_product):
+            company_uid = company_ids[(i + j) % companies]
+            rows.append((hexid(), 10 + (i * 7 + j * 13) % 90, 8.0, j % 30, user_ids[j % users],
+                         product_uid, company_uid))
+    conn.executemany(
+        "INSERT INTO stores (uid, price, wholesale_price, discount, user_uid, product_uid, company_uid, is_deleted)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    return {"users": user_ids, "categories": category_ids, "companies": company_ids, "products": product_ids}
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load(app, path: str | Callable[[int], str], total: int = 500, concurrency: int = 20,
+                   method: str = "GET", json=None, headers=None, label: str | None = None) -> dict:
+    """Ejecuta ``total`` peticiones contra ``app`` con ``concurrency`` clientes.
+
+    ``path`` puede ser una funcion que recibe el numero de peticion y devuelve la
+    URL, para repartir la carga entre distintos ids; en ese caso ``label`` nombra
+    la ruta en el resultado.
+    """
+    import httpx
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    pending = iter(range(total))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://localhost") as client:
+        async def worker():
+            for number in pending:
+                url = path(number) if callable(path) else path
+                start = time.perf_counter()
+                response = await client.request(method, url, json=json, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "path": label or path,
+        "requests": total,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 4),
+        "rps": round(total / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "statuses": statuses,
+    }
@@ -0,0 +1,169 @@
+"""Generador de un catalogo sintetico con sesgo realista, escrito directo en SQLite.
+
+La popularidad sigue una ley de potencias: pocas categorias concentran la mayoria
+de los productos, pocos productos concentran la mayoria de las ofertas y pocas
+compañias publican la mayoria de los precios. Con la misma ``--seed`` se genera
+exactamente el mismo conjunto de datos.
+
+Uso: ``python benchmarks/dataset.py --out /tmp/miprecio.db [--scale 1.0] [--seed 42]``
+"""
+import argparse
+import itertools
+import math
+import random
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import bcrypt
+
+# Tamaños con --scale 1.0
+BASE_SIZES = {"users": 500, "categories": 40, "companies": 200, "products": 20_000, "listings": 100_000}
+
+# Mismo formato que escribe SQLAlchemy para DateTime en SQLite
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+
+BENCH_EMAIL = "bench@bench.local"
+BENCH_PASSWORD = "clave-segura"
+
+NOUNS = ["Arroz", "Harina", "Aceite", "Azucar", "Cafe", "Leche", "Queso", "Pasta", "Atun", "Galletas",
+         "Jabon", "Detergente", "Champu", "Refresco", "Jugo", "Cereal", "Mantequilla", "Salsa", "Avena", "Pan"]
+BRANDS = ["Polar", "Mavesa", "Nestle", "Primor", "Pampero", "Kraft", "Alpina", "Plumrose", "Maggi", "Toddy",
+          "Savoy", "Heinz", "Coposa", "Ronco", "Frica", "Margarita", "Paisa", "Lucky", "Oster", "Diablitos"]
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def timestamp(rng: random.Random, now: datetime, days: int = 365) -> datetime:
+    return now - timedelta(seconds=rng.randrange(days * 86400))
+
+
+def generate(database_path: str, scale: float = 1.0, seed: int = 42, password_rounds: int = 4) -> dict:
+    """Llena una base con el esquema ya creado. Devuelve los ids generados y los tamaños."""
+    rng = random.Random(seed)
+    sizes = {key: max(1, int(value * scale)) for key, value in BASE_SIZES.items()}
+    now = datetime.now()
+    hexid = lambda: uuid.UUID(int=rng.getrandbits(128), version=4).hex
+    conn = sqlite3.connect(database_path)
+
+    user_ids = [hexid() for _ in range(sizes["users"])]
+    roles = ["admin"] + [("socio" if rng.random() < 0.1 else "user") for _ in user_ids[1:]]
+    password = bcrypt.hashpw(BENCH_PASSWORD.encode(), bcrypt.gensalt(rounds=password_rounds))
+    users = []
+    for i, (uid, role) in enumerate(zip(user_ids, roles)):
+        created = timestamp(rng, now)
+        users.append((uid, BENCH_EMAIL if i == 0 else f"user{i}@bench.local", f"Usuario {i}", role,
+                      password if i == 0 else "", created, created))
+    conn.executemany(
+        "INSERT INTO users (uid, email, fullname, role, is_verified, password, created_at, update_at)"
+        " VALUES (?, ?, ?, ?, 1, ?, ?, ?)",
+        users,
+    )
+    partners = [uid for uid, role in zip(user_ids, roles) if role != "user"]
+
+    category_ids = [hexid() for _ in range(sizes["categories"])]
+    conn.executemany(
+        "INSERT INTO categories (uid, name, description, created_at, update_at) VALUES (?, ?, ?, ?, ?)",
+        [(uid, f"Categoria {i}", f"Categoria {NOUNS[i % len(NOUNS)].lower()}", now, now)
+         for i, uid in enumerate(category_ids)],
+    )
+
+    company_ids = [hexid() for _ in range(sizes["companies"])]
+    companies = []
+    for i, uid in enumerate(company_ids):
+        partner = rng.choice(partners)
+        created = timestamp(rng, now)
+        companies.append((uid, f"Compañia {i}", f"Comercio {rng.choice(BRANDS)}", int(rng.random() < 0.02),
+                          partner, partner, created, created))
+    conn.executemany(
+        "INSERT INTO companies (uid, name, description, is_deleted, user_uid, partner_uid, created_at, update_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        companies,
+    )
+
+    product_ids = [hexid() for _ in range(sizes["products"])]
+    product_categories = rng.choices(category_ids, cum_weights=zipf_weights(len(category_ids), 1.0), k=len(product_ids))
+    base_prices = {}
+    products = []
+    for i, (uid, category_uid) in enumerate(zip(product_ids, product_categories)):
+        noun, brand = rng.choice(NOUNS), rng.choice(BRANDS)
+        created = timestamp(rng, now)
+        base_prices[uid] = round(math.exp(rng.gauss(1.5, 0.9)), 2)
+        products.append((uid, f"{noun} {brand} {i:06d}", f"{noun} marca {brand}, presentacion {rng.choice(['pequeña', 'mediana', 'familiar'])}",
+                         rng.choice(user_ids), category_uid, created, created + timedelta(days=rng.randrange(30))))
+    conn.executemany(
+        "INSERT INTO products (uid, name, price, description, user_uid, category_uid, created_at, update_at)"
+        " VALUES (?, ?, 0, ?, ?, ?, ?, ?)",
+        products,
+    )
+
+    # Pares (compañia, producto) unicos, con ambos lados sesgados
+    product_weights = zipf_weights(len(product_ids), 0.9)
+    company_weights = zipf_weights(len(company_ids), 1.1)
+    target = min(sizes["listings"], len(product_ids) * len(company_ids))
+    pairs: set[tuple[str, str]] = set()
+    while len(pairs) < target:
+        missing = target - len(pairs)
+        pairs.update(zip(
+            rng.choices(company_ids, cum_weights=company_weights, k=missing),
+            rng.choices(product_ids, cum_weights=product_weights, k=missing),
+        ))
+    stores, history = [], []
+    for company_uid, product_uid in sorted(pairs):
+        price = round(base_prices[product_uid] * rng.uniform(0.85, 1.25), 2)
+        discount = 0 if rng.random() < 0.7 else rng.choice([5, 10, 15, 20, 30])
+        created = timestamp(rng, now)
+        changed = created
+        for _ in range(1 + min(int(rng.expovariate(1.0)), 5)):
+            history.append((product_uid, company_uid, price, round(price * 0.9, 2), discount, changed))
+            changed += timedelta(days=rng.randrange(1, 30))
+            price = round(price * rng.uniform(0.95, 1.08), 2)
+        stores.append((hexid(), history[-1][2], history[-1][3], discount, rng.choice(user_ids), product_uid,
+                       company_uid, int(rng.random() < 0.03), created, history[-1][5]))
+    conn.executemany(
+        "INSERT INTO stores (uid, price, wholesale_price, discount, user_uid, product_uid, company_uid, is_deleted,"
+        " created_at, update_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        stores,
+    )
+    conn.executemany(
+        "INSERT INTO price_history (product_uid, company_uid, price, wholesale_price, discount, changed_at)"
+        " VALUES (?, ?, ?, ?, ?, ?)",
+        history,
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+    sizes.update(listings=len(stores), price_history=len(history))
+    return {
+        "sizes": sizes,
+        "users": user_ids,
+        "categories": category_ids,
+        "companies": company_ids,
+        "products": product_ids,
+        "stores": [row[0] for row in stores],
+    }
+
+
+if __name__ == "__main__":
+    from common import create_schema, load_app
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", required=True, help="Archivo SQLite a crear")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    # load_app cambia el directorio actual, la ruta tiene que ser absoluta
+    out = Path(args.out).resolve()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    args.out = str(out)
+    load_app(args.out)
+    create_schema(args.out)
+    dataset = generate(args.out, args.scale, args.seed)
+    # Segunda pasada: el esquema llena los indices derivados (resumen de precios)
+    create_schema(args.out)
+    print(dataset["sizes"])
@@ -0,0 +1,122 @@
+"""Compara la bandeja de salida contra abrir una conexion SMTP por correo.
+
+Levanta un servidor ``aiosmtpd`` local (``pip install aiosmtpd``), encola
+``--emails`` correos con ``enqueue_email`` y mide cuanto tarda el worker en
+entregarlos todos sobre una sola conexion, junto con la latencia encolado ->
+entrega. La linea base envia los mismos correos con ``aiosmtplib.send``, que
+abre y cierra una conexion por mensaje.
+
+Uso: ``python benchmarks/email_outbox.py [--emails 500] [--port 8025] [--smtp-delay 0]``
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from common import create_schema, load_app, percentile, temp_database
+
+
+class Recorder:
+    """Handler de aiosmtpd que anota cuando llega cada correo."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.arrivals: dict[str, float] = {}
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        for line in envelope.content.splitlines():
+            if line.startswith(b"X-Outbox-Id:"):
+                self.arrivals[line.split(b":", 1)[1].strip().decode()] = time.perf_counter()
+                break
+        else:
+            self.arrivals[str(len(self.arrivals))] = time.perf_counter()
+        return "250 OK"
+
+
+async def outbox_run(app_module, recorder: Recorder, total: int) -> dict:
+    outbox = app_module.outbox
+    enqueued: dict[str, float] = {}
+    started = time.perf_counter()
+    async with app_module.db.async_session() as session:
+        for index in range(total):
+            email = await outbox.enqueue_email([f"cliente{index}@bench.local"], "Benchmark", "<p>Hola</p>", session)
+            enqueued[str(email.id)] = time.perf_counter()
+    enqueue_seconds = time.perf_counter() - started
+
+    worker = outbox.OutboxWorker()
+    started = time.perf_counter()
+    worker.start()
+    while len(recorder.arrivals) < total:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - started
+    await worker.stop()
+
+    # La latencia incluye el tiempo en cola antes de arrancar el worker; se mide desde que arranca
+    latencies = [recorder.arrivals[key] - max(enqueued[key], started) for key in enqueued]
+    return {
+        "enqueue_per_second": round(total / enqueue_seconds, 1),
+        "delivered_per_second": round(total / elapsed, 1),
+        "seconds": round(elapsed, 3),
+        "smtp_connections": recorder.connections,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "latency_p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def baseline_run(app_module, recorder: Recorder, total: int, port: int) -> dict:
+    build_message = app_module.mail.build_message
+    started = time.perf_counter()
+    for index in range(total):
+        message = build_message([f"cliente{index}@bench.local"], "Benchmark", "<p>Hola</p>")
+        await aiosmtplib.send(message, hostname="127.0.0.1", port=port, start_tls=False)
+    elapsed = time.perf_counter() - started
+    return {
+        "delivered_per_second": round(total / elapsed, 1),
+        "seconds": round(elapsed, 3),
+        "smtp_connections": recorder.connections,
+    }
+
+
+async def main(args):
+    database_path = temp_database()
+    settings = dict(
+        MAIL_SERVER="127.0.0.1", MAIL_PORT=args.port, MAIL_STARTTLS=False, MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False, OUTBOX_ENABLED=False, OUTBOX_BATCH_SIZE=args.batch_size, ACCESS_LOG_ENABLED=False,
+    )
+    app_module = load_app(database_path, **settings)
+    create_schema(database_path)
+
+    results = {"emails": args.emails, "smtp_delay_ms": args.smtp_delay * 1000}
+    for name, run in (("baseline_connection_per_email", baseline_run), ("outbox", outbox_run)):
+        recorder = Recorder(args.smtp_delay)
+        controller = Controller(recorder, hostname="127.0.0.1", port=args.port)
+        controller.start()
+        try:
+            if run is baseline_run:
+                results[name] = await run(app_module, recorder, args.emails, args.port)
+            else:
+                results[name] = await run(app_module, recorder, args.emails)
+        finally:
+            controller.stop()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--smtp-delay", type=float, default=0.0, help="segundos que tarda el servidor en aceptar cada correo")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""Compara el rendimiento de los listados de productos y tiendas entre la capa
+de sesiones anterior (un ``sessionmaker`` por peticion y aiosqlite sin ajustes)
+y la fabrica de sesiones compartida con los PRAGMA configurados en ``Settings``.
+
+Uso: ``python benchmarks/list_routes.py [--products 200] [--requests 200] [--concurrency 20]``
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+
+from common import create_schema, load_app, run_load, seed, temp_database
+
+ROUTES = ["/api/v1/product/", "/api/v1/store/"]
+
+
+async def main(args):
+    database_path = temp_database()
+    app_module = load_app(database_path)
+    create_schema(database_path)
+    seed(database_path, products=args.products, companies=args.companies)
+
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    db = importlib.import_module(f"{app_module.__name__}.db")
+    legacy_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+
+    async def legacy_get_session():
+        Session = sessionmaker(bind=legacy_engine, class_=AsyncSession, expire_on_commit=False)
+        async with Session() as session:
+            yield session
+
+    app = app_module.app
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        app.dependency_overrides[db.get_session] = legacy_get_session
+        results["legacy"] = [await run_load(app, path, args.requests, args.concurrency) for path in ROUTES]
+        app.dependency_overrides.clear()
+        results["tuned"] = [await run_load(app, path, args.requests, args.concurrency) for path in ROUTES]
+
+    await legacy_engine.dispose()
+    await db.async_engine.dispose()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
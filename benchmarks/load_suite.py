@@ -0,0 +1,142 @@
+"""Prueba de carga de todos los routers sobre un catalogo sintetico con sesgo.
+
+Genera el conjunto de datos de ``dataset.py`` en una base temporal, levanta la
+aplicacion en proceso y recorre cada ruta con un cliente httpx asincrono a
+concurrencia fija. Los ids se eligen con la misma distribucion sesgada de los
+datos, asi que las rutas de detalle pegan mas seguido en los productos y
+compañias populares. El reporte JSON trae rps y p50/p95/p99 por ruta, junto con
+el commit y los parametros, para comparar entre versiones.
+
+Uso: ``python benchmarks/load_suite.py [--scale 0.1] [--requests 300] [--concurrency 16] [--out reporte.json]``
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from common import ROOT, create_schema, load_app, run_load, temp_database
+from dataset import BENCH_EMAIL, BENCH_PASSWORD, generate, zipf_weights
+
+API = "/api/v1"
+
+
+def git_commit() -> str | None:
+    result = subprocess.run(["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def skewed(rng: random.Random, ids: list[str], exponent: float):
+    """Devuelve una funcion numero -> id con popularidad tipo Zipf, como los datos."""
+    weights = zipf_weights(len(ids), exponent)
+    picks = rng.choices(ids, cum_weights=weights, k=4096)
+    return lambda number: picks[number % len(picks)]
+
+
+def scenarios(dataset: dict, token: str, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    product = skewed(rng, dataset["products"], 0.9)
+    company = skewed(rng, dataset["companies"], 1.1)
+    category = skewed(rng, dataset["categories"], 1.0)
+    user = skewed(rng, dataset["users"], 0.5)
+    words = ["arroz", "cafe polar", "harina", "leche alpina", "jabon", "pasta primor", "salsa", "atun"]
+    auth = {"Authorization": f"Bearer {token}"}
+    offers_body = {"uids": dataset["products"][:50], "top": 3}
+    return [
+        {"router": "auth", "label": "POST /auth/login", "method": "POST", "path": f"{API}/auth/login",
+         "json": {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}},
+        {"router": "auth", "label": "GET /auth/me", "path": f"{API}/auth/me", "headers": auth},
+        {"router": "product", "label": "GET /product/", "path": f"{API}/product/?limit=50"},
+        {"router": "product", "label": "GET /product/top", "path": f"{API}/product/top"},
+        {"router": "product", "label": "GET /product/search", "path": lambda n: f"{API}/product/search?q={words[n % len(words)]}"},
+        {"router": "product", "label": "GET /product/{id}", "path": lambda n: f"{API}/product/{product(n)}"},
+        {"router": "product", "label": "GET /product/{id}/offers", "path": lambda n: f"{API}/product/{product(n)}/offers"},
+        {"router": "product", "label": "GET /product/{id}/history", "path": lambda n: f"{API}/product/{product(n)}/history?days=365"},
+        {"router": "product", "label": "POST /product/offers", "method": "POST", "path": f"{API}/product/offers", "json": offers_body},
+        {"router": "category", "label": "GET /category/", "path": f"{API}/category/?limit=20"},
+        {"router": "category", "label": "GET /category/{id}", "path": lambda n: f"{API}/category/{category(n)}"},
+        {"router": "company", "label": "GET /company/", "path": f"{API}/company/?limit=50"},
+        {"router": "company", "label": "GET /company/{id}", "path": lambda n: f"{API}/company/{company(n)}"},
+        {"router": "store", "label": "GET /store/", "path": f"{API}/store/?limit=10"},
+        {"router": "store", "label": "GET /store/stores", "path": f"{API}/store/stores?limit=50"},
+        {"router": "store", "label": "GET /store/company/{id}", "path": lambda n: f"{API}/store/company/{company(n)}"},
+        {"router": "user", "label": "GET /user/", "path": f"{API}/user/?limit=100"},
+        {"router": "user", "label": "GET /user/top", "path": f"{API}/user/top"},
+        {"router": "user", "label": "GET /user/{id}", "path": lambda n: f"{API}/user/{user(n)}"},
+    ]
+
+
+async def main(args):
+    import httpx
+
+    database_path = temp_database()
+    # Sin limite de intentos: el suite mide rendimiento, no la proteccion contra rafagas
+    app_module = load_app(
+        database_path, ACCESS_LOG_ENABLED=False, CACHE_ENABLED=not args.no_cache, BCRYPT_ROUNDS=args.bcrypt_rounds,
+        RATE_LIMIT_ENABLED=False,
+    )
+    create_schema(database_path)
+    started = time.perf_counter()
+    # Con el mismo costo que la configuracion, el login no re-hashea la contraseña
+    dataset = generate(database_path, args.scale, args.seed, password_rounds=args.bcrypt_rounds)
+    # Segunda pasada: el esquema llena los indices derivados (resumen de precios)
+    create_schema(database_path)
+    generation_seconds = time.perf_counter() - started
+
+    app = app_module.app
+    selected = set(args.routers.split(",")) if args.routers else None
+    results = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://localhost") as client:
+            response = await client.post(f"{API}/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            token = response.json()["access_token"]
+        for scenario in scenarios(dataset, token, args.seed):
+            if selected is not None and scenario["router"] not in selected:
+                continue
+            options = {key: scenario[key] for key in ("method", "json", "headers") if key in scenario}
+            await run_load(app, scenario["path"], args.warmup, 1, label=scenario["label"], **options)
+            result = await run_load(app, scenario["path"], args.requests, args.concurrency, label=scenario["label"], **options)
+            results.append({"router": scenario["router"], **result})
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "scale": args.scale,
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "cache": not args.no_cache,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "dataset": dataset["sizes"],
+            "generation_seconds": round(generation_seconds, 2),
+        },
+        "routes": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as file:
+            file.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=float, default=0.1, help="1.0 = 20.000 productos y 100.000 ofertas")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=300, help="Peticiones por ruta")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="Peticiones previas por ruta, no medidas")
+    parser.add_argument("--routers", help="Lista separada por comas: auth,product,category,company,store,user")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--no-cache", action="store_true", help="Desactiva el cache de catalogo")
+    parser.add_argument("--out", help="Archivo donde guardar el reporte JSON")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+"""Mide la latencia de una ruta ajena (``/health``) mientras ocurre una rafaga de logins.
+
+Con bcrypt fuera del event loop, el p99 de ``/health`` durante la rafaga deberia
+mantenerse cerca del valor en reposo.
+
+Uso: ``python benchmarks/login_storm.py [--logins 200] [--concurrency 32] [--rounds 12]``
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+import bcrypt
+
+from common import create_schema, load_app, percentile, temp_database
+
+EMAIL = "storm@bench.local"
+PASSWORD = "clave-segura"
+
+
+async def probe(client, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def storm(client, total: int, concurrency: int) -> dict:
+    statuses: dict[int, int] = {}
+    pending = iter(range(total))
+
+    async def worker():
+        for _ in pending:
+            response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statuses
+
+
+def summary(latencies: list[float]) -> dict:
+    return {
+        "samples": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(max(latencies, default=0) * 1000, 3),
+    }
+
+
+async def main(args):
+    import httpx
+
+    database_path = temp_database()
+    app_module = load_app(database_path, BCRYPT_ROUNDS=args.rounds, PASSWORD_HASH_MAX_QUEUE=args.logins, RATE_LIMIT_ENABLED=False)
+    create_schema(database_path)
+    conn = sqlite3.connect(database_path)
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=args.rounds))
+    conn.execute(
+        "INSERT INTO users (uid, email, fullname, role, is_verified, password) VALUES (?, ?, 'Storm', 'user', 1, ?)",
+        (uuid.uuid4().hex, EMAIL, password),
+    )
+    conn.commit()
+    conn.close()
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            stop = asyncio.Event()
+            idle_task = asyncio.create_task(probe(client, stop, args.interval))
+            await asyncio.sleep(1)
+            stop.set()
+            idle = await idle_task
+
+            stop = asyncio.Event()
+            busy_task = asyncio.create_task(probe(client, stop, args.interval))
+            started = time.perf_counter()
+            statuses = await storm(client, args.logins, args.concurrency)
+            elapsed = time.perf_counter() - started
+            stop.set()
+            busy = await busy_task
+
+    print(json.dumps({
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        "bcrypt_rounds": args.rounds,
+        "storm_seconds": round(elapsed, 3),
+        "login_statuses": statuses,
+        "health_idle": summary(idle),
+        "health_during_storm": summary(busy),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--interval", type=float, default=0.01)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,52 @@
+"""Mide el costo por peticion del registro de metricas.
+
+Primero cronometra en aislamiento el trabajo que el middleware agrega por peticion
+(gauge de peticiones en curso y observacion del histograma con etiquetas). Luego
+compara ``/health`` de punta a punta con METRICS_ENABLED activado y desactivado.
+
+Uso: ``python benchmarks/metrics_overhead.py [--iterations 1000000] [--requests 5000]``
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import time
+
+from common import load_app, run_load, temp_database
+
+
+def per_request_ns(metrics, iterations: int) -> float:
+    in_flight, duration = metrics.HTTP_REQUESTS_IN_FLIGHT, metrics.HTTP_REQUEST_DURATION
+    start = time.perf_counter_ns()
+    for i in range(iterations):
+        in_flight.inc()
+        in_flight.dec()
+        duration.observe((i % 1000) / 10_000, "GET", "/api/v1/product/", "200")
+    return (time.perf_counter_ns() - start) / iterations
+
+
+async def main(args):
+    database_path = temp_database()
+    app_module = load_app(database_path, ACCESS_LOG_ENABLED=False)
+    config = importlib.import_module(f"{app_module.__name__}.config").Config
+    metrics = importlib.import_module(f"{app_module.__name__}.metrics")
+
+    results = {"isolated_ns_per_request": round(per_request_ns(metrics, args.iterations), 1)}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for mode, enabled in (("disabled", False), ("enabled", True), ("disabled_again", False)):
+            config.METRICS_ENABLED = enabled
+            await run_load(app_module.app, "/health", 200, 1)
+            results[mode] = await run_load(app_module.app, "/health", args.requests, 1)
+    results["end_to_end_delta_us"] = round(
+        (results["enabled"]["mean_ms"] - (results["disabled"]["mean_ms"] + results["disabled_again"]["mean_ms"]) / 2) * 1000, 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
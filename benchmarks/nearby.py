@@ -0,0 +1,123 @@
+"""Mide ``GET /product/{id}/nearby`` con muchas compañias geolocalizadas.
+
+Reparte ``--points`` compañias (por defecto 100k) en una region del tamaño de un
+pais, la mayoria agrupadas alrededor de unas pocas ciudades, y cada una ofrece
+algunos productos. Mide la consulta del servicio (prefiltro R*Tree + haversine)
+para varios radios y la compara con un recorrido completo que calcula la
+distancia a todas las compañias.
+
+Uso: ``python benchmarks/nearby.py [--points 100000] [--queries 200]``
+"""
+import argparse
+import asyncio
+import json
+import random
+import sqlite3
+import time
+import uuid
+
+from common import create_schema, load_app, percentile, seed, temp_database
+
+# Region aproximada de Venezuela y algunas ciudades
+REGION = (1.0, 12.0, -73.0, -60.0)
+CITIES = [(10.48, -66.90), (10.65, -71.64), (10.16, -68.00), (10.07, -69.32), (8.60, -71.15), (8.12, -63.55)]
+PRODUCTS = 20
+
+FULL_SCAN_SQL = """
+SELECT companies.uid, stores.price * (100 - coalesce(stores.discount, 0)) / 100.0 AS effective_price,
+       haversine_km(?, ?, companies.latitude, companies.longitude) AS distance_km
+FROM companies JOIN stores ON stores.company_uid = companies.uid
+WHERE stores.product_uid = ? AND stores.is_deleted = 0 AND companies.is_deleted = 0
+  AND haversine_km(?, ?, companies.latitude, companies.longitude) <= ?
+ORDER BY effective_price, distance_km LIMIT ?
+"""
+
+
+def populate(database_path: str, points: int, rng: random.Random) -> tuple[list[str], list[tuple[float, float]]]:
+    ids = seed(database_path, users=10, categories=5, companies=1, products=PRODUCTS, listings_per_product=0)
+    user_uid, products = ids["users"][0], ids["products"]
+    conn = sqlite3.connect(database_path)
+    locations, companies, stores = [], [], []
+    for i in range(points):
+        if rng.random() < 0.7:
+            city_lat, city_lon = rng.choice(CITIES)
+            lat, lon = rng.gauss(city_lat, 0.08), rng.gauss(city_lon, 0.08)
+        else:
+            lat, lon = rng.uniform(*REGION[:2]), rng.uniform(*REGION[2:])
+        company_uid = uuid.uuid4().hex
+        locations.append((lat, lon))
+        companies.append((company_uid, f"Punto {i:06d}", lat, lon, user_uid, user_uid))
+        # El primer producto es popular (30% de las compañias), el resto mas escaso
+        for index, product_uid in enumerate(products):
+            if rng.random() < (0.3 if index == 0 else 0.02):
+                stores.append((uuid.uuid4().hex, round(rng.uniform(1, 50), 2), rng.choice((0, 0, 5, 10)),
+                               user_uid, product_uid, company_uid))
+    conn.executemany(
+        "INSERT INTO companies (uid, name, description, is_deleted, latitude, longitude, user_uid, partner_uid)"
+        " VALUES (?, ?, '', 0, ?, ?, ?, ?)",
+        companies,
+    )
+    conn.executemany(
+        "INSERT INTO stores (uid, price, wholesale_price, discount, user_uid, product_uid, company_uid, is_deleted)"
+        " VALUES (?, ?, 0, ?, ?, ?, ?, 0)",
+        stores,
+    )
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    return products, locations
+
+
+def summary(latencies: list[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    database_path = temp_database()
+    app_module = load_app(database_path)
+    create_schema(database_path)
+    started = time.perf_counter()
+    products, locations = populate(database_path, args.points, rng)
+    generation_seconds = time.perf_counter() - started
+
+    service = app_module.store.service.StoreService()
+    report = {"points": args.points, "queries": args.queries, "generation_seconds": round(generation_seconds, 2), "rtree": {}}
+    async with app_module.db.async_session() as session:
+        for radius in args.radii:
+            for label, product in (("popular", products[0]), ("rare", products[1])):
+                latencies, results = [], 0
+                for _ in range(args.queries):
+                    lat, lon = rng.choice(locations)
+                    start = time.perf_counter()
+                    offers = await service.get_nearby_offers(uuid.UUID(product), lat, lon, radius, 20, session)
+                    latencies.append(time.perf_counter() - start)
+                    results += len(offers)
+                report["rtree"][f"{label} r={radius}km"] = {**summary(latencies), "avg_results": round(results / args.queries, 1)}
+
+    # Linea base: distancia a todas las compañias, sin indice espacial
+    haversine_km = app_module.company.geo.haversine_km
+    conn = sqlite3.connect(database_path)
+    conn.create_function("haversine_km", 4, haversine_km, deterministic=True)
+    latencies = []
+    for _ in range(args.full_scan_queries):
+        lat, lon = rng.choice(locations)
+        start = time.perf_counter()
+        conn.execute(FULL_SCAN_SQL, (lat, lon, products[0], lat, lon, args.radii[0], 20)).fetchall()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    report["full_scan"] = {f"popular r={args.radii[0]}km": summary(latencies)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--full-scan-queries", type=int, default=10)
+    parser.add_argument("--radii", type=float, nargs="+", default=[1.0, 5.0, 25.0])
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,89 @@
+"""Compara la busqueda FTS5 de productos contra un ``LIKE '%q%'`` sobre la tabla.
+
+Uso: ``python benchmarks/product_search.py [--products 1000000] [--repeat 20]``
+"""
+import argparse
+import importlib
+import json
+import random
+import sqlite3
+import time
+import uuid
+
+from common import ROOT, create_schema, load_app, percentile, temp_database
+
+NOUNS = ["Café", "Azúcar", "Leche", "Pan", "Jabón", "Arroz", "Harina", "Aceite", "Atún", "Galletas",
+         "Queso", "Mantequilla", "Pasta", "Salsa", "Jugo", "Refresco", "Champú", "Detergente", "Caraotas", "Avena"]
+ADJECTIVES = ["Integral", "Dulce", "Clásico", "Light", "Orgánico", "Picante", "Tostado", "Suave", "Extra", "Campesino"]
+BRANDS = ["Polar", "Mavesa", "Nestlé", "Alfonzo Rivas", "Plumrose", "Pampero", "La Lucha", "Montalbán", "Heinz", "Primor"]
+QUERIES = ["cafe", "jabon integral", "azuc", "leche polar", "atun", "salsa pic", "champu suave", "harina pan"]
+
+
+def fill(database_path: str, products: int) -> None:
+    conn = sqlite3.connect(database_path)
+    category = uuid.uuid4().hex
+    conn.execute("INSERT INTO categories (uid, name, description) VALUES (?, 'Víveres', '')", (category,))
+    rng = random.Random(42)
+    batch = []
+    for i in range(products):
+        name = f"{rng.choice(NOUNS)} {rng.choice(ADJECTIVES)} {rng.choice(BRANDS)} {i}"
+        batch.append((uuid.uuid4().hex, name, f"{name} presentación de {rng.randint(1, 5)} kg", "0" * 32, category))
+        if len(batch) == 50_000:
+            conn.executemany("INSERT INTO products (uid, name, price, description, user_uid, category_uid)"
+                             " VALUES (?, ?, 0, ?, ?, ?)", batch)
+            batch.clear()
+    if batch:
+        conn.executemany("INSERT INTO products (uid, name, price, description, user_uid, category_uid)"
+                         " VALUES (?, ?, 0, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def timed(conn, sql, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        samples.append(time.perf_counter() - start)
+    return rows, samples
+
+
+def main(args):
+    database_path = temp_database()
+    load_app(database_path)
+    create_schema(database_path)
+    search = importlib.import_module(f"{ROOT.name}.product.search")
+
+    started = time.perf_counter()
+    fill(database_path, args.products)
+    load_seconds = time.perf_counter() - started
+
+    conn = sqlite3.connect(database_path)
+    fts_sql = ("SELECT products.uid FROM products_fts JOIN products ON products.rowid = products_fts.rowid"
+               " WHERE products_fts MATCH ? ORDER BY bm25(products_fts, ?, ?, ?) LIMIT ?")
+    like_sql = "SELECT uid FROM products WHERE name LIKE ? OR description LIKE ? LIMIT ?"
+    report = {"products": args.products, "load_seconds": round(load_seconds, 2), "queries": []}
+    for text in QUERIES:
+        match = search.build_match_query(text)
+        fts_rows, fts = timed(conn, fts_sql, (match, *search.SEARCH_WEIGHTS, args.limit), args.repeat)
+        pattern = f"%{text}%"
+        like_rows, like = timed(conn, like_sql, (pattern, pattern, args.limit), args.repeat)
+        report["queries"].append({
+            "q": text,
+            "fts_hits": len(fts_rows),
+            "like_hits": len(like_rows),
+            "fts_p50_ms": round(percentile(fts, 50) * 1000, 3),
+            "fts_p99_ms": round(percentile(fts, 99) * 1000, 3),
+            "like_p50_ms": round(percentile(like, 50) * 1000, 3),
+            "like_p99_ms": round(percentile(like, 99) * 1000, 3),
+        })
+    conn.close()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,52 @@
+"""Compara peticiones por segundo de los listados con la serializacion estandar de
+FastAPI (``response_model`` + jsonable_encoder + json) y con ``FastSerializer``
+(TypeAdapter prearmado y ``dump_json``), sobre el arbol compañia → tiendas de
+``/store/`` y el listado de productos.
+
+Uso: ``python benchmarks/serialization.py [--products 200] [--companies 20] [--requests 200]``
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+
+from common import create_schema, load_app, run_load, seed, temp_database
+
+
+async def main(args):
+    database_path = temp_database()
+    app_module = load_app(database_path, CACHE_ENABLED=False)
+    create_schema(database_path)
+    seed(database_path, products=args.products, companies=args.companies, listings_per_product=args.listings)
+
+    config = importlib.import_module(f"{app_module.__name__}.config").Config
+    db = importlib.import_module(f"{app_module.__name__}.db")
+    routes = [f"/api/v1/store/?limit={args.limit}", f"/api/v1/product/?limit={args.limit}"]
+
+    app = app_module.app
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for mode, fast in (("fastapi", False), ("type_adapter", True)):
+            config.FAST_JSON_RESPONSES = fast
+            # Calentamiento: compila los validadores y llena el cache de sentencias
+            for path in routes:
+                await run_load(app, path, 10, 1)
+            results[mode] = [await run_load(app, path, args.requests, args.concurrency) for path in routes]
+
+    await db.async_engine.dispose()
+    for before, after in zip(results["fastapi"], results["type_adapter"]):
+        after["speedup"] = round(after["rps"] / before["rps"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--listings", type=int, default=5, help="Ofertas por producto")
+    parser.add_argument("--limit", type=int, default=20, help="Tamaño de pagina pedido")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""Mide el arranque en frio de un worker: importar el paquete, correr el lifespan y
+atender la primera peticion que toca la base de datos.
+
+Cada muestra es un proceso nuevo, como un contenedor recien creado. Con
+``--migrate-on-startup`` el lifespan aplica (o verifica) las migraciones en vez de
+solo leer ``PRAGMA user_version``.
+
+Uso: ``python benchmarks/startup.py [--runs 10] [--migrate-on-startup]``
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def measure(database_path: str, migrate_on_startup: bool) -> dict:
+    """Se ejecuta en el proceso hijo."""
+    # El cliente es parte del arnes, no de la aplicacion: se importa antes de medir
+    import httpx
+
+    started = time.perf_counter()
+    from common import load_app
+
+    app_module = load_app(database_path, DB_MIGRATE_ON_STARTUP=migrate_on_startup, ACCESS_LOG_ENABLED=False, OUTBOX_ENABLED=False)
+    imported = time.perf_counter()
+
+    async def first_request() -> tuple[float, float, int]:
+        app = app_module.app
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+                response = await client.get("/api/v1/category/")
+            return ready, time.perf_counter(), response.status_code
+
+    ready, answered, status = asyncio.run(first_request())
+    return {
+        "import_ms": (imported - started) * 1000,
+        "lifespan_ms": (ready - imported) * 1000,
+        "first_request_ms": (answered - ready) * 1000,
+        "total_ms": (answered - started) * 1000,
+        "status": status,
+    }
+
+
+def main(args):
+    from sqlmodel import create_engine
+
+    from common import ROOT, load_app, seed, temp_database
+
+    database_path = temp_database()
+    app_module = load_app(database_path)
+    engine = create_engine(f"sqlite:///{database_path}")
+    with engine.begin() as connection:
+        app_module.migrations.migrate(connection)
+    engine.dispose()
+    seed(database_path)
+
+    samples = []
+    for _ in range(args.runs):
+        command = [sys.executable, __file__, "--child", database_path]
+        if args.migrate_on_startup:
+            command.append("--migrate-on-startup")
+        output = subprocess.run(command, capture_output=True, text=True, check=True, cwd=ROOT / "benchmarks")
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    report = {"runs": args.runs, "migrate_on_startup": args.migrate_on_startup}
+    for key in ("import_ms", "lifespan_ms", "first_request_ms", "total_ms"):
+        values = [sample[key] for sample in samples]
+        report[key] = {"median": round(statistics.median(values), 1), "max": round(max(values), 1)}
+    report["statuses"] = sorted({sample["status"] for sample in samples})
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--migrate-on-startup", action="store_true")
+    parser.add_argument("--child", metavar="DATABASE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure(args.child, args.migrate_on_startup)))
+    else:
+        main(args)
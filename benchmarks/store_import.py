@@ -0,0 +1,94 @@
+"""Mide el rendimiento de ``POST /store/bulk`` (filas por segundo) en CSV y NDJSON.
+
+La primera carga crea todas las filas; la segunda las actualiza.
+
+Uso: ``python benchmarks/store_import.py [--rows 20000] [--format csv]``
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+import bcrypt
+
+from common import create_schema, load_app, seed, temp_database
+
+EMAIL = "import@bench.local"
+PASSWORD = "clave-segura"
+
+
+def build_body(catalog: dict, rows: int, format: str, price_offset: int) -> bytes:
+    companies, products = catalog["companies"], catalog["products"]
+    lines = ["product_uid,company_uid,price,wholesale_price,discount"] if format == "csv" else []
+    for i in range(rows):
+        product_uid = products[i % len(products)]
+        company_uid = companies[i // len(products)]
+        price = 10 + (i + price_offset) % 90
+        if format == "csv":
+            lines.append(f"{product_uid},{company_uid},{price},{price * 0.8:.2f},{i % 30}")
+        else:
+            lines.append(json.dumps({"product_uid": product_uid, "company_uid": company_uid, "price": price,
+                                     "wholesale_price": round(price * 0.8, 2), "discount": i % 30}))
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def upload(client, body: bytes, format: str, headers: dict, chunk_size: int = 64 * 1024) -> tuple[float, dict]:
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    content_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    started = time.perf_counter()
+    response = await client.post("/api/v1/store/bulk", content=chunks(),
+                                 headers={**headers, "Content-Type": content_type})
+    return time.perf_counter() - started, response.json()
+
+
+async def main(args):
+    import httpx
+
+    database_path = temp_database()
+    app_module = load_app(database_path, BULK_CHUNK_SIZE=args.chunk_size)
+    create_schema(database_path)
+    companies = max(1, -(-args.rows // args.products))
+    catalog = seed(database_path, companies=companies, products=args.products, listings_per_product=0)
+    conn = sqlite3.connect(database_path)
+    conn.execute(
+        "INSERT INTO users (uid, email, fullname, role, is_verified, password) VALUES (?, ?, 'Import', 'admin', 1, ?)",
+        (uuid.uuid4().hex, EMAIL, bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4))),
+    )
+    conn.commit()
+    conn.close()
+
+    report = {"rows": args.rows, "format": args.format, "runs": []}
+    transport = httpx.ASGITransport(app=app_module.app)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with app_module.app.router.lifespan_context(app_module.app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://localhost", timeout=None) as client:
+                response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+                headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                for name, offset in (("insert", 0), ("update", 1)):
+                    body = build_body(catalog, args.rows, args.format, offset)
+                    seconds, result = await upload(client, body, args.format, headers)
+                    report["runs"].append({
+                        "run": name,
+                        "seconds": round(seconds, 3),
+                        "rows_per_second": round(args.rows / seconds),
+                        "created": result.get("created"),
+                        "updated": result.get("updated"),
+                        "failed": result.get("failed"),
+                    })
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    asyncio.run(main(parser.parse_args()))
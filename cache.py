@@ -0,0 +1,163 @@
+import functools
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import Config
+from .utils.serialization import FastSerializer
+from .versions import request_versions
+
+
+class TTLCache:
+    """Cache LRU en memoria con expiracion por TTL. Cada llave queda etiquetada con
+    su namespace (``key[0]``) y con las etiquetas que se pasen a ``set``; una
+    escritura invalida solo las llaves que llevan alguna de sus etiquetas."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._tags: dict[Hashable, set] = {}
+        self._key_tags: dict[Hashable, tuple] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return False, None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+
+    def set(self, key: tuple, value: Any, ttl: float | None = None, tags: Iterable[Hashable] = ()) -> None:
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        key_tags = (key[0], *tags)
+        self._key_tags[key] = key_tags
+        for tag in key_tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: tuple) -> None:
+        if key in self._data:
+            self._remove(key)
+            self.invalidations += 1
+
+    def invalidate(self, *tags: Hashable) -> None:
+        """Borra las llaves con alguna de las etiquetas; un namespace borra todas las suyas."""
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+        self._key_tags.clear()
+
+    def _remove(self, key: tuple) -> None:
+        self._data.pop(key, None)
+        for tag in self._key_tags.pop(key, (key[0],)):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+catalog_cache = TTLCache(maxsize=Config.CACHE_MAXSIZE, ttl=Config.CACHE_TTL)
+principal_cache = TTLCache(maxsize=Config.PRINCIPAL_CACHE_MAXSIZE, ttl=Config.PRINCIPAL_CACHE_TTL)
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _uids(value: Any) -> set:
+    if isinstance(value, uuid.UUID):
+        return {value}
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return set()
+    return set().union(*map(_uids, value))
+
+
+def cached(namespace: str, serializer: FastSerializer):
+    """Cachea el resultado de un metodo de servicio por namespace, nombre y argumentos.
+    La sesion no forma parte de la llave.
+
+    Se guarda el JSON ya serializado con ``serializer``, no los objetos ORM, que
+    pertenecen a la sesion de la peticion que los cargo; el metodo decorado devuelve
+    esos bytes. La entrada se etiqueta con ``(namespace, uid)`` por cada uid que
+    aparece en la respuesta, para que ``invalidate`` pueda borrar solo las
+    entradas que contienen una fila modificada.
+
+    Si la ruta declara ``conditional``, las versiones que leyo entran en la llave:
+    el cuerpo cacheado siempre corresponde al ETag de la respuesta, aunque la
+    escritura haya ocurrido en otro proceso sin pasar por ``invalidate``."""
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if not Config.CACHE_ENABLED:
+                return serializer.encode(await method(self, *args, **kwargs))[0]
+            key = (
+                namespace,
+                method.__name__,
+                tuple(_freeze(a) for a in args if not isinstance(a, AsyncSession)),
+                tuple(sorted((k, _freeze(v)) for k, v in kwargs.items() if not isinstance(v, AsyncSession))),
+                request_versions.get(),
+            )
+            found, value = catalog_cache.get(key)
+            if found:
+                return value
+            value, data = serializer.encode(await method(self, *args, **kwargs))
+            catalog_cache.set(key, value, tags=[(namespace, uid) for uid in _uids(data)])
+            return value
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate(*tags: Hashable) -> None:
+    """Recibe namespaces completos (``"stores"``) o entradas de un namespace que
+    contienen una fila (``("stores", company_uid)``)."""
+    catalog_cache.invalidate(*tags)
+
+
+def invalidate_principal(user_uid) -> None:
+    principal_cache.delete(("principal", str(user_uid)))
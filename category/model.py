@@ -2,12 +2,13 @@ from datetime import date, datetime
 from typing import TYPE_CHECKING, List, Optional
 import uuid
 
-from sqlmodel import TEXT, Column, Field, Relationship, SQLModel
+from sqlmodel import TEXT, Column, Field, Index, Relationship, SQLModel
 if TYPE_CHECKING:
     from ..product.model import Product
 
 class Category(SQLModel, table=True):
     __tablename__ = "categories"
+    __table_args__ = (Index("ix_categories_name_uid", "name", "uid"),)
     uid: uuid.UUID = Field(uuid.uuid4 ,nullable=False, primary_key=True)
     name: str = Field(TEXT, nullable=False, unique=True, index=True, max_length=80)
     description: str = Field(TEXT, nullable=True)
@@ -16,6 +17,7 @@ class Category(SQLModel, table=True):
     products: list["Product"] = Relationship(
         back_populates="category",
         #sa_relationship_kwargs={"lazy": "selectin", "uselist": True, "order_by": "Product.name"},
+        sa_relationship_kwargs={"lazy": "raise"},
         cascade_delete=True,
     )
 
@@ -1,6 +1,6 @@
 from typing import List
 import uuid
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -14,17 +14,24 @@ from ..errors import CategoryAlreadyExists, CategoryNotFound, InvalidUUID
 
 from .service import CategoryService
 from ..db import get_session
+from ..query_audit import query_budget
+from ..utils.pagination import Page, PageParams
+from ..utils.serialization import JSONBytesResponse
+from ..versions import conditional
 
 category_service = CategoryService()
 category_router = APIRouter()
 role_checker = RoleChecker(["admin"])
+category_versions = Depends(conditional("categories", "products"))
 
-@category_router.get("/", status_code=status.HTTP_200_OK, response_model=List[CateModel])
-async def get_all_categories(session: AsyncSession = Depends(get_session)):
-    category = await category_service.get_all_categories(session)
-    return category
+@category_router.get("/", status_code=status.HTTP_200_OK, response_model=Page[CateModel], dependencies=[category_versions])
+@query_budget(3)
+async def get_all_categories(response: Response, page: PageParams = Depends(), session: AsyncSession = Depends(get_session)):
+    category = await category_service.get_all_categories(page, session)
+    return JSONBytesResponse(category, headers=response.headers)
 
-@category_router.get("/{id}", status_code=status.HTTP_200_OK, response_model=CateModel)
+@category_router.get("/{id}", status_code=status.HTTP_200_OK, response_model=CateModel, dependencies=[category_versions])
+@query_budget(3)
 async def get_category(id:str, session: AsyncSession = Depends(get_session)):
     if not is_valid_uuid(id):
         raise InvalidUUID()
@@ -32,7 +39,8 @@ async def get_category(id:str, session: AsyncSession = Depends(get_session)):
     if category is None:
         raise CategoryNotFound()
     return category
-@category_router.get("/category/{name}", status_code=status.HTTP_200_OK, response_model=CateModel)
+@category_router.get("/category/{name}", status_code=status.HTTP_200_OK, response_model=CateModel, dependencies=[category_versions])
+@query_budget(3)
 async def get_category_by_name(name:str, session: AsyncSession = Depends(get_session)):
     category = await category_service.get_category_by_name(name=name.capitalize(), session=session)
     if category is None:
@@ -41,7 +49,7 @@ async def get_category_by_name(name:str, session: AsyncSession = Depends(get_ses
 
 @category_router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_category(category: CategoryCreateModel, session: AsyncSession = Depends(get_session), _: bool = Depends(role_checker),):
-    category_exists = await category_service.get_category_by_name(name=category.name, session=session)
+    category_exists = await category_service.get_category_by_name(name=category.name, session=session, profile="base")
     if category_exists is not None:
         raise CategoryAlreadyExists()
     new_category = await category_service.create_category(category=category, session=session)
@@ -50,10 +58,10 @@ async def create_category(category: CategoryCreateModel, session: AsyncSession =
 async def update_category(id:str, category_data: CategoryCreateModel,_: bool = Depends(role_checker), session: AsyncSession = Depends(get_session), role_checker: bool = Depends(role_checker),):
     if not is_valid_uuid(id):
         raise InvalidUUID()
-    category = await category_service.get_category_by_id(id=uuid.UUID(id, version=4), session=session)
+    category = await category_service.get_category_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
     if category is None:
         raise CategoryNotFound()
-    category_exists = await category_service.get_category_by_name(name=category_data.name, session=session)
+    category_exists = await category_service.get_category_by_name(name=category_data.name, session=session, profile="base")
     if category_exists is not None and category_exists.uid != category.uid:
         raise CategoryAlreadyExists()
     edited_category = await category_service.edit_category(category=category, category_data=category_data, session=session)
@@ -66,7 +74,7 @@ async def delete_category(
     session: AsyncSession = Depends(get_session)):    
     if not is_valid_uuid(id):
         raise InvalidUUID()
-    category = await category_service.get_category_by_id(id=uuid.UUID(id, version=4), session=session)
+    category = await category_service.get_category_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
     if category is None:
         raise CategoryNotFound()    
     await category_service.delete_category(id=uuid.UUID(id, version=4), session=session)
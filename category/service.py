@@ -3,20 +3,38 @@ from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload, joinedload
 from .model import Category
+from .schemas import CateModel
 from ..product.model import Product
+from ..store.history import delete_price_history
+from ..store.summary import refresh_price_summary
+from ..utils.pagination import Page, PageParams, keyset, make_page
+from ..utils.loaders import LoaderProfiles
+from ..utils.serialization import FastSerializer
+from ..cache import cached, invalidate
+from ..versions import bump_versions
+
+CATEGORY_PAGE_KEY = (Category.name, Category.uid)
+category_page = FastSerializer(Page[CateModel])
+
+CATEGORY_LOADERS = LoaderProfiles(
+    base=lambda: (),
+    list=lambda: (selectinload(Category.products),),
+    detail=lambda: (selectinload(Category.products),),
+)
 
 class CategoryService:
-    async def get_all_categories(self, session: AsyncSession):
-        stmt = select(Category).options(selectinload(Category.products)).order_by(Category.name)
+    @cached("categories", category_page)
+    async def get_all_categories(self, page: PageParams, session: AsyncSession) -> bytes:
+        stmt = keyset(select(Category).options(*CATEGORY_LOADERS["list"]), CATEGORY_PAGE_KEY, page)
         result = await session.exec(stmt)
-        return result.all()
-    async def get_category_by_name(self, name: str, session: AsyncSession) -> Category:
-        statement = select(Category).options(selectinload(Category.products)).where(Category.name == name)
+        return make_page(result.all(), CATEGORY_PAGE_KEY, page)
+    async def get_category_by_name(self, name: str, session: AsyncSession, profile: str = "detail") -> Category:
+        statement = select(Category).options(*CATEGORY_LOADERS[profile]).where(Category.name == name)
         result = await session.exec(statement)
         category = result.first()
         return category
-    async def get_category_by_id(self, id: uuid.UUID, session: AsyncSession) -> Category:
-        statement = select(Category).options(selectinload(Category.products)).where(Category.uid == id)
+    async def get_category_by_id(self, id: uuid.UUID, session: AsyncSession, profile: str = "detail") -> Category:
+        statement = select(Category).options(*CATEGORY_LOADERS[profile]).where(Category.uid == id)
         result = await session.exec(statement)
         category = result.first()
         return category
@@ -29,7 +47,9 @@ class CategoryService:
         if newcategory.description is not None:
             newcategory.description = newcategory.description.capitalize()
         session.add(newcategory)
+        await bump_versions(session, "categories")
         await session.commit()
+        invalidate("categories")
         await session.refresh(newcategory)
         return newcategory
     
@@ -37,16 +57,26 @@ class CategoryService:
         statement = select(Category).where(Category.uid == id)
         result = await session.exec(statement)
         category = result.first()
+        result = await session.exec(select(Product.uid).where(Product.category_uid == id))
+        product_uids = set(result.all())
+        await delete_price_history(session, product_uids=product_uids)
         await session.delete(category)
+        await refresh_price_summary(product_uids, session)
+        await bump_versions(session, "categories", "products", "stores")
         await session.commit()
+        invalidate("categories", ("stores", id))
         return
     
     async def edit_category(self, category: Category, category_data: dict, session: AsyncSession) -> Category:
+        renamed = category.name != category_data.name.capitalize()
         category.name = category_data.name.capitalize()
         category.description = category_data.description
         if category_data.description is not None:
             category.description = category_data.description.capitalize()
         session.add(category)
+        await bump_versions(session, "categories")
         await session.commit()
+        # El listado se ordena por nombre: renombrar puede mover la categoria de pagina
+        invalidate("categories" if renamed else ("categories", category.uid), ("stores", category.uid))
         await session.refresh(category)
         return category
\ No newline at end of file
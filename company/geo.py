@@ -0,0 +1,130 @@
+import math
+
+from sqlalchemy import column, event, func, literal_column, table
+
+from ..db import async_engine, on_create_schema
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+# Indice R*Tree con las compañias activas que tienen ubicacion; el id es el rowid
+# de companies. Cada punto se guarda como una caja degenerada (min == max). El
+# R*Tree usa float32 y redondea las cajas hacia afuera, asi que el prefiltro puede
+# dejar pasar algun punto de mas pero nunca descarta uno valido. Como con
+# products_fts, despues de un VACUUM hay que ejecutar
+# ``python manage.py rebuild-location-index``.
+LOCATION_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS companies_geo USING rtree(
+        id, min_lat, max_lat, min_lon, max_lon
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_geo_ai AFTER INSERT ON companies
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL AND NOT new.is_deleted BEGIN
+        INSERT INTO companies_geo (id, min_lat, max_lat, min_lon, max_lon)
+        VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_geo_ad AFTER DELETE ON companies BEGIN
+        DELETE FROM companies_geo WHERE id = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_geo_au AFTER UPDATE OF latitude, longitude, is_deleted ON companies BEGIN
+        DELETE FROM companies_geo WHERE id = old.rowid;
+        INSERT INTO companies_geo (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL AND NOT new.is_deleted;
+    END
+    """,
+]
+
+REBUILD_SQL = [
+    "DELETE FROM companies_geo",
+    """
+    INSERT INTO companies_geo (id, min_lat, max_lat, min_lon, max_lon)
+    SELECT rowid, latitude, latitude, longitude, longitude FROM companies
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND NOT is_deleted
+    """,
+]
+
+companies_geo = table(
+    "companies_geo", column("id"), column("min_lat"), column("max_lat"), column("min_lon"), column("max_lon")
+)
+geo_join = companies_geo.c.id == literal_column("companies.rowid")
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float | None:
+    """Distancia en km sobre la esfera; registrada en SQLite como ``haversine_km``."""
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distance_km(lat: float, lon: float, latitude, longitude):
+    return func.haversine_km(lat, lon, latitude, longitude)
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Caja (min_lat, max_lat, min_lon, max_lon) que contiene el circulo de ``radius_km``.
+
+    Cerca de los polos o si la caja cruza el antimeridiano se usa todo el rango de
+    longitudes: es mas lento pero sigue siendo correcto tras el filtro por distancia.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = max(-90.0, lat - dlat), min(90.0, lat + dlat)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6:
+        return min_lat, max_lat, -180.0, 180.0
+    dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+    if lon - dlon < -180.0 or lon + dlon > 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, lon - dlon, lon + dlon
+
+
+def in_bounding_box(lat: float, lon: float, radius_km: float):
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    return (
+        (companies_geo.c.max_lat >= min_lat)
+        & (companies_geo.c.min_lat <= max_lat)
+        & (companies_geo.c.max_lon >= min_lon)
+        & (companies_geo.c.min_lon <= max_lon)
+    )
+
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def register_geo_functions(dbapi_connection, connection_record):
+    if async_engine.dialect.name != "sqlite":
+        return
+    # aiosqlite expone create_function como corrutina en su propio hilo
+    dbapi_connection.run_async(
+        lambda connection: connection.create_function("haversine_km", 4, haversine_km, deterministic=True)
+    )
+
+
+@on_create_schema
+def create_location_index(connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(companies)")}
+    if not {"latitude", "longitude"} <= columns:
+        # Base anterior a la migracion 3: la migracion agrega las columnas y vuelve a llamar
+        return
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'companies_geo'"
+    ).first()
+    for ddl in LOCATION_DDL:
+        connection.exec_driver_sql(ddl)
+    if exists is None:
+        rebuild_location_index(connection)
+
+
+def rebuild_location_index(connection) -> None:
+    for statement in REBUILD_SQL:
+        connection.exec_driver_sql(statement)
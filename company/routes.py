@@ -1,6 +1,6 @@
 from typing import List
 import uuid
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -8,7 +8,7 @@ from ..user.schemas import Role
 
 from .schemas import CompanyModel, CompanyCreateModel, CompanyEditModel
 
-from ..auth.dependencies import RoleChecker, get_current_user
+from ..auth.dependencies import RoleChecker, get_current_principal
 
 from ..utils.uuid_validator import is_valid_uuid
 
@@ -16,17 +16,24 @@ from ..errors import CompanyAlreadyExists, CompanyNotFound, InvalidUUID
 
 from .service import CompanyService
 from ..db import get_session
+from ..query_audit import query_budget
+from ..utils.pagination import Page, PageParams
+from ..utils.serialization import JSONBytesResponse
+from ..versions import conditional
 
 company_service = CompanyService()
 company_router = APIRouter()
 role_checker = RoleChecker([Role.admin.value, Role.partner.value, Role.user.value])
+company_versions = Depends(conditional("companies", "users"))
 
-@company_router.get("/", status_code=status.HTTP_200_OK, response_model=List[CompanyModel])
-async def get_all_companies(session: AsyncSession = Depends(get_session)):
-    company = await company_service.get_all_companies(session)
-    return company
+@company_router.get("/", status_code=status.HTTP_200_OK, response_model=Page[CompanyModel], dependencies=[company_versions])
+@query_budget(4)
+async def get_all_companies(response: Response, page: PageParams = Depends(), session: AsyncSession = Depends(get_session)):
+    company = await company_service.get_all_companies(page, session)
+    return JSONBytesResponse(company, headers=response.headers)
 
-@company_router.get("/{id}", status_code=status.HTTP_200_OK, response_model=CompanyModel)
+@company_router.get("/{id}", status_code=status.HTTP_200_OK, response_model=CompanyModel, dependencies=[company_versions])
+@query_budget(4)
 async def get_company(id:str, session: AsyncSession = Depends(get_session)):
     if not is_valid_uuid(id):
         raise InvalidUUID()
@@ -34,7 +41,8 @@ async def get_company(id:str, session: AsyncSession = Depends(get_session)):
     if company is None:
         raise CompanyNotFound()
     return company
-@company_router.get("/company/{name}", status_code=status.HTTP_200_OK, response_model=CompanyModel)
+@company_router.get("/company/{name}", status_code=status.HTTP_200_OK, response_model=CompanyModel, dependencies=[company_versions])
+@query_budget(4)
 async def get_company_by_name(name:str, session: AsyncSession = Depends(get_session)):
     company = await company_service.get_company_by_name(name=name.capitalize(), session=session)
     if company is None:
@@ -45,11 +53,11 @@ async def get_company_by_name(name:str, session: AsyncSession = Depends(get_sess
 async def create_company(
     company: CompanyCreateModel, 
     session: AsyncSession = Depends(get_session),
-    user_data=Depends(get_current_user),
+    user_data=Depends(get_current_principal),
     _: bool = Depends(role_checker),
     ):
     print("antes de la query")
-    company_exists = await company_service.get_company_by_name(name=company.name, session=session)
+    company_exists = await company_service.get_company_by_name(name=company.name, session=session, profile="base")
     if company_exists is not None:
         print("XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX")
         raise CompanyAlreadyExists()
@@ -60,10 +68,10 @@ async def create_company(
 async def update_company(id:str, company_data: CompanyEditModel,_: bool = Depends(role_checker), session: AsyncSession = Depends(get_session), role_checker: bool = Depends(role_checker),):
     if not is_valid_uuid(id):
         raise InvalidUUID()
-    company = await company_service.get_company_by_id(id=uuid.UUID(id, version=4), session=session)
+    company = await company_service.get_company_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
     if company is None:
         raise CompanyNotFound()
-    company_exists = await company_service.get_company_by_name(name=company_data.name, session=session)
+    company_exists = await company_service.get_company_by_name(name=company_data.name, session=session, profile="base")
     if company_exists is not None and company_exists.uid != company.uid:
         raise CompanyAlreadyExists()
     edited_category = await company_service.edit_company(company=company, company_data=company_data, session=session)
@@ -76,7 +84,7 @@ async def delete_company(
     session: AsyncSession = Depends(get_session)):    
     if not is_valid_uuid(id):
         raise InvalidUUID()
-    company = await company_service.get_company_by_id(id=uuid.UUID(id, version=4), session=session)
+    company = await company_service.get_company_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
     if company is None:
         raise CompanyNotFound()    
     await company_service.delete_company(id=uuid.UUID(id, version=4), session=session)
@@ -1,7 +1,7 @@
 from typing import Optional, TYPE_CHECKING
 import uuid
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from sqlmodel import Field
 
 from ..store.schemas import StoreCompanyModel
@@ -11,6 +11,14 @@ from ..user.schemas import UserModel
 class CompanyEditModel(BaseModel):
     name: str = Field(max_length=100, min_length=2) 
     description: str
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def check_location(self):
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("La ubicacion necesita latitud y longitud")
+        return self
 
 class CompanyCreateModel(CompanyEditModel):
     partner_uid: Optional[uuid.UUID] = None
@@ -21,6 +29,8 @@ class CompanyModel(BaseModel):
     description: str
     user_uid: Optional[uuid.UUID] = Field(exclude=True)
     partner_uid: Optional[uuid.UUID] = Field(exclude=True)
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
     partner: Optional[UserModel]
     user: Optional[UserModel]
     
@@ -31,6 +41,10 @@ class CompanyStoreModel(BaseModel):
     partner: Optional[UserModel]
     store: list[StoreCompanyModel]
 
+class CompanyCatalogModel(CompanyStoreModel):
+    """Compañia con una pagina de su catalogo; ``next_cursor`` pide la siguiente."""
+    next_cursor: Optional[str] = None
+
 #class CompanyStoreModel(CompanyModel):
 #    stores: list[StoreCompanyModel]
 #    partner: Optional[UserModel]
\ No newline at end of file
@@ -1,21 +1,39 @@
 import uuid
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import selectinload
 from .model import Company
-from .schemas import CompanyCreateModel
+from .schemas import CompanyCreateModel, CompanyModel
+from ..store.model import Store
+from ..store.summary import refresh_price_summary
+from ..utils.pagination import Page, PageParams, keyset, make_page
+from ..utils.loaders import LoaderProfiles
+from ..utils.serialization import FastSerializer
+from ..cache import cached, invalidate
+from ..versions import bump_versions
+
+COMPANY_PAGE_KEY = (Company.name, Company.uid)
+company_page = FastSerializer(Page[CompanyModel])
+
+COMPANY_LOADERS = LoaderProfiles(
+    base=lambda: (),
+    list=lambda: (selectinload(Company.partner), selectinload(Company.user)),
+    detail=lambda: (selectinload(Company.partner), selectinload(Company.user)),
+)
 
 class CompanyService:
-    async def get_all_companies(self, session: AsyncSession):
-        stmt = select(Company).where(Company.is_deleted == False).order_by(Company.name)
+    @cached("companies", company_page)
+    async def get_all_companies(self, page: PageParams, session: AsyncSession) -> bytes:
+        stmt = keyset(select(Company).options(*COMPANY_LOADERS["list"]).where(Company.is_deleted == False), COMPANY_PAGE_KEY, page)
         result = await session.exec(stmt)
-        return result.all()
-    async def get_company_by_name(self, name: str, session: AsyncSession) -> Company:
-        statement = select(Company).where(Company.name == name)
+        return make_page(result.all(), COMPANY_PAGE_KEY, page)
+    async def get_company_by_name(self, name: str, session: AsyncSession, profile: str = "detail") -> Company:
+        statement = select(Company).options(*COMPANY_LOADERS[profile]).where(Company.name == name)
         result = await session.exec(statement)
         company = result.first()
         return company
-    async def get_company_by_id(self, id: uuid.UUID, session: AsyncSession) -> Company:
-        statement = select(Company).where(Company.uid == id)
+    async def get_company_by_id(self, id: uuid.UUID, session: AsyncSession, profile: str = "detail") -> Company:
+        statement = select(Company).options(*COMPANY_LOADERS[profile]).where(Company.uid == id)
         result = await session.exec(statement)
         company = result.first()
         return company
@@ -30,7 +48,9 @@ class CompanyService:
         newcompany.user_uid = user_data.uid
         if newcompany.partner_uid is None: newcompany.partner_uid = newcompany.user_uid
         session.add(newcompany)
+        await bump_versions(session, "companies")
         await session.commit()
+        invalidate("companies", "stores")
         return company
     
     async def delete_company(self, id: uuid.UUID, session: AsyncSession) -> None:
@@ -39,15 +59,31 @@ class CompanyService:
         company = result.first()
         company.is_deleted = True
         session.add(company)
+        # Sus ofertas dejan de contar en el resumen de precios de cada producto
+        products = await session.exec(select(Store.product_uid).where(Store.company_uid == id))
+        await refresh_price_summary(set(products.all()), session)
+        await bump_versions(session, "companies", "stores")
         await session.commit()
+        invalidate("companies", "stores")
         await session.refresh(company)
     
     async def edit_company(self, company: Company, company_data: dict, session: AsyncSession) -> Company:
+        renamed = company.name != company_data.name.capitalize()
         company.name = company_data.name.capitalize()
         company.description = company_data.description
+        # La ubicacion solo cambia si el cliente la envio; null explicito la borra
+        if {"latitude", "longitude"} & company_data.model_fields_set:
+            company.latitude = company_data.latitude
+            company.longitude = company_data.longitude
         if company_data.description is not None:
             company.description = company_data.description.capitalize()
         session.add(company)
+        await bump_versions(session, "companies")
         await session.commit()
+        # Los listados se ordenan por nombre: renombrar puede mover la compañia de pagina
+        if renamed:
+            invalidate("companies", "stores")
+        else:
+            invalidate(("companies", company.uid), ("stores", company.uid))
         await session.refresh(company)
         return company
\ No newline at end of file
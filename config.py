@@ -7,6 +7,18 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str
     REDIS_URL: str = "redis://localhost:6379/0"
+    TOKEN_REVOCATION_BACKEND: str = "auto"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_LOGIN: str = "20/minute"
+    RATE_LIMIT_LOGIN_EMAIL: str = "5/minute"
+    RATE_LIMIT_SIGNUP: str = "5/minute"
+    RATE_LIMIT_SIGNUP_EMAIL: str = "3/hour"
+    RATE_LIMIT_PASSWORD_RESET: str = "5/minute"
+    RATE_LIMIT_PASSWORD_RESET_EMAIL: str = "3/hour"
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
     MAIL_USERNAME: str
     MAIL_PASSWORD: str
     MAIL_FROM: str
@@ -17,7 +29,47 @@ class Settings(BaseSettings):
     MAIL_SSL_TLS: bool = False
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+    MAIL_IDLE_TIMEOUT: float = 60
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_POLL_INTERVAL: float = 5
+    OUTBOX_LEASE_SECONDS: int = 120
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_BACKOFF_BASE: float = 30
+    OUTBOX_BACKOFF_MAX: float = 3600
     DOMAIN: str
+    ASYNC_DATABASE_URL: str = "sqlite+aiosqlite:///database.db"
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    # SQLite no pierde conexiones: el ping solo tiene sentido con un servidor remoto
+    DB_POOL_PRE_PING: bool = False
+    DB_MIGRATE_ON_STARTUP: bool = False
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHE_SIZE: int = -64000
+    CACHE_ENABLED: bool = True
+    FAST_JSON_RESPONSES: bool = True
+    METRICS_ENABLED: bool = True
+    ACCESS_LOG_ENABLED: bool = True
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_QUEUE_SIZE: int = 10000
+    QUERY_AUDIT_ENABLED: bool = False
+    QUERY_BUDGET_MODE: str = "log"
+    QUERY_AUDIT_REPEAT_THRESHOLD: int = 3
+    CACHE_MAXSIZE: int = 1024
+    CACHE_TTL: int = 60
+    TOKEN_CACHE_MAXSIZE: int = 4096
+    PRINCIPAL_CACHE_MAXSIZE: int = 4096
+    PRINCIPAL_CACHE_TTL: int = 30
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_MAX_ERRORS: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+    PRICE_HISTORY_RAW_DAYS: int = 90
+    PRICE_HISTORY_RETENTION_DAYS: int = 730
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -1,25 +1,96 @@
-from sqlalchemy.ext.asyncio import AsyncEngine
-from sqlalchemy.orm import sessionmaker
-from sqlmodel import SQLModel, create_engine
+import time
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession, Session
 
 from .config import Config
+from .metrics import DB_POOL_CHECKOUT_WAIT, DB_STATEMENT_DURATION
+from .query_audit import query_log
+
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Pool que mide cuanto espera cada checkout (incluye abrir conexiones nuevas)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
 
 URL = Config.DATABASE_URL
-engine = create_engine("sqlite:///database2.db", echo=False)
-async_engine = create_async_engine("sqlite+aiosqlite:///database.db", echo=False)
+async_engine = create_async_engine(
+    Config.ASYNC_DATABASE_URL,
+    poolclass=TimedQueuePool,
+    echo=Config.DB_ECHO,
+    pool_size=Config.DB_POOL_SIZE,
+    max_overflow=Config.DB_MAX_OVERFLOW,
+    pool_timeout=Config.DB_POOL_TIMEOUT,
+    pool_pre_ping=Config.DB_POOL_PRE_PING,
+)
 #async_engine = AsyncEngine(create_engine(url=URL))
 
-async def init_db() -> None:
-    async with async_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+
+@event.listens_for(async_engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # Los PRAGMA son por conexion, se aplican una sola vez cuando el pool la abre
+    if async_engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={Config.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={Config.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT)}")
+    cursor.execute(f"PRAGMA mmap_size={int(Config.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size={int(Config.SQLITE_CACHE_SIZE)}")
+    cursor.close()
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    log = query_log.get()
+    if log is not None:
+        log.add(statement)
+    conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+def time_query(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_started", None)
+    if started is not None:
+        DB_STATEMENT_DURATION.observe(time.perf_counter() - started)
+
+
+async_session = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+schema_hooks: list[Callable] = []
+
+
+def on_create_schema(hook: Callable) -> Callable:
+    """Registra DDL adicional (tablas virtuales, triggers) que create_all no maneja."""
+    schema_hooks.append(hook)
+    return hook
+
+
+def create_schema(connection) -> None:
+    SQLModel.metadata.create_all(connection)
+    # create_all no agrega indices nuevos a tablas que ya existen
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    for hook in schema_hooks:
+        hook(connection)
 
 #typeignore recordatorio
 async def get_session() -> AsyncSession: # type: ignore
-    Session = sessionmaker(
-        bind=async_engine, class_=AsyncSession, expire_on_commit=False
-    )
-
-    async with Session() as session:
-        yield session
\ No newline at end of file
+    async with async_session() as session:
+        yield session
@@ -1,6 +1,7 @@
+import math
 from typing import Any, Callable
 from fastapi.requests import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi import FastAPI, status
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -14,6 +15,11 @@ class InvalidUUID(MyPrice):
 
     pass
 
+class InvalidCursor(MyPrice):
+    """El usuario ha proporcionado un cursor de paginación invalido."""
+
+    pass
+
 class InvalidToken(MyPrice):
     """El usuario ha proporcionado un token invalido."""
 
@@ -112,17 +118,51 @@ class UserNotFound(MyPrice):
     pass
 
 
+class UnsupportedMediaType(MyPrice):
+    """El cuerpo de la petición no tiene un formato soportado."""
+
+    pass
+
+
+class PasswordHashingBusy(MyPrice):
+    """Hay demasiadas operaciones de hashing de contraseñas en cola."""
+
+    pass
+
+
+class NotModified(MyPrice):
+    """El cliente ya tiene la version actual del recurso (If-None-Match)."""
+
+    def __init__(self, headers: dict[str, str]) -> None:
+        super().__init__()
+        self.headers = headers
+
+
+class QueryBudgetExceeded(MyPrice):
+    """La ruta ejecuto mas consultas SQL que su presupuesto (solo con QUERY_AUDIT_ENABLED)."""
+
+    pass
+
+
+class RateLimitExceeded(MyPrice):
+    """El cliente agoto los intentos permitidos para la ruta."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__()
+        self.retry_after = retry_after
+
+
 class AccountNotVerified(Exception):
     """Cuentan no verificada"""
     pass
 
 def create_exception_handler(
-    status_code: int, initial_detail: Any
+    status_code: int, initial_detail: Any, headers: dict[str, str] | None = None
 ) -> Callable[[Request, Exception], JSONResponse]:
 
     async def exception_handler(request: Request, exc: MyPrice):
 
-        return JSONResponse(content=initial_detail, status_code=status_code)
+        return JSONResponse(content=initial_detail, status_code=status_code, headers=headers)
 
     return exception_handler
 
@@ -348,6 +388,67 @@ def register_all_errors(app: FastAPI):
         )
     )
 
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Cursor de paginación invalido",
+                "error_code": "invalid_cursor",
+            },
+        )
+    )
+
+    app.add_exception_handler(
+        UnsupportedMediaType,
+        create_exception_handler(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            initial_detail={
+                "message": "Formato no soportado, usa text/csv o application/x-ndjson",
+                "error_code": "unsupported_media_type",
+            },
+        )
+    )
+
+    app.add_exception_handler(
+        PasswordHashingBusy,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "message": "El servidor esta ocupado, intenta de nuevo en unos segundos",
+                "error_code": "server_busy",
+            },
+            headers={"Retry-After": "1"},
+        )
+    )
+
+    app.add_exception_handler(
+        QueryBudgetExceeded,
+        create_exception_handler(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            initial_detail={
+                "message": "La ruta excedio su presupuesto de consultas SQL",
+                "error_code": "query_budget_exceeded",
+            },
+        )
+    )
+
+    @app.exception_handler(NotModified)
+    async def not_modified(request: Request, exc: NotModified):
+        # Un 304 no lleva cuerpo, solo los validadores
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=exc.headers)
+
+    @app.exception_handler(RateLimitExceeded)
+    async def rate_limit_exceeded(request: Request, exc: RateLimitExceeded):
+        return JSONResponse(
+            content={
+                "message": "Demasiados intentos, intenta de nuevo mas tarde",
+                "error_code": "rate_limit_exceeded",
+            },
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        )
+
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
 
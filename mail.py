@@ -1,36 +1,99 @@
-from fastapi_mail import FastMail, ConnectionConfig, MessageSchema, MessageType
+from email.message import EmailMessage
+from email.utils import formataddr
+from functools import cache
+
+import aiosmtplib
 from .config import Config
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent
 
 
-mail_config = ConnectionConfig(
-    MAIL_USERNAME=Config.MAIL_USERNAME,
-    MAIL_PASSWORD=Config.MAIL_PASSWORD,
-    MAIL_FROM=Config.MAIL_FROM,
-    MAIL_PORT=587,
-    MAIL_SERVER=Config.MAIL_SERVER,
-    MAIL_FROM_NAME=Config.MAIL_FROM_NAME,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    #TEMPLATE_FOLDER=Path(BASE_DIR, "templates"),
-)
+@cache
+def get_mail():
+    # fastapi_mail arrastra httpx, redis, dns y rich: se importa solo si se usa
+    from fastapi_mail import FastMail, ConnectionConfig
+
+    mail_config = ConnectionConfig(
+        MAIL_USERNAME=Config.MAIL_USERNAME,
+        MAIL_PASSWORD=Config.MAIL_PASSWORD,
+        MAIL_FROM=Config.MAIL_FROM,
+        MAIL_PORT=Config.MAIL_PORT,
+        MAIL_SERVER=Config.MAIL_SERVER,
+        MAIL_FROM_NAME=Config.MAIL_FROM_NAME,
+        MAIL_STARTTLS=Config.MAIL_STARTTLS,
+        MAIL_SSL_TLS=Config.MAIL_SSL_TLS,
+        USE_CREDENTIALS=Config.USE_CREDENTIALS,
+        VALIDATE_CERTS=Config.VALIDATE_CERTS,
+        #TEMPLATE_FOLDER=Path(BASE_DIR, "templates"),
+    )
+    return FastMail(config=mail_config)
+
+
+def build_message(recipients: list[str], subject: str, body: str, subtype: str = "html") -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((Config.MAIL_FROM_NAME, Config.MAIL_FROM))
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body, subtype=subtype)
+    return message
+
 
+class SMTPSender:
+    """Envia mensajes reutilizando una sola conexion SMTP. La abre en el primer
+    envio y la reabre si el servidor la cerro."""
 
-mail = FastMail(config=mail_config)
+    def __init__(self) -> None:
+        self._smtp: aiosmtplib.SMTP | None = None
+
+    @property
+    def connected(self) -> bool:
+        return self._smtp is not None and self._smtp.is_connected
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=Config.MAIL_SERVER,
+            port=Config.MAIL_PORT,
+            username=Config.MAIL_USERNAME if Config.USE_CREDENTIALS else None,
+            password=Config.MAIL_PASSWORD if Config.USE_CREDENTIALS else None,
+            use_tls=Config.MAIL_SSL_TLS,
+            start_tls=Config.MAIL_STARTTLS,
+            validate_certs=Config.VALIDATE_CERTS,
+        )
+        await smtp.connect()
+        self._smtp = smtp
+        return smtp
+
+    async def send(self, message: EmailMessage) -> None:
+        if not self.connected:
+            await self._connect()
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # El servidor cerro la conexion inactiva: se reintenta una vez con una nueva
+            await self._connect()
+            await self._smtp.send_message(message)
+
+    async def close(self) -> None:
+        if self.connected:
+            try:
+                await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                self._smtp.close()
+        self._smtp = None
 
 
 async def send_email(recipients: list[str], subject: str, body: str):
+    from fastapi_mail import MessageSchema, MessageType
+
     message = MessageSchema(
         recipients=recipients, subject=subject, body=body, subtype=MessageType.html
     )
-    fm = FastMail(mail_config)
-    await fm.send_message(message)
+    await get_mail().send_message(message)
 
 async def send_email_async(subject: str, email_to: str, body: dict):
+    from fastapi_mail import MessageSchema
+
     message = MessageSchema(
         subject=subject,
         recipients=[email_to],
@@ -38,5 +101,4 @@ async def send_email_async(subject: str, email_to: str, body: dict):
         subtype='html',
     )
     
-    fm = FastMail(mail_config)
-    await fm.send_message(message, template_name='email.html')
\ No newline at end of file
+    await get_mail().send_message(message, template_name='email.html')
@@ -0,0 +1,93 @@
+"""Comandos de mantenimiento de la base de datos.
+
+Uso, desde el directorio del proyecto: ``python manage.py <comando> [opciones]``
+"""
+import argparse
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+if __name__ == "__main__" and not __package__:
+    # Ejecutado como script: se importa el paquete para que funcionen los imports relativos
+    _root = Path(__file__).resolve().parent
+    sys.path.insert(0, str(_root.parent))
+    __package__ = _root.name
+    importlib.import_module(__package__)
+
+from .config import Config
+from .db import async_engine, async_session
+from .migrations import latest_version, migrate_db
+from .company.geo import rebuild_location_index
+from .product.search import rebuild_search_index
+from .store.service import StoreService
+from .store.summary import refresh_price_summary
+from .versions import bump_versions
+
+
+async def migrate(args) -> None:
+    applied = await migrate_db()
+    if applied:
+        print(f"Migraciones aplicadas: {', '.join(map(str, applied))}")
+    print(f"Esquema en la version {latest_version()}")
+
+
+async def prune_history(args) -> None:
+    async with async_session() as session:
+        result = await StoreService().prune_price_history(args.raw_days, args.retention_days, session)
+    print(f"price_history: {result['expired']} registros vencidos borrados, {result['downsampled']} compactados en price_history_daily")
+
+
+async def rebuild_price_summary(args) -> None:
+    async with async_session() as session:
+        await refresh_price_summary(None, session)
+        await bump_versions(session, "stores")
+        await session.commit()
+    print("product_price_summary reconstruido")
+
+
+async def rebuild_search(args) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(rebuild_search_index)
+    print("products_fts reconstruido")
+
+
+async def rebuild_location(args) -> None:
+    async with async_engine.begin() as conn:
+        await conn.run_sync(rebuild_location_index)
+    print("companies_geo reconstruido")
+
+
+async def run(args) -> None:
+    await args.handler(args)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="manage.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Aplica las migraciones pendientes del esquema")
+    migrate_parser.set_defaults(handler=migrate)
+
+    prune = commands.add_parser("prune-history", help="Aplica la retencion y reduccion del historial de precios")
+    prune.add_argument("--raw-days", type=int, default=Config.PRICE_HISTORY_RAW_DAYS,
+                       help="Dias que se conservan con todos los cambios")
+    prune.add_argument("--retention-days", type=int, default=Config.PRICE_HISTORY_RETENTION_DAYS,
+                       help="Dias que se conserva cualquier registro")
+    prune.set_defaults(handler=prune_history)
+
+    rebuild = commands.add_parser("rebuild-price-summary", help="Reconstruye product_price_summary desde las ofertas activas")
+    rebuild.set_defaults(handler=rebuild_price_summary)
+
+    search = commands.add_parser("rebuild-search-index", help="Reconstruye products_fts; necesario despues de un VACUUM")
+    search.set_defaults(handler=rebuild_search)
+
+    location = commands.add_parser("rebuild-location-index", help="Reconstruye companies_geo; necesario despues de un VACUUM")
+    location.set_defaults(handler=rebuild_location)
+
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
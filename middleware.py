@@ -3,26 +3,109 @@ from fastapi.requests import Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+import json
 import logging
+import queue
+import random
+import sys
+import time
+
+from .config import Config
+from .query_audit import QueryLog, query_auditor, query_log
+from .metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
 
 logger = logging.getLogger("uvicorn.access")
 logger.disabled = True
 
+access_logger = logging.getLogger("miprecio.access")
+access_logger.setLevel(logging.INFO)
+access_logger.propagate = False
 
-def register_middleware(app: FastAPI):
 
-    @app.middleware("http")
-    async def custom_logging(request: Request, call_next):
-        start_time = time.time()
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloquea: si la cola esta llena descarta el registro."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # El registro ya trae su linea JSON en msg; se evita el format de QueueHandler
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+access_queue: queue.Queue = queue.Queue(maxsize=Config.ACCESS_LOG_QUEUE_SIZE)
+access_handler = DroppingQueueHandler(access_queue)
+access_logger.addHandler(access_handler)
+access_listener = QueueListener(access_queue, logging.StreamHandler(sys.stdout))
 
-        response = await call_next(request)
-        processing_time = time.time() - start_time
 
-        message = f"{request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} completed after {processing_time}s"
+_listener_running = False
 
-        print(message)
-        return response
+
+def start_access_log() -> None:
+    """Arranca el hilo que escribe el log de acceso; se llama desde el lifespan."""
+    global _listener_running
+    if not _listener_running:
+        access_listener.start()
+        _listener_running = True
+
+
+def stop_access_log() -> None:
+    """Detiene el hilo despues de vaciar la cola."""
+    global _listener_running
+    if _listener_running:
+        access_listener.stop()
+        _listener_running = False
+
+
+def register_middleware(app: FastAPI):
+
+    @app.middleware("http")
+    async def custom_logging(request: Request, call_next):
+        if not (Config.ACCESS_LOG_ENABLED or Config.METRICS_ENABLED or Config.QUERY_AUDIT_ENABLED):
+            return await call_next(request)
+        log = QueryLog(request.scope, audit=Config.QUERY_AUDIT_ENABLED)
+        token = query_log.set(log)
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter_ns()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            query_log.reset(token)
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = request.scope.get("route")
+            if log.statements is not None and route is not None:
+                query_auditor.record(f"{request.method} {route.path}", log)
+            if Config.METRICS_ENABLED:
+                # Sin ruta (404) se agrupa para no crear una serie por cada path
+                HTTP_REQUEST_DURATION.observe(
+                    elapsed / 1_000_000_000, request.method, route.path if route is not None else "unmatched", str(status_code)
+                )
+            # Los 2xx se muestrean; errores y redirecciones se registran siempre
+            if Config.ACCESS_LOG_ENABLED and (not (200 <= status_code < 300) or random.random() < Config.ACCESS_LOG_SAMPLE_RATE):
+                access_logger.info(json.dumps({
+                    "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                    "client": request.client.host if request.client else None,
+                    "method": request.method,
+                    "route": route.path if route is not None else None,
+                    "path": request.url.path,
+                    "status": status_code,
+                    "duration_ms": round(elapsed / 1_000_000, 3),
+                    "queries": log.count,
+                }, ensure_ascii=False))
 
     app.add_middleware(
         CORSMiddleware,
@@ -35,4 +118,4 @@ def register_middleware(app: FastAPI):
     app.add_middleware(
         TrustedHostMiddleware,
         allowed_hosts=["localhost", "127.0.0.1" ,"https://mi-precio.onrender.com", "mi-precio.onrender.com","0.0.0.0"],
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,404 @@
+"""Migraciones versionadas del esquema.
+
+La version aplicada vive en ``PRAGMA user_version`` de la base SQLite, asi que
+comprobar si hay migraciones pendientes cuesta una sola consulta. Se aplican con
+``python manage.py migrate`` o, si ``DB_MIGRATE_ON_STARTUP`` esta activo, al
+arrancar la aplicacion.
+
+Para cambiar el esquema se agrega una funcion con ``@migration(<siguiente>, ...)``;
+nunca se edita una migracion ya publicada.
+"""
+import logging
+from typing import Callable
+
+from sqlalchemy import Connection
+
+from .db import async_engine, create_schema
+
+logger = logging.getLogger("miprecio.migrations")
+
+MIGRATIONS: dict[int, tuple[str, Callable[[Connection], None]]] = {}
+
+
+def migration(version: int, description: str):
+    def register(step: Callable[[Connection], None]) -> Callable[[Connection], None]:
+        if version in MIGRATIONS:
+            raise ValueError(f"Migracion {version} duplicada")
+        MIGRATIONS[version] = (description, step)
+        return step
+
+    return register
+
+
+def execute(connection: Connection, statements: list[str]) -> None:
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+def table_exists(connection: Connection, name: str) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).first() is not None
+
+
+# Las migraciones usan DDL literal, no los modelos ni los hooks de create_schema:
+# lo que crea una migracion publicada no debe cambiar cuando cambian los modelos.
+# Todo es IF NOT EXISTS porque las bases anteriores a las migraciones (version 0)
+# ya tienen parte del esquema.
+BASE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS email_outbox (
+        id INTEGER NOT NULL,
+        recipients JSON NOT NULL,
+        subject VARCHAR NOT NULL,
+        body VARCHAR NOT NULL,
+        subtype VARCHAR NOT NULL,
+        status VARCHAR NOT NULL,
+        attempts INTEGER NOT NULL,
+        next_attempt_at DATETIME NOT NULL,
+        last_error VARCHAR,
+        created_at DATETIME NOT NULL,
+        sent_at DATETIME,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt ON email_outbox (status, next_attempt_at)",
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        uid CHAR(32) NOT NULL,
+        email VARCHAR NOT NULL,
+        fullname VARCHAR NOT NULL,
+        role VARCHAR NOT NULL,
+        is_verified BOOLEAN NOT NULL,
+        password VARCHAR NOT NULL,
+        created_at DATETIME,
+        update_at DATETIME,
+        PRIMARY KEY (uid)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS price_history (
+        id INTEGER NOT NULL,
+        product_uid CHAR(32) NOT NULL,
+        company_uid CHAR(32) NOT NULL,
+        price FLOAT NOT NULL,
+        wholesale_price FLOAT,
+        discount INTEGER,
+        changed_at DATETIME NOT NULL,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_price_history_product_company_changed ON price_history (product_uid, company_uid, changed_at)",
+    """
+    CREATE TABLE IF NOT EXISTS resource_versions (
+        name VARCHAR NOT NULL,
+        version INTEGER NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (name)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        uid CHAR(32) NOT NULL,
+        name VARCHAR(80) NOT NULL,
+        description VARCHAR,
+        created_at DATETIME,
+        update_at DATETIME,
+        PRIMARY KEY (uid)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_categories_name ON categories (name)",
+    "CREATE INDEX IF NOT EXISTS ix_categories_name_uid ON categories (name, uid)",
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        uid CHAR(32) NOT NULL,
+        name VARCHAR(80) NOT NULL,
+        price FLOAT NOT NULL,
+        description VARCHAR,
+        user_uid CHAR(32) NOT NULL,
+        category_uid CHAR(32) NOT NULL,
+        created_at DATETIME,
+        update_at DATETIME,
+        PRIMARY KEY (uid),
+        FOREIGN KEY(user_uid) REFERENCES users (uid),
+        FOREIGN KEY(category_uid) REFERENCES categories (uid)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_products_name ON products (name)",
+    "CREATE INDEX IF NOT EXISTS ix_products_update_at ON products (update_at)",
+    "CREATE INDEX IF NOT EXISTS ix_products_name_uid ON products (name, uid)",
+    """
+    CREATE TABLE IF NOT EXISTS companies (
+        uid CHAR(32) NOT NULL,
+        name VARCHAR(100) NOT NULL,
+        description VARCHAR,
+        is_deleted BOOLEAN NOT NULL,
+        user_uid CHAR(32) NOT NULL,
+        partner_uid CHAR(32) NOT NULL,
+        created_at DATETIME,
+        deleted_at DATETIME,
+        update_at DATETIME,
+        PRIMARY KEY (uid),
+        FOREIGN KEY(user_uid) REFERENCES users (uid),
+        FOREIGN KEY(partner_uid) REFERENCES users (uid)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_companies_is_deleted_name_uid ON companies (is_deleted, name, uid)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_companies_name ON companies (name)",
+    """
+    CREATE TABLE IF NOT EXISTS stores (
+        uid CHAR(32) NOT NULL,
+        price FLOAT NOT NULL,
+        wholesale_price FLOAT,
+        discount INTEGER,
+        user_uid CHAR(32) NOT NULL,
+        product_uid CHAR(32) NOT NULL,
+        company_uid CHAR(32) NOT NULL,
+        is_deleted BOOLEAN,
+        created_at DATETIME,
+        update_at DATETIME,
+        PRIMARY KEY (uid),
+        FOREIGN KEY(user_uid) REFERENCES users (uid),
+        FOREIGN KEY(product_uid) REFERENCES products (uid),
+        FOREIGN KEY(company_uid) REFERENCES companies (uid)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_stores_update_at ON stores (update_at)",
+    "CREATE INDEX IF NOT EXISTS ix_stores_product_uid_is_deleted_price ON stores (product_uid, is_deleted, price)",
+    """
+    CREATE TABLE IF NOT EXISTS product_price_summary (
+        product_uid CHAR(32) NOT NULL,
+        offers_count INTEGER NOT NULL,
+        min_price FLOAT NOT NULL,
+        max_price FLOAT NOT NULL,
+        avg_price FLOAT NOT NULL,
+        best_company_uid CHAR(32) NOT NULL,
+        updated_at DATETIME NOT NULL,
+        PRIMARY KEY (product_uid),
+        FOREIGN KEY(product_uid) REFERENCES products (uid)
+    )
+    """,
+]
+
+BASE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, description, category)
+        VALUES (new.rowid, new.name, new.description,
+                (SELECT name FROM categories WHERE uid = new.category_uid));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description, category_uid ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = old.rowid;
+        INSERT INTO products_fts (rowid, name, description, category)
+        VALUES (new.rowid, new.name, new.description,
+                (SELECT name FROM categories WHERE uid = new.category_uid));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS categories_fts_au AFTER UPDATE OF name ON categories BEGIN
+        DELETE FROM products_fts WHERE rowid IN (SELECT rowid FROM products WHERE category_uid = new.uid);
+        INSERT INTO products_fts (rowid, name, description, category)
+        SELECT rowid, name, description, new.name FROM products WHERE category_uid = new.uid;
+    END
+    """,
+]
+
+BASE_SEARCH_FILL = """
+    INSERT INTO products_fts (rowid, name, description, category)
+    SELECT products.rowid, products.name, products.description, categories.name
+    FROM products LEFT JOIN categories ON categories.uid = products.category_uid
+"""
+
+# Mismo calculo que store/summary.py al publicarse la migracion
+BASE_SUMMARY_FILL = """
+    INSERT INTO product_price_summary (product_uid, offers_count, min_price, max_price, avg_price, best_company_uid, updated_at)
+    SELECT product_uid, offers_count, min_price, max_price, avg_price, company_uid, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')
+    FROM (
+        SELECT stores.product_uid, stores.company_uid,
+            count(*) OVER by_product AS offers_count,
+            min(stores.price * (100 - coalesce(stores.discount, 0)) / 100.0) OVER by_product AS min_price,
+            max(stores.price * (100 - coalesce(stores.discount, 0)) / 100.0) OVER by_product AS max_price,
+            avg(stores.price * (100 - coalesce(stores.discount, 0)) / 100.0) OVER by_product AS avg_price,
+            row_number() OVER (
+                PARTITION BY stores.product_uid
+                ORDER BY stores.price * (100 - coalesce(stores.discount, 0)) / 100.0, stores.company_uid
+            ) AS rank
+        FROM stores JOIN companies ON companies.uid = stores.company_uid
+        WHERE stores.is_deleted = 0 AND companies.is_deleted = 0
+        WINDOW by_product AS (PARTITION BY stores.product_uid)
+    )
+    WHERE rank = 1
+"""
+
+
+@migration(1, "esquema base: tablas, indices, FTS y resumen de precios")
+def base_schema(connection: Connection) -> None:
+    has_search = table_exists(connection, "products_fts")
+    has_summary = table_exists(connection, "product_price_summary")
+    execute(connection, BASE_SCHEMA + BASE_SEARCH_INDEX)
+    # Bases con datos anteriores a las migraciones: los derivados se llenan una vez
+    if not has_search:
+        connection.exec_driver_sql(BASE_SEARCH_FILL)
+    if not has_summary:
+        connection.exec_driver_sql(BASE_SUMMARY_FILL)
+
+
+@migration(2, "indice del catalogo por compañia en stores")
+def company_catalog_index(connection: Connection) -> None:
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_stores_company_uid_is_deleted_price_uid ON stores (company_uid, is_deleted, price, uid)"
+    )
+
+
+COMPANY_LOCATION_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS companies_geo USING rtree(
+        id, min_lat, max_lat, min_lon, max_lon
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_geo_ai AFTER INSERT ON companies
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL AND NOT new.is_deleted BEGIN
+        INSERT INTO companies_geo (id, min_lat, max_lat, min_lon, max_lon)
+        VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_geo_ad AFTER DELETE ON companies BEGIN
+        DELETE FROM companies_geo WHERE id = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS companies_geo_au AFTER UPDATE OF latitude, longitude, is_deleted ON companies BEGIN
+        DELETE FROM companies_geo WHERE id = old.rowid;
+        INSERT INTO companies_geo (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT new.rowid, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL AND NOT new.is_deleted;
+    END
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_stores_company_uid_product_uid_is_deleted ON stores (company_uid, product_uid, is_deleted)",
+]
+
+
+@migration(3, "ubicacion de compañias e indice R*Tree companies_geo")
+def company_locations(connection: Connection) -> None:
+    columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(companies)")}
+    for name in ("latitude", "longitude"):
+        if name not in columns:
+            connection.exec_driver_sql(f"ALTER TABLE companies ADD COLUMN {name} FLOAT")
+    has_index = table_exists(connection, "companies_geo")
+    execute(connection, COMPANY_LOCATION_INDEX)
+    if not has_index:
+        connection.exec_driver_sql(
+            """
+            INSERT INTO companies_geo (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT rowid, latitude, latitude, longitude, longitude FROM companies
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND NOT is_deleted
+            """
+        )
+
+
+@migration(4, "agregado diario del historial de precios price_history_daily")
+def price_history_daily(connection: Connection) -> None:
+    connection.exec_driver_sql(
+        """
+        CREATE TABLE IF NOT EXISTS price_history_daily (
+            product_uid CHAR(32) NOT NULL,
+            company_uid CHAR(32) NOT NULL,
+            day DATE NOT NULL,
+            min_price FLOAT NOT NULL,
+            avg_price FLOAT NOT NULL,
+            max_price FLOAT NOT NULL,
+            last_price FLOAT NOT NULL,
+            samples INTEGER NOT NULL,
+            PRIMARY KEY (product_uid, company_uid, day)
+        )
+        """
+    )
+
+
+@migration(5, "tabla blacklist con indice por token para la revocacion en base de datos")
+def token_blacklist(connection: Connection) -> None:
+    execute(connection, [
+        """
+        CREATE TABLE IF NOT EXISTS blacklist (
+            uid CHAR(32) NOT NULL,
+            token VARCHAR NOT NULL,
+            created_at DATETIME,
+            update_at DATETIME,
+            expiracy DATETIME,
+            PRIMARY KEY (uid)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS ix_blacklist_token ON blacklist (token)",
+    ])
+
+
+def latest_version() -> int:
+    return max(MIGRATIONS, default=0)
+
+
+def schema_version(connection: Connection) -> int:
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def is_empty(connection: Connection) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+    ).first() is None
+
+
+def migrate(connection: Connection) -> list[int]:
+    """Aplica en orden las migraciones pendientes dentro de la transaccion actual.
+
+    Una base vacia se crea directo desde los modelos con ``create_schema`` y se marca
+    con la ultima version, sin recorrer las migraciones."""
+    current = schema_version(connection)
+    if current == 0 and is_empty(connection):
+        logger.info("Base vacia: creando el esquema en la version %s", latest_version())
+        create_schema(connection)
+        connection.exec_driver_sql(f"PRAGMA user_version = {int(latest_version())}")
+        return sorted(MIGRATIONS)
+    applied = []
+    for version in sorted(MIGRATIONS):
+        if version <= current:
+            continue
+        description, step = MIGRATIONS[version]
+        logger.info("Aplicando migracion %s: %s", version, description)
+        step(connection)
+        # user_version es parte de la transaccion: si la migracion falla no se marca
+        connection.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+        applied.append(version)
+    return applied
+
+
+async def migrate_db() -> list[int]:
+    async with async_engine.begin() as conn:
+        return await conn.run_sync(migrate)
+
+
+async def check_schema() -> int:
+    """Devuelve cuantas migraciones faltan y lo advierte en el log."""
+    async with async_engine.connect() as conn:
+        current = await conn.run_sync(schema_version)
+    pending = len([version for version in MIGRATIONS if version > current])
+    if pending:
+        logger.warning(
+            "La base de datos esta en la version %s y faltan %s migraciones; ejecuta `python manage.py migrate`",
+            current, pending,
+        )
+    return pending
@@ -0,0 +1,196 @@
+"""Bandeja de salida de correos.
+
+Las rutas solo insertan en ``email_outbox`` con ``enqueue_email``; un worker del
+proceso la vacia en lotes sobre una conexion SMTP reutilizada. Cada lote se
+reclama con un UPDATE ... RETURNING que adelanta ``next_attempt_at`` un tiempo de
+gracia: si el proceso muere a mitad de un envio, la fila vuelve a estar
+pendiente al vencer ese plazo, y dos procesos nunca reclaman la misma fila.
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+import aiosmtplib
+from sqlalchemy import JSON, Column, Index, bindparam, update
+from sqlmodel import Field, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import Config
+from .db import async_session
+from .mail import SMTPSender, build_message
+
+logger = logging.getLogger("miprecio.outbox")
+
+# Errores de conexion: afectan a todo el lote, no solo al mensaje actual
+CONNECTION_ERRORS = (aiosmtplib.SMTPConnectError, aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, OSError)
+
+
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    recipients: list[str] = Field(sa_column=Column(JSON, nullable=False))
+    subject: str = Field(nullable=False)
+    body: str = Field(nullable=False)
+    subtype: str = Field(default="html", nullable=False)
+    status: str = Field(default="pending", nullable=False)  # pending, sent, failed
+    attempts: int = Field(default=0, nullable=False)
+    next_attempt_at: datetime = Field(nullable=False)
+    last_error: Optional[str] = Field(default=None, nullable=True)
+    created_at: datetime = Field(nullable=False)
+    sent_at: Optional[datetime] = Field(default=None, nullable=True)
+
+
+outbox_table = EmailOutbox.__table__
+
+mark_retry = (
+    update(outbox_table)
+    .where(outbox_table.c.id == bindparam("email_id"))
+    .values(
+        status=bindparam("status"),
+        next_attempt_at=bindparam("next_attempt_at"),
+        last_error=bindparam("last_error"),
+    )
+)
+
+
+def backoff(attempts: int) -> timedelta:
+    """Espera exponencial con jitter antes del siguiente intento."""
+    delay = min(Config.OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1), Config.OUTBOX_BACKOFF_MAX)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def is_permanent(error: Exception) -> bool:
+    # Respuestas 5xx (destinatario invalido, mensaje rechazado) no mejoran con reintentos,
+    # ni los errores que no vienen de SMTP (p. ej. un destinatario mal formado)
+    if not isinstance(error, aiosmtplib.SMTPException):
+        return True
+    return isinstance(error, aiosmtplib.SMTPRecipientsRefused) or (
+        isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500
+    )
+
+
+class OutboxWorker:
+    def __init__(self, sender: Optional[SMTPSender] = None) -> None:
+        self.sender = sender or SMTPSender()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_send = 0.0
+
+    def notify(self) -> None:
+        """Despierta al worker sin esperar al siguiente sondeo."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(), name="email-outbox")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.sender.close()
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                claimed = await self.deliver_batch()
+            except Exception:
+                logger.exception("Error procesando la bandeja de salida")
+                claimed = 0
+            if claimed:
+                continue
+            if self.sender.connected and loop.time() - self._last_send > Config.MAIL_IDLE_TIMEOUT:
+                await self.sender.close()
+            try:
+                await asyncio.wait_for(self._wake.wait(), Config.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def deliver_batch(self) -> int:
+        """Reclama y envia un lote. Devuelve cuantos correos reclamo."""
+        async with async_session() as session:
+            now = datetime.now()
+            due = (
+                select(EmailOutbox.id)
+                .where(EmailOutbox.status == "pending")
+                .where(EmailOutbox.next_attempt_at <= now)
+                # Un proceso que muere a mitad del lote no deja la fila reintentandose sin fin
+                .where(EmailOutbox.attempts < Config.OUTBOX_MAX_ATTEMPTS)
+                .order_by(EmailOutbox.id)
+                .limit(Config.OUTBOX_BATCH_SIZE)
+            )
+            result = await session.exec(
+                update(outbox_table)
+                .where(outbox_table.c.id.in_(due))
+                .values(
+                    attempts=outbox_table.c.attempts + 1,
+                    next_attempt_at=now + timedelta(seconds=Config.OUTBOX_LEASE_SECONDS),
+                )
+                .returning(outbox_table.c.id, outbox_table.c.recipients, outbox_table.c.subject,
+                           outbox_table.c.body, outbox_table.c.subtype, outbox_table.c.attempts)
+            )
+            batch = result.all()
+            await session.commit()
+            if not batch:
+                return 0
+
+            sent, retries = [], []
+            try:
+                for position, (email_id, recipients, subject, body, subtype, attempts) in enumerate(batch):
+                    try:
+                        message = build_message(recipients, subject, body, subtype)
+                        message["X-Outbox-Id"] = str(email_id)
+                        await self.sender.send(message)
+                    except CONNECTION_ERRORS as error:
+                        # Sin servidor no tiene sentido seguir con el lote: todo se reprograma
+                        retries.extend(self._retry(row[0], row[5], error) for row in batch[position:])
+                        await self.sender.close()
+                        break
+                    except Exception as error:
+                        retries.append(self._retry(email_id, attempts, error))
+                    else:
+                        sent.append(email_id)
+                        self._last_send = asyncio.get_running_loop().time()
+            finally:
+                # Lo ya enviado se marca aunque el lote se corte, para no reenviarlo al vencer el plazo
+                if sent:
+                    await session.exec(
+                        update(outbox_table).where(outbox_table.c.id.in_(sent)).values(status="sent", sent_at=datetime.now())
+                    )
+                if retries:
+                    await session.exec(mark_retry, params=retries)
+                await session.commit()
+            return len(batch)
+
+    def _retry(self, email_id: int, attempts: int, error: Exception) -> dict:
+        failed = is_permanent(error) or attempts >= Config.OUTBOX_MAX_ATTEMPTS
+        if failed:
+            logger.warning("Correo %s descartado tras %s intentos: %s", email_id, attempts, error)
+        return {
+            "email_id": email_id,
+            "status": "failed" if failed else "pending",
+            "next_attempt_at": datetime.now() + backoff(attempts),
+            "last_error": str(error)[:500],
+        }
+
+
+outbox_worker = OutboxWorker()
+
+
+async def enqueue_email(recipients: list[str], subject: str, body: str, session: AsyncSession, subtype: str = "html") -> EmailOutbox:
+    """Guarda el correo en la bandeja de salida; el envio ocurre fuera de la peticion."""
+    now = datetime.now()
+    email = EmailOutbox(recipients=recipients, subject=subject, body=body, subtype=subtype, created_at=now, next_attempt_at=now)
+    session.add(email)
+    await session.commit()
+    outbox_worker.notify()
+    return email
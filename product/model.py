@@ -2,17 +2,21 @@ from datetime import date, datetime
 from typing import TYPE_CHECKING, Optional
 import uuid
 
-from sqlmodel import TEXT, Column, Field, Relationship, SQLModel
+from sqlmodel import TEXT, Column, Field, Index, Relationship, SQLModel
 
 from ..user.model import User
 
 if TYPE_CHECKING:
     from ..user.model import User
     from ..category.model import Category
-    from ..store.model import Store
+    from ..store.model import Store, ProductPriceSummary
 
 class Product(SQLModel, table=True):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_name_uid", "name", "uid"),
+        Index("ix_products_update_at", "update_at"),
+    )
     uid: uuid.UUID = Field(uuid.uuid4 ,nullable=False, primary_key=True)
     name: str = Field(TEXT, nullable=False, unique=True, index=True, max_length=80)
     price: float = Field(nullable=False, default=0.0, decimal_places=2, gt=-1)
@@ -21,8 +25,8 @@ class Product(SQLModel, table=True):
     category_uid: uuid.UUID = Field(default=None, foreign_key="categories.uid", exclude=True)
     created_at: datetime = Field(nullable=True)
     update_at: datetime = Field(nullable=True)
-    category: "Category" = Relationship(back_populates="products", sa_relationship_kwargs={"lazy": "selectin", "uselist": False})
-    createdBy: "User" = Relationship(back_populates="products", sa_relationship_kwargs={"lazy": "selectin"})
+    category: "Category" = Relationship(back_populates="products", sa_relationship_kwargs={"lazy": "raise", "uselist": False})
+    createdBy: "User" = Relationship(back_populates="products", sa_relationship_kwargs={"lazy": "raise"})
     #reviews: List["Review"] = Relationship(
     #    back_populates="product", sa_relationship_kwargs={"lazy": "selectin"}
     #)
@@ -34,9 +38,13 @@ class Product(SQLModel, table=True):
     store: list["Store"] = Relationship(
         back_populates="product",
         #sa_relationship={RelationshipProperty("Product", primaryjoin="Product.createdBy == User.uid", uselist=True)},
-        sa_relationship_kwargs={"lazy": "selectin", "uselist": True},
+        sa_relationship_kwargs={"lazy": "raise", "uselist": True},
         cascade_delete=True
     )
+    # Solo lectura: la fila la mantiene store/summary.py
+    price_summary: Optional["ProductPriceSummary"] = Relationship(
+        sa_relationship_kwargs={"lazy": "raise", "uselist": False, "viewonly": True}
+    )
 
     def __repr__(self):
         return f"<Producto {self.name}, precio: {self.price}>"
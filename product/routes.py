@@ -1,10 +1,11 @@
-from typing import Dict, List
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
 import uuid
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Body, Depends, Query, Response, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..auth.dependencies import RoleChecker, get_current_user
+from ..auth.dependencies import RoleChecker, get_current_principal
 
 from ..utils.uuid_validator import is_valid_uuid
 
@@ -12,25 +13,49 @@ from ..errors import InvalidUUID, ProductAlreadyExists, ProductNotFound
 
 from..company.service import CompanyService
 from ..user.service import UserService
-from .service import ProductService
-from .schemas import ProductCreateModel, ProductModel, ProductEditModel, ProductModelWithCategory, ProductFilterModel
+from .service import PRODUCT_EXPORT_COLUMNS, ProductService
+from ..store.service import StoreService
+from .schemas import PriceHistoryBucketModel, ProductBulkReport, ProductCreateModel, ProductModel, ProductEditModel, ProductModelWithCategory, ProductFilterModel, ProductOffersFilterModel, ProductOffersModel, NearbyOfferModel
 from ..db import get_session
+from ..query_audit import query_budget
+from ..utils.pagination import Page, PageParams
+from ..utils.records import export_response
+from ..utils.serialization import FastSerializer
+from ..versions import conditional
 
 user_service = UserService()
 product_service = ProductService()
 company_service = CompanyService()
+store_service = StoreService()
 product_router = APIRouter()
 role_checker = RoleChecker(["admin", "socio"])
+# Tablas que aparecen en ProductModel/ProductModelWithCategory
+product_versions = Depends(conditional("products", "categories", "users", "stores"))
+product_page = FastSerializer(Page[ProductModelWithCategory])
+product_list = FastSerializer(list[ProductModelWithCategory])
 
-@product_router.get("/", status_code=status.HTTP_200_OK, response_model=list[ProductModelWithCategory])
-async def get_all_products(session: AsyncSession = Depends(get_session)):
-    product = await product_service.get_all_products(session)
-    return product
+@product_router.get("/", status_code=status.HTTP_200_OK, response_model=Page[ProductModelWithCategory], dependencies=[product_versions])
+@query_budget(4)
+async def get_all_products(response: Response, page: PageParams = Depends(), session: AsyncSession = Depends(get_session)):
+    product = await product_service.get_all_products(page, session)
+    return product_page(product, response)
 
-@product_router.get("/top", status_code=status.HTTP_200_OK, response_model=list[ProductModelWithCategory])
-async def get_top_products(session: AsyncSession = Depends(get_session)):
+@product_router.get("/top", status_code=status.HTTP_200_OK, response_model=list[ProductModelWithCategory], dependencies=[product_versions])
+@query_budget(4)
+async def get_top_products(response: Response, session: AsyncSession = Depends(get_session)):
     product = await product_service.get_top_products(session)
-    return product
+    return product_list(product, response)
+
+@product_router.get("/search", status_code=status.HTTP_200_OK, response_model=list[ProductModelWithCategory], dependencies=[product_versions])
+@query_budget(4)
+async def search_products(
+    response: Response,
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+):
+    products = await product_service.search_products(text=q, limit=limit, session=session)
+    return product_list(products, response)
 
 @product_router.post("/all/", status_code=status.HTTP_200_OK)
 async def get_filtered_products(
@@ -41,7 +66,67 @@ async def get_filtered_products(
     print(products)
     return products
 
-@product_router.get("/{id}", response_model=ProductModel, status_code=status.HTTP_200_OK, )
+@product_router.get("/export", status_code=status.HTTP_200_OK)
+async def export_products(format: Literal["ndjson", "csv"] = "ndjson", updated_since: Optional[datetime] = None):
+    """Exporta el catalogo completo en NDJSON o CSV sin cargarlo en memoria."""
+    batches = product_service.export_products(updated_since)
+    return export_response(batches, [column.key for column in PRODUCT_EXPORT_COLUMNS], format, "products")
+
+@product_router.post("/offers", status_code=status.HTTP_200_OK, response_model=list[ProductOffersModel])
+async def get_products_offers(
+    filter_data: ProductOffersFilterModel,
+    session: AsyncSession = Depends(get_session),
+):
+    offers = await store_service.get_offers(product_uids=list(dict.fromkeys(filter_data.uids)), top=filter_data.top, session=session)
+    return offers
+
+@product_router.get("/{id}/offers", status_code=status.HTTP_200_OK, response_model=ProductOffersModel)
+@query_budget(2)
+async def get_product_offers(id:str, top: int = Query(default=3, ge=1, le=20), session: AsyncSession = Depends(get_session)):
+    if not is_valid_uuid(id):
+        raise InvalidUUID()
+    product = await product_service.get_product_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
+    if product is None:
+        raise ProductNotFound()
+    offers = await store_service.get_offers(product_uids=[product.uid], top=top, session=session)
+    return offers[0]
+
+@product_router.get("/{id}/nearby", status_code=status.HTTP_200_OK, response_model=list[NearbyOfferModel])
+@query_budget(2)
+async def get_product_nearby(
+    id: str,
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius: float = Query(default=5, gt=0, le=100, description="Radio en km"),
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_session),
+):
+    """Ofertas del producto en compañias cercanas, ordenadas por precio efectivo."""
+    if not is_valid_uuid(id):
+        raise InvalidUUID()
+    product = await product_service.get_product_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
+    if product is None:
+        raise ProductNotFound()
+    return await store_service.get_nearby_offers(product.uid, lat, lon, radius, limit, session)
+
+@product_router.get("/{id}/history", status_code=status.HTTP_200_OK, response_model=list[PriceHistoryBucketModel])
+@query_budget(2)
+async def get_product_history(
+    id:str,
+    bucket: Literal["day", "week"] = "day",
+    days: int = Query(default=90, ge=1, le=730),
+    company_uid: Optional[uuid.UUID] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    if not is_valid_uuid(id):
+        raise InvalidUUID()
+    product = await product_service.get_product_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
+    if product is None:
+        raise ProductNotFound()
+    return await store_service.get_price_history(product.uid, bucket, days, company_uid, session)
+
+@product_router.get("/{id}", response_model=ProductModel, status_code=status.HTTP_200_OK, dependencies=[product_versions])
+@query_budget(4)
 async def get_product(id:str, session: AsyncSession = Depends(get_session)):
     if not is_valid_uuid(id):
         raise InvalidUUID()
@@ -54,7 +139,7 @@ async def get_product(id:str, session: AsyncSession = Depends(get_session)):
 async def create_product(
     product_data: ProductCreateModel,
     session: AsyncSession = Depends(get_session),
-    user_data=Depends(get_current_user), _: bool = Depends(role_checker),
+    user_data=Depends(get_current_principal), _: bool = Depends(role_checker),
 ):
     """
     Crea un producto utilizando un un nombre, un precio y una descripcion
@@ -73,6 +158,19 @@ async def create_product(
         "data": new_product,
     }
 
+@product_router.post("/bulk", status_code=status.HTTP_200_OK, response_model=ProductBulkReport)
+async def create_products(
+    products_data: list[ProductCreateModel] = Body(min_length=1, max_length=10_000),
+    session: AsyncSession = Depends(get_session),
+    user_data=Depends(get_current_principal), _: bool = Depends(role_checker),
+):
+    """
+    Crea varios productos a la vez y reporta los que no se pudieron crear
+    params:
+        products_data: list[ProductCreateModel]
+    """
+    return await product_service.create_products(products_data, user_data.uid, session)
+
 @product_router.patch("/{id}", status_code=status.HTTP_200_OK, )
 async def update_product(
     id:str, 
@@ -82,7 +180,7 @@ async def update_product(
 
     if not is_valid_uuid(id):
         raise InvalidUUID()
-    product = await product_service.get_product_by_id(id=uuid.UUID(id, version=4), session=session)
+    product = await product_service.get_product_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
     if product is None:
         raise ProductNotFound()
     edited_product = await product_service.edit_product(product=product, product_data=product_data, session=session)
@@ -92,7 +190,7 @@ async def update_product(
 async def delete_product(id:str,_: bool = Depends(role_checker), session: AsyncSession = Depends(get_session)):
     if not is_valid_uuid(id):
         raise InvalidUUID()
-    product = await product_service.get_product_by_id(id=uuid.UUID(id, version=4), session=session)
+    product = await product_service.get_product_by_id(id=uuid.UUID(id, version=4), session=session, profile="base")
     if product is None:
         raise ProductNotFound()
     await product_service.delete_product(id=uuid.UUID(id, version=4), session=session)
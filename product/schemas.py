@@ -12,9 +12,52 @@ class ProductCreateModel(BaseModel):
     user_uid: Optional[uuid.UUID] = Field(default=None)
     category_uid: Optional[uuid.UUID] = Field(default=None)
 
+class PriceHistoryBucketModel(BaseModel):
+    bucket: datetime.date
+    min_price: float
+    avg_price: float
+    max_price: float
+    samples: int
+
+class ProductBulkError(BaseModel):
+    index: int
+    name: str
+    errors: list[str]
+
+class ProductBulkReport(BaseModel):
+    created: int
+    failed: int
+    errors: list[ProductBulkError]
+
 class ProductFilterModel(BaseModel):
     uids: list[uuid.UUID]
 
+class ProductOffersFilterModel(BaseModel):
+    uids: list[uuid.UUID] = Field(min_length=1, max_length=100)
+    top: int = Field(default=3, ge=1, le=20)
+
+class OfferModel(BaseModel):
+    company_uid: uuid.UUID
+    company_name: str
+    price: float
+    discount: Optional[int]
+    effective_price: float
+
+class NearbyOfferModel(OfferModel):
+    latitude: float
+    longitude: float
+    distance_km: float
+
+class ProductOffersModel(BaseModel):
+    product_uid: uuid.UUID
+    offers_count: int = 0
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    avg_price: Optional[float] = None
+    median_price: Optional[float] = None
+    spread: Optional[float] = None
+    offers: list[OfferModel] = []
+
 class ProductUModel(ProductCreateModel):
     uid: uuid.UUID
 
@@ -27,9 +70,17 @@ class ProductEditModel(BaseModel):
     category_uid: Optional[uuid.UUID] = Field(default=None)
     
 
+class PriceSummaryModel(BaseModel):
+    offers_count: int
+    min_price: float
+    max_price: float
+    avg_price: float
+    best_company_uid: uuid.UUID
+
 class ProductModel(ProductCreateModel):
     createdBy: Optional[UserModel]
     category: Optional[CategoryModel]
+    price_summary: Optional[PriceSummaryModel] = None
 
 class ProductBasicModel(BaseModel):
     uid: uuid.UUID
@@ -42,6 +93,7 @@ class ProductModelWithCategory(ProductCreateModel):
     createdBy: Optional[UserModel]
     uid: uuid.UUID
     category: Optional[CategoryModel]
+    price_summary: Optional[PriceSummaryModel] = None
 
 class UserProductsModel(UserModel):
     #books: List[Book]
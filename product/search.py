@@ -0,0 +1,93 @@
+import re
+
+from sqlalchemy import column, func, literal_column, table
+
+from ..db import on_create_schema
+
+# Indice FTS5 sobre nombre, descripcion y categoria. El rowid de products_fts es
+# el rowid de products; un VACUUM puede renumerar esos rowid, por lo que despues
+# de uno hay que ejecutar ``python manage.py rebuild-search-index``.
+SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description, category,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (rowid, name, description, category)
+        VALUES (new.rowid, new.name, new.description,
+                (SELECT name FROM categories WHERE uid = new.category_uid));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = old.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF name, description, category_uid ON products BEGIN
+        DELETE FROM products_fts WHERE rowid = old.rowid;
+        INSERT INTO products_fts (rowid, name, description, category)
+        VALUES (new.rowid, new.name, new.description,
+                (SELECT name FROM categories WHERE uid = new.category_uid));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS categories_fts_au AFTER UPDATE OF name ON categories BEGIN
+        DELETE FROM products_fts WHERE rowid IN (SELECT rowid FROM products WHERE category_uid = new.uid);
+        INSERT INTO products_fts (rowid, name, description, category)
+        SELECT rowid, name, description, new.name FROM products WHERE category_uid = new.uid;
+    END
+    """,
+]
+
+REBUILD_SQL = [
+    "DELETE FROM products_fts",
+    """
+    INSERT INTO products_fts (rowid, name, description, category)
+    SELECT products.rowid, products.name, products.description, categories.name
+    FROM products LEFT JOIN categories ON categories.uid = products.category_uid
+    """,
+]
+
+# Pesos de bm25 por columna: name, description, category
+SEARCH_WEIGHTS = (10.0, 2.0, 4.0)
+
+products_fts = table("products_fts", column("rowid"))
+search_rank = func.bm25(literal_column("products_fts"), *SEARCH_WEIGHTS)
+search_join = products_fts.c.rowid == literal_column("products.rowid")
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match_query(text: str) -> str | None:
+    """Convierte el texto del usuario en una consulta MATCH de prefijos, sin operadores FTS5."""
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def search_match(query: str):
+    return literal_column("products_fts").op("MATCH")(query)
+
+
+@on_create_schema
+def create_search_index(connection) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'"
+    ).first()
+    for ddl in SEARCH_DDL:
+        connection.exec_driver_sql(ddl)
+    if exists is None:
+        rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection) -> None:
+    for statement in REBUILD_SQL:
+        connection.exec_driver_sql(statement)
@@ -1,31 +1,83 @@
 import uuid
+from datetime import datetime
+from typing import AsyncIterator, Optional
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import literal, union_all
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import joinedload, selectinload
 
 #from .schemas import ProductFilterModel
 from .model import Product
+from .schemas import ProductCreateModel
+from ..category.model import Category
+from ..store.history import delete_price_history
+from ..store.summary import refresh_price_summary
+from ..config import Config
+from ..db import async_session
+from ..cache import invalidate
+from ..versions import bump_versions
+from .search import build_match_query, products_fts, search_join, search_match, search_rank
+from ..utils.pagination import PageParams, keyset, make_page
+from ..utils.loaders import LoaderProfiles
+from ..utils.sql import json_set
+
+PRODUCT_PAGE_KEY = (Product.name, Product.uid)
+PRODUCT_EXPORT_COLUMNS = (
+    Product.uid, Product.name, Product.description, Product.category_uid, Product.created_at, Product.update_at,
+)
+
+# Relaciones que carga cada perfil; las relaciones son lazy="raise" y cada
+# consulta elige explicitamente lo que su respuesta necesita.
+PRODUCT_LOADERS = LoaderProfiles(
+    base=lambda: (),
+    list=lambda: (selectinload(Product.createdBy), selectinload(Product.category), joinedload(Product.price_summary)),
+    detail=lambda: (selectinload(Product.createdBy), selectinload(Product.category), joinedload(Product.price_summary)),
+)
 
 class ProductService:
-    async def get_all_products(self, session: AsyncSession) -> list[Product]:
-        stmt = select(Product)
+    async def get_all_products(self, page: PageParams, session: AsyncSession) -> dict:
+        stmt = keyset(select(Product).options(*PRODUCT_LOADERS["list"]), PRODUCT_PAGE_KEY, page)
         result = await session.exec(stmt)
-        return result.all()
+        return make_page(result.all(), PRODUCT_PAGE_KEY, page)
     async def get_all_filtered_products(self, uids: list[uuid.UUID], session: AsyncSession) -> list[Product]:
         stmt = select(Product).where(Product.uid.not_in(uids)).order_by(Product.name)
         result = await session.exec(stmt)
         return result.all()
     async def get_top_products(self, session: AsyncSession) -> list[Product]:
-        stmt = select(Product).limit(5).order_by(Product.update_at.desc())
+        stmt = select(Product).options(*PRODUCT_LOADERS["list"]).limit(5).order_by(Product.update_at.desc())
+        result = await session.exec(stmt)
+        return result.all()
+    async def search_products(self, text: str, limit: int, session: AsyncSession) -> list[Product]:
+        query = build_match_query(text)
+        if query is None:
+            return []
+        stmt = select(Product).options(*PRODUCT_LOADERS["list"]).join(products_fts, search_join).where(search_match(query)).order_by(search_rank).limit(limit)
         result = await session.exec(stmt)
         return result.all()
+
+    async def export_products(self, updated_since: Optional[datetime] = None) -> AsyncIterator[list]:
+        """Recorre la tabla con un cursor en lotes de ``EXPORT_BATCH_SIZE`` filas.
+
+        Abre su propia sesion porque se consume mientras se envia la respuesta,
+        cuando la sesion de la peticion ya se cerro.
+        """
+        statement = select(*PRODUCT_EXPORT_COLUMNS)
+        if updated_since is not None:
+            statement = statement.where(Product.update_at >= updated_since)
+        async with async_session() as session:
+            result = await session.stream(statement.execution_options(yield_per=Config.EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                yield rows
+
     async def get_product_by_name(self, name: str, session: AsyncSession) -> Product:
         statement = select(Product).where(Product.name == name)
         result = await session.exec(statement)
         product = result.first()
         return product
     
-    async def get_product_by_id(self, id: uuid.UUID, session: AsyncSession) -> Product:
-        statement = select(Product).where(Product.uid == id)
+    async def get_product_by_id(self, id: uuid.UUID, session: AsyncSession, profile: str = "detail") -> Product:
+        statement = select(Product).options(*PRODUCT_LOADERS[profile]).where(Product.uid == id)
         result = await session.exec(statement)
         product = result.first()
         return product
@@ -38,24 +90,104 @@ class ProductService:
         product_data_dict = product_data.model_dump()
         new_product = Product(**product_data_dict)
         new_product.uid = uuid.uuid4()
+        new_product.created_at = new_product.update_at = datetime.now()
         session.add(new_product)
+        await bump_versions(session, "products")
         await session.commit()
+        invalidate(("categories", new_product.category_uid))
         return new_product
 
 
+    async def create_products(self, products: list[ProductCreateModel], user_uid: uuid.UUID, session: AsyncSession) -> dict:
+        """Crea productos en lotes de ``BULK_CHUNK_SIZE``. Por lote hace una sola consulta
+        para nombres ya usados y categorias existentes, y un insert multi-fila con
+        ON CONFLICT(name) DO NOTHING; los nombres tomados por otra peticion entre la
+        consulta y el insert se reportan como conflicto."""
+        report = {"created": 0, "failed": 0, "errors": []}
+
+        def reject(index: int, product: ProductCreateModel, error: str) -> None:
+            report["failed"] += 1
+            if len(report["errors"]) < Config.BULK_MAX_ERRORS:
+                report["errors"].append({"index": index, "name": product.name, "errors": [error]})
+
+        seen = set()
+        touched = set()
+        for start in range(0, len(products), Config.BULK_CHUNK_SIZE):
+            chunk = list(enumerate(products[start:start + Config.BULK_CHUNK_SIZE], start))
+            names = {product.name for _, product in chunk}
+            category_uids = {product.category_uid for _, product in chunk if product.category_uid is not None}
+            lookup = union_all(
+                select(literal("name").label("kind"), Product.name.label("value")).where(Product.name.in_(json_set(names))),
+                select(literal("category"), Category.uid).where(Category.uid.in_(json_set(category_uids))),
+            )
+            result = await session.exec(lookup)
+            taken, categories = set(), set()
+            for kind, value in result.all():
+                # La columna toma el tipo de la primera consulta: las categorias llegan en hex
+                (taken if kind == "name" else categories).add(value)
+
+            now = datetime.now()
+            rows = {}
+            for index, product in chunk:
+                if product.name in taken:
+                    reject(index, product, "name: Producto ya existente")
+                elif product.name in seen:
+                    reject(index, product, "name: Nombre repetido en la petición")
+                elif product.category_uid is None:
+                    reject(index, product, "category_uid: La categoria es requerida")
+                elif product.category_uid.hex not in categories:
+                    reject(index, product, "category_uid: La categoria no existe")
+                else:
+                    seen.add(product.name)
+                    rows[index] = {
+                        "uid": uuid.uuid4(),
+                        "name": product.name,
+                        "price": 0.0,
+                        "description": product.description,
+                        "user_uid": user_uid,
+                        "category_uid": product.category_uid,
+                        "created_at": now,
+                        "update_at": now,
+                    }
+            if not rows:
+                continue
+
+            statement = insert(Product.__table__).on_conflict_do_nothing(index_elements=["name"]).returning(Product.__table__.c.uid)
+            result = await session.exec(statement, params=list(rows.values()))
+            inserted = set(result.scalars().all())
+            if inserted:
+                await bump_versions(session, "products")
+            await session.commit()
+            report["created"] += len(inserted)
+            touched.update(row["category_uid"] for row in rows.values() if row["uid"] in inserted)
+            for index, row in rows.items():
+                if row["uid"] not in inserted:
+                    reject(index, products[index], "name: Producto ya existente")
+
+        if touched:
+            invalidate(*(("categories", category_uid) for category_uid in touched))
+        report["errors"].sort(key=lambda error: error["index"])
+        return report
+
     async def update_product(self, product:Product , product_data: dict,session:AsyncSession) -> Product:
         for k, v in product_data.items():
             setattr(product, k, v)
-
+        product.update_at = datetime.now()
+        await bump_versions(session, "products")
         await session.commit()
+        # La categoria anterior contiene el uid del producto; la nueva, el suyo propio
+        invalidate(("categories", product.uid), ("categories", product.category_uid), ("stores", product.uid))
         return product
     
     async def edit_product(self, product: Product, product_data: Product, session: AsyncSession) -> Product:
         product.name = product_data.name
         product.description =product_data.description
         product.category_uid = product_data.category_uid
+        product.update_at = datetime.now()
         session.add(product)
+        await bump_versions(session, "products")
         await session.commit()
+        invalidate(("categories", product.uid), ("categories", product.category_uid), ("stores", product.uid))
         return product
 
     async def delete_product(self, id: uuid.UUID, session: AsyncSession):
@@ -63,4 +195,8 @@ class ProductService:
         result = await session.exec(statement)
         product = result.first()
         await session.delete(product)
-        await session.commit()
\ No newline at end of file
+        await delete_price_history(session, product_uids={id})
+        await refresh_price_summary({id}, session)
+        await bump_versions(session, "products", "stores")
+        await session.commit()
+        invalidate(("categories", id), ("stores", id))
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""Auditoria de consultas por peticion, pensada para desarrollo y pruebas.
+
+Con ``QUERY_AUDIT_ENABLED`` cada peticion guarda sus sentencias SQL, las agrupa
+por sentencia normalizada para detectar patrones N+1 y las compara contra el
+presupuesto que la ruta declara con ``@query_budget(n)``. En modo "raise" la
+consulta que se pasa del presupuesto falla con QueryBudgetExceeded; en modo
+"log" se registra una advertencia al terminar la peticion.
+"""
+import json
+import logging
+import re
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from .config import Config
+from .errors import QueryBudgetExceeded
+
+audit_logger = logging.getLogger("miprecio.queries")
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+
+def normalize(statement: str) -> str:
+    """Reduce una sentencia a su patron: literales y listas IN de largo variable a ``?``."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _IN_LIST.sub("(?)", statement)
+
+
+def query_budget(limit: int) -> Callable:
+    """Declara cuantas sentencias SQL puede ejecutar una ruta. Va debajo del
+    decorador de la ruta para marcar la funcion antes de registrarla."""
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = limit
+        return endpoint
+
+    return decorator
+
+
+def route_budget(scope: dict) -> Optional[int]:
+    route = scope.get("route")
+    return getattr(getattr(route, "endpoint", None), "__query_budget__", None)
+
+
+class QueryLog:
+    """Sentencias de la peticion en curso. Sin auditoria solo se cuentan."""
+
+    __slots__ = ("count", "statements", "scope")
+
+    def __init__(self, scope: dict, audit: bool = False) -> None:
+        self.count = 0
+        self.statements: Optional[list[str]] = [] if audit else None
+        self.scope = scope
+
+    def add(self, statement: str) -> None:
+        self.count += 1
+        if self.statements is None:
+            return
+        self.statements.append(statement)
+        if Config.QUERY_BUDGET_MODE == "raise":
+            budget = route_budget(self.scope)
+            if budget is not None and self.count > budget:
+                raise QueryBudgetExceeded()
+
+
+# Lo inicializa el middleware de logging y lo alimenta el evento before_cursor_execute
+query_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+class QueryAuditor:
+    """Acumula por ruta cuantas consultas hace, sus patrones repetidos y los excesos de presupuesto."""
+
+    def __init__(self) -> None:
+        self.routes: dict[str, dict] = {}
+
+    def record(self, route: str, log: QueryLog) -> None:
+        budget = route_budget(log.scope)
+        patterns = Counter(normalize(statement) for statement in log.statements)
+        repeated = {
+            pattern: count for pattern, count in patterns.items() if count >= Config.QUERY_AUDIT_REPEAT_THRESHOLD
+        }
+        stats = self.routes.setdefault(route, {
+            "route": route, "requests": 0, "total_queries": 0, "max_queries": 0,
+            "budget": budget, "over_budget": 0, "repeated": {},
+        })
+        stats["requests"] += 1
+        stats["total_queries"] += log.count
+        stats["max_queries"] = max(stats["max_queries"], log.count)
+        for pattern, count in repeated.items():
+            stats["repeated"][pattern] = max(stats["repeated"].get(pattern, 0), count)
+        over = budget is not None and log.count > budget
+        if over:
+            stats["over_budget"] += 1
+        if over or repeated:
+            audit_logger.warning(json.dumps({
+                "route": route,
+                "queries": log.count,
+                "budget": budget,
+                "repeated": repeated,
+            }, ensure_ascii=False))
+
+    def report(self, limit: int = 20) -> list[dict]:
+        """Rutas ordenadas por excesos de presupuesto, patrones repetidos y maximo de consultas."""
+        ranked = sorted(
+            self.routes.values(),
+            key=lambda stats: (stats["over_budget"], len(stats["repeated"]), stats["max_queries"]),
+            reverse=True,
+        )
+        return [
+            {**stats, "avg_queries": round(stats["total_queries"] / stats["requests"], 2)}
+            for stats in ranked[:limit]
+        ]
+
+    def clear(self) -> None:
+        self.routes.clear()
+
+
+query_auditor = QueryAuditor()
@@ -0,0 +1,20 @@
+from typing import Iterable
+
+from sqlalchemy import delete, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .model import PriceHistory, PriceHistoryDaily
+from ..utils.sql import json_set
+
+
+async def delete_price_history(session: AsyncSession, product_uids: Iterable = (), company_uids: Iterable = ()) -> None:
+    """Borra los registros y agregados diarios de price_history de productos o compañias
+    que se eliminan. La tabla no tiene llaves foraneas, asi que el borrado en cascada
+    del ORM no la alcanza; el llamador hace commit."""
+    product_uids, company_uids = set(product_uids), set(company_uids)
+    for model in (PriceHistory, PriceHistoryDaily):
+        await session.exec(
+            delete(model).where(
+                or_(model.product_uid.in_(json_set(product_uids)), model.company_uid.in_(json_set(company_uids)))
+            )
+        )
@@ -2,7 +2,9 @@ from datetime import date, datetime
 from typing import TYPE_CHECKING, Optional
 import uuid
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import func
+
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 if TYPE_CHECKING:
     from ..user.model import User
@@ -11,6 +13,14 @@ if TYPE_CHECKING:
 
 class Store(SQLModel, table=True):
     __tablename__ = "stores"
+    __table_args__ = (
+        Index("ix_stores_product_uid_is_deleted_price", "product_uid", "is_deleted", "price"),
+        # Catalogo de una compañia ordenado por precio (keyset sobre price, uid)
+        Index("ix_stores_company_uid_is_deleted_price_uid", "company_uid", "is_deleted", "price", "uid"),
+        # Oferta de un producto en una compañia concreta (busqueda por cercania, check_store)
+        Index("ix_stores_company_uid_product_uid_is_deleted", "company_uid", "product_uid", "is_deleted"),
+        Index("ix_stores_update_at", "update_at"),
+    )
     uid: uuid.UUID = Field(uuid.uuid4 ,nullable=False, primary_key=True)
     price: float = Field(nullable=False, default=0.00, decimal_places=2, gt=-1)
     wholesale_price: Optional[float] = Field(nullable=True, default=0.00, decimal_places=2, gt=-1)
@@ -23,11 +33,77 @@ class Store(SQLModel, table=True):
     update_at: datetime = Field(nullable=True)
     product: "Product" = Relationship(
         back_populates="store", 
-        sa_relationship_kwargs={"lazy": "selectin"}
+        sa_relationship_kwargs={"lazy": "raise"}
     )
-    createdBy: "User" = Relationship(back_populates="stores", sa_relationship_kwargs={"lazy": "selectin"})
-    company: "Company" = Relationship(back_populates="store", sa_relationship_kwargs={"lazy": "selectin"})
+    createdBy: "User" = Relationship(back_populates="stores", sa_relationship_kwargs={"lazy": "raise"})
+    company: "Company" = Relationship(back_populates="store", sa_relationship_kwargs={"lazy": "raise"})
+
+    @classmethod
+    def effective_price(cls):
+        """Precio despues de aplicar el descuento, como expresion SQL."""
+        return cls.price * (100 - func.coalesce(cls.discount, 0)) / 100.0
 
     def __repr__(self):
         return f"<Producto {self.name}, Compañia: {self.company.name}, Precio: {self.price}>"
 
+
+
+
+class PriceHistory(SQLModel, table=True):
+    """Registro de solo-anexar de los cambios de precio de cada producto por compañia."""
+    __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_product_company_changed", "product_uid", "company_uid", "changed_at"),
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    product_uid: uuid.UUID = Field(nullable=False)
+    company_uid: uuid.UUID = Field(nullable=False)
+    price: float = Field(nullable=False)
+    wholesale_price: Optional[float] = Field(default=None, nullable=True)
+    discount: Optional[int] = Field(default=None, nullable=True)
+    changed_at: datetime = Field(nullable=False)
+
+    @classmethod
+    def from_store(cls, store: "Store", changed_at: datetime) -> "PriceHistory":
+        return cls(
+            product_uid=store.product_uid,
+            company_uid=store.company_uid,
+            price=store.price,
+            wholesale_price=store.wholesale_price,
+            discount=store.discount,
+            changed_at=changed_at,
+        )
+
+
+class PriceHistoryDaily(SQLModel, table=True):
+    """Agregado diario de price_history por producto y compañia.
+
+    ``prune_price_history`` lo escribe antes de borrar los registros que pasan de
+    ``PRICE_HISTORY_RAW_DAYS``; ``samples`` permite combinar promedios de dias
+    compactados en varias pasadas o con registros que aun estan en price_history.
+    """
+    __tablename__ = "price_history_daily"
+    product_uid: uuid.UUID = Field(primary_key=True)
+    company_uid: uuid.UUID = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    min_price: float = Field(nullable=False)
+    avg_price: float = Field(nullable=False)
+    max_price: float = Field(nullable=False)
+    last_price: float = Field(nullable=False)
+    samples: int = Field(nullable=False)
+
+
+class ProductPriceSummary(SQLModel, table=True):
+    """Resumen desnormalizado de las ofertas activas de cada producto.
+
+    Se recalcula por producto en cada escritura de stores (ver store/summary.py);
+    un producto sin ofertas activas no tiene fila.
+    """
+    __tablename__ = "product_price_summary"
+    product_uid: uuid.UUID = Field(foreign_key="products.uid", primary_key=True)
+    offers_count: int = Field(nullable=False)
+    min_price: float = Field(nullable=False)
+    max_price: float = Field(nullable=False)
+    avg_price: float = Field(nullable=False)
+    best_company_uid: uuid.UUID = Field(nullable=False)
+    updated_at: datetime = Field(nullable=False)
@@ -1,40 +1,59 @@
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 import uuid
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from ..user.schemas import Role
 
-from .schemas import StoreCompanyModel, StoreCreateModel, StoreDeleteModel
-from ..company.schemas import CompanyStoreModel
+from .schemas import StoreCompanyModel, StoreCreateModel, StoreDeleteModel, StoreImportReport
+from ..company.schemas import CompanyCatalogModel, CompanyStoreModel
 
-from ..auth.dependencies import RoleChecker, get_current_user
+from ..auth.dependencies import RoleChecker, get_current_principal
 
 from ..utils.uuid_validator import is_valid_uuid
 
-from ..errors import InvalidUUID, StoreAlreadyExists, StoreNotFound
+from ..errors import InvalidUUID, StoreAlreadyExists, StoreNotFound, UnsupportedMediaType
 
-from .service import StoreService
+from .service import STORE_EXPORT_COLUMNS, StoreService
 from ..db import get_session
+from ..query_audit import query_budget
+from ..utils.pagination import Page, PageParams
+from ..utils.records import export_response, iter_records, record_format
+from ..utils.serialization import FastSerializer, JSONBytesResponse
 
 store_service = StoreService()
 store_router = APIRouter()
 role_checker = RoleChecker([Role.admin.value, Role.partner.value, Role.user.value])
+company_store_page = FastSerializer(Page[CompanyStoreModel])
+store_company_page = FastSerializer(Page[StoreCompanyModel])
+company_catalog = FastSerializer(CompanyCatalogModel)
 
-@store_router.get("/", status_code=status.HTTP_200_OK, response_model=list[CompanyStoreModel])
-async def get_all_stores(session: AsyncSession = Depends(get_session)):
-    store = await store_service.get_all_stores(session)
-    return store
+# Las rutas de catalogo cargan con selectinload, que agrega una consulta por cada
+# 500 tiendas; el presupuesto deja margen para compañias grandes.
+@store_router.get("/", status_code=status.HTTP_200_OK, response_model=Page[CompanyStoreModel])
+@query_budget(10)
+async def get_all_stores(page: PageParams = Depends(), session: AsyncSession = Depends(get_session)):
+    store = await store_service.get_all_stores(page, session)
+    return company_store_page(store)
 @store_router.get("/top", status_code=status.HTTP_200_OK, response_model=list[CompanyStoreModel])
+@query_budget(10)
 async def get_all_stores(session: AsyncSession = Depends(get_session)):
     store = await store_service.get_top_stores(session)
-    return store
+    return JSONBytesResponse(store)
 
-@store_router.get("/stores", status_code=status.HTTP_200_OK, response_model=list[StoreCompanyModel])
-async def get_all_stores(session: AsyncSession = Depends(get_session)):
-    store = await store_service.get_stores(session)
-    return store
+@store_router.get("/stores", status_code=status.HTTP_200_OK, response_model=Page[StoreCompanyModel])
+@query_budget(4)
+async def get_all_stores(page: PageParams = Depends(), session: AsyncSession = Depends(get_session)):
+    store = await store_service.get_stores(page, session)
+    return store_company_page(store)
+
+@store_router.get("/export", status_code=status.HTTP_200_OK)
+async def export_stores(format: Literal["ndjson", "csv"] = "ndjson", updated_since: Optional[datetime] = None):
+    """Exporta la tabla de precios en NDJSON o CSV sin cargarla en memoria."""
+    batches = store_service.export_stores(updated_since)
+    return export_response(batches, [column.key for column in STORE_EXPORT_COLUMNS], format, "stores")
 
 @store_router.get("/{id}", status_code=status.HTTP_200_OK, response_model=CompanyStoreModel)
 async def get_store(id:str, session: AsyncSession = Depends(get_session)):
@@ -45,14 +64,30 @@ async def get_store(id:str, session: AsyncSession = Depends(get_session)):
         raise StoreNotFound()
     return store
 
-@store_router.get("/company/{id}", status_code=status.HTTP_200_OK, response_model=CompanyStoreModel)
-async def get_store_by_company(id:str, session: AsyncSession = Depends(get_session)):
-    if not is_valid_uuid(id):
+@store_router.get("/company/{id}", status_code=status.HTTP_200_OK, response_model=CompanyCatalogModel)
+@query_budget(6)
+async def get_store_by_company(
+    id: str,
+    page: PageParams = Depends(),
+    sort: Literal["price", "effective_price", "discount", "name"] = "price",
+    order: Literal["asc", "desc"] = "asc",
+    category: Optional[str] = Query(default=None),
+    session: AsyncSession = Depends(get_session),
+):
+    """Catalogo paginado de una compañia. ``category`` filtra por el uid de la categoria."""
+    if not is_valid_uuid(id) or (category is not None and not is_valid_uuid(category)):
         raise InvalidUUID()
-    store = await store_service.get_store_by_company_id(id=uuid.UUID(id, version=4), session=session)
+    store = await store_service.get_company_catalog(
+        id=uuid.UUID(id, version=4),
+        page=page,
+        session=session,
+        sort=sort,
+        descending=order == "desc",
+        category_uid=uuid.UUID(category, version=4) if category else None,
+    )
     if store is None:
         raise StoreNotFound()
-    return store
+    return company_catalog(store)
 @store_router.get("/company/{id}/product/{product_uid}", status_code=status.HTTP_200_OK, response_model=StoreCompanyModel)
 async def get_store_by_company_store(id:str, product_uid:str, session: AsyncSession = Depends(get_session)):
     if not is_valid_uuid(id):
@@ -66,7 +101,7 @@ async def get_store_by_company_store(id:str, product_uid:str, session: AsyncSess
 async def create_store(
     store: StoreCreateModel, 
     session: AsyncSession = Depends(get_session),
-    user_data=Depends(get_current_user),
+    user_data=Depends(get_current_principal),
     _: bool = Depends(role_checker),
     ):
     store_exists = await store_service.check_store(company_uid=store.company_uid, product_uid=store.product_uid, session=session)  
@@ -78,12 +113,25 @@ async def create_store(
     else:
         new_store = await store_service.create_store(store=store, user_data_id=user_data.uid, session=session)
         return {"message": "El producto ha sido creado con exito"}
+@store_router.post("/bulk", status_code=status.HTTP_200_OK, response_model=StoreImportReport)
+async def import_stores(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    user_data=Depends(get_current_principal),
+    _: bool = Depends(role_checker),
+    ):
+    """Carga masiva de precios en CSV (``text/csv``) o NDJSON (``application/x-ndjson``)
+    con las columnas de StoreCreateModel. El cuerpo se procesa a medida que llega."""
+    format = record_format(request.headers.get("content-type"))
+    if format is None:
+        raise UnsupportedMediaType()
+    return await store_service.import_stores(iter_records(request.stream(), format), user_data.uid, session)
 @store_router.patch("/{id}", status_code=status.HTTP_200_OK)
 async def update_store(id:str, company_data: StoreCreateModel,_: bool = Depends(role_checker), session: AsyncSession = Depends(get_session), role_checker: bool = Depends(role_checker),):
     print("ASDASDASDSAD: ", company_data)
     if not is_valid_uuid(id):
         raise InvalidUUID()
-    store = await store_service.get_store_by_company_product_uid(id=uuid.UUID(id, version=4), product_uid=company_data.product_uid, session=session)
+    store = await store_service.get_store_by_company_product_uid(id=uuid.UUID(id, version=4), product_uid=company_data.product_uid, session=session, profile="base")
     if store is None:
         raise StoreNotFound()
     #store_exists = store_service.check_store(id=store.uid, product_uid=store.product_uid, session=session)
@@ -101,7 +149,7 @@ async def delete_store(
     if not is_valid_uuid(id):
         raise InvalidUUID()
     print("antes de borrar: ", company_data)
-    store = await store_service.get_store_by_company_product_uid(id=uuid.UUID(id, version=4), product_uid=company_data.product_uid, session=session)
+    store = await store_service.get_store_by_company_product_uid(id=uuid.UUID(id, version=4), product_uid=company_data.product_uid, session=session, profile="base")
     if store is None:
         raise StoreNotFound()    
     await store_service.delete_store(store=store, session=session)
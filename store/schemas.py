@@ -30,3 +30,18 @@ class StoreCompanyModel(BaseModel):
     is_deleted: bool = None
     createdBy: Optional[UserCompanyModel]   
     product: Optional[ProductBasicModel]
+
+
+class StoreImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+class StoreImportReport(BaseModel):
+    processed: int
+    created: int
+    updated: int
+    restored: int
+    # Filas repetidas (misma compañia y producto) reemplazadas por una posterior del lote
+    superseded: int = 0
+    failed: int
+    errors: list[StoreImportError]
@@ -1,43 +1,148 @@
 import uuid
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Optional
+from pydantic import ValidationError
+from sqlalchemy import bindparam, case, delete, func, literal, text, union_all, update
+from sqlalchemy.dialects.sqlite import insert
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from .model import Store
+from sqlalchemy.orm import selectinload
+from .model import PriceHistory, PriceHistoryDaily, Store
+from .schemas import StoreCreateModel
+from ..company.schemas import CompanyStoreModel
+from .summary import refresh_price_summary
 from ..company.model import Company
+from ..company.geo import companies_geo, distance_km, geo_join, in_bounding_box
+from ..product.model import Product
+from ..company.service import COMPANY_PAGE_KEY
+from ..utils.pagination import PageParams, keyset, make_page
+from ..utils.loaders import LoaderProfiles
+from ..utils.serialization import FastSerializer
+from ..utils.sql import json_set
+from ..cache import cached, invalidate
+from ..versions import bump_versions
+from ..config import Config
+from ..db import async_session
+
+STORE_PAGE_KEY = (Store.uid,)
+company_store_list = FastSerializer(list[CompanyStoreModel])
+# Ordenes del catalogo de una compañia; Store.uid desempata para el cursor
+CATALOG_SORTS = {
+    "price": Store.price,
+    "effective_price": Store.effective_price(),
+    "discount": func.coalesce(Store.discount, 0),
+    "name": Product.name,
+}
+STORE_EXPORT_COLUMNS = (
+    Store.uid, Store.company_uid, Store.product_uid, Store.price, Store.wholesale_price, Store.discount,
+    Store.is_deleted, Store.created_at, Store.update_at,
+)
+
+# Sentencias de la carga masiva, ejecutadas con executemany a nivel Core. Como en
+# edit_store, wholesale_price y discount solo se reemplazan si vienen en la fila.
+stores_table = Store.__table__
+bulk_update_store = (
+    update(stores_table)
+    .where(stores_table.c.uid == bindparam("store_uid", type_=stores_table.c.uid.type))
+    .values(
+        price=bindparam("price"),
+        wholesale_price=func.coalesce(bindparam("wholesale_price"), stores_table.c.wholesale_price),
+        discount=func.coalesce(bindparam("discount"), stores_table.c.discount),
+        is_deleted=False,
+        update_at=bindparam("update_at", type_=stores_table.c.update_at.type),
+    )
+)
+
+STORE_LOADERS = LoaderProfiles(
+    base=lambda: (),
+    list=lambda: (selectinload(Store.createdBy), selectinload(Store.product).selectinload(Product.category)),
+    detail=lambda: (selectinload(Store.createdBy), selectinload(Store.product).selectinload(Product.category)),
+    # Compañia con su catalogo (CompanyStoreModel)
+    catalog=lambda: (
+        selectinload(Company.partner),
+        selectinload(Company.store).selectinload(Store.createdBy),
+        selectinload(Company.store).selectinload(Store.product).selectinload(Product.category),
+    ),
+)
+
+HISTORY_FIELDS = ("product_uid", "company_uid", "price", "wholesale_price", "discount", "changed_at")
+
+def price_key(store) -> tuple:
+    """Valores que, si cambian, generan una entrada en price_history."""
+    return (store.product_uid, store.company_uid, store.price, store.wholesale_price, store.discount)
 
 class StoreService:
-    async def get_all_stores(self, session: AsyncSession):  
-        stmt = select(Company).where(Company.is_deleted == False).order_by(Company.name)
+    async def get_all_stores(self, page: PageParams, session: AsyncSession) -> dict:
+        stmt = keyset(select(Company).options(*STORE_LOADERS["catalog"]).where(Company.is_deleted == False), COMPANY_PAGE_KEY, page)
         result = await session.exec(stmt)
-        return result.all()
+        return make_page(result.all(), COMPANY_PAGE_KEY, page)
     
-    async def get_top_stores(self, session: AsyncSession):  
-        stmt = select(Company).where(Company.is_deleted == False).order_by(Company.name).limit(5)
+    @cached("stores", company_store_list)
+    async def get_top_stores(self, session: AsyncSession) -> bytes:
+        stmt = select(Company).options(*STORE_LOADERS["catalog"]).where(Company.is_deleted == False).order_by(Company.name).limit(5)
         result = await session.exec(stmt)
         return result.all()
     
-    async def get_stores(self, session: AsyncSession):  
-        stmt = select(Store)
+    async def get_stores(self, page: PageParams, session: AsyncSession) -> dict:
+        stmt = keyset(select(Store).options(*STORE_LOADERS["list"]), STORE_PAGE_KEY, page)
         result = await session.exec(stmt)
-        return result.all()
+        return make_page(result.all(), STORE_PAGE_KEY, page)
+
+    async def export_stores(self, updated_since: Optional[datetime] = None) -> AsyncIterator[list]:
+        """Igual que ProductService.export_products, sobre la tabla de precios."""
+        statement = select(*STORE_EXPORT_COLUMNS)
+        if updated_since is not None:
+            statement = statement.where(Store.update_at >= updated_since)
+        async with async_session() as session:
+            result = await session.stream(statement.execution_options(yield_per=Config.EXPORT_BATCH_SIZE))
+            async for rows in result.partitions():
+                yield rows
 
-    async def get_store_by_id(self, id: uuid.UUID, session: AsyncSession) -> Store:
-        statement = select(Store).where(Store.uid == id)
+    async def get_store_by_id(self, id: uuid.UUID, session: AsyncSession, profile: str = "detail") -> Store:
+        statement = select(Store).options(*STORE_LOADERS[profile]).where(Store.uid == id)
         result = await session.exec(statement)
         store = result.first()
         return store
     
-    async def get_store_by_company_id(self, id: uuid.UUID, session: AsyncSession) -> Store:
-        statement = select(Company).where(Company.uid == id).where(Company.is_deleted == False).order_by(Company.name)
-        result = await session.exec(statement)
-        store = result.first()
-        store_ = []
-        for i in store.store:
-            if i.is_deleted == False:
-                store_.append(i)
-        store.store = store_
-        return store
-    async def get_store_by_company_product_uid(self, id: uuid.UUID, product_uid: uuid.UUID,  session: AsyncSession) -> Store:
-        statement = select(Store).where(Store.company_uid == id).where(Store.product_uid == product_uid)
+    async def get_company_catalog(
+        self,
+        id: uuid.UUID,
+        page: PageParams,
+        session: AsyncSession,
+        sort: str = "price",
+        descending: bool = False,
+        category_uid: Optional[uuid.UUID] = None,
+    ) -> Optional[dict]:
+        """Compañia con una pagina de sus ofertas activas, filtradas y ordenadas en SQL."""
+        statement = select(Company).options(selectinload(Company.partner)).where(Company.uid == id).where(Company.is_deleted == False)
+        company = (await session.exec(statement)).first()
+        if company is None:
+            return None
+
+        sort_key = CATALOG_SORTS[sort]
+        columns = (sort_key, Store.uid)
+        statement = (
+            select(Store, sort_key.label("sort_key"))
+            .options(*STORE_LOADERS["list"])
+            .where(Store.company_uid == id)
+            .where(Store.is_deleted == False)
+        )
+        if sort == "name" or category_uid is not None:
+            statement = statement.join(Product, Product.uid == Store.product_uid)
+        if category_uid is not None:
+            statement = statement.where(Product.category_uid == category_uid)
+        result = await session.exec(keyset(statement, columns, page, descending))
+        stores = make_page(result.all(), columns, page, cursor_values=lambda row: (row.sort_key, row.Store.uid))
+        return {
+            "uid": company.uid,
+            "name": company.name,
+            "description": company.description,
+            "partner": company.partner,
+            "store": [row.Store for row in stores["items"]],
+            "next_cursor": stores["next_cursor"],
+        }
+    async def get_store_by_company_product_uid(self, id: uuid.UUID, product_uid: uuid.UUID,  session: AsyncSession, profile: str = "detail") -> Store:
+        statement = select(Store).options(*STORE_LOADERS[profile]).where(Store.company_uid == id).where(Store.product_uid == product_uid)
         result = await session.exec(statement)
         store = result.first()
         return store
@@ -53,24 +158,38 @@ class StoreService:
         newstore = Store(**store_data_dict)
         newstore.uid = uuid.uuid4()
         newstore.user_uid = user_data_id
+        newstore.created_at = newstore.update_at = datetime.now()
         session.add(newstore)
+        session.add(PriceHistory.from_store(newstore, newstore.created_at))
+        await refresh_price_summary({newstore.product_uid}, session)
+        await bump_versions(session, "stores")
         await session.commit()
+        invalidate(("stores", newstore.company_uid))
         return store
     
     async def delete_store(self, store: Store, session: AsyncSession) -> None:
         store.is_deleted = True
+        store.update_at = datetime.now()
         session.add(store)
+        await refresh_price_summary({store.product_uid}, session)
+        await bump_versions(session, "stores")
         await session.commit()
+        invalidate(("stores", store.company_uid))
         await session.refresh(store)
         return store
     async def enable_store(self, store: Store, session: AsyncSession) -> None:
         store.is_deleted = False
+        store.update_at = datetime.now()
         session.add(store)
+        await refresh_price_summary({store.product_uid}, session)
+        await bump_versions(session, "stores")
         await session.commit()
+        invalidate(("stores", store.company_uid))
         await session.refresh(store)
         return store
     
     async def edit_store(self, store: Store, store_data: dict, session: AsyncSession) -> Store:
+        before = price_key(store)
         store.price = store_data.price
         if store_data.wholesale_price is not None:
             store.wholesale_price = store_data.wholesale_price
@@ -78,7 +197,386 @@ class StoreService:
             store.discount = store_data.discount
         store.product_uid = store_data.product_uid
         store.company_uid = store_data.company_uid
+        store.update_at = datetime.now()
         session.add(store)
+        if price_key(store) != before:
+            session.add(PriceHistory.from_store(store, store.update_at))
+        # Si cambio de producto se recalculan el anterior y el nuevo
+        await refresh_price_summary({before[0], store.product_uid}, session)
+        await bump_versions(session, "stores")
         await session.commit()
+        invalidate(("stores", before[1]), ("stores", store.company_uid))
         await session.refresh(store)
-        return store
\ No newline at end of file
+        return store
+
+    async def import_stores(
+        self,
+        records: AsyncIterator[tuple[int, Optional[dict[str, Any]], Optional[str]]],
+        user_uid: uuid.UUID,
+        session: AsyncSession,
+    ) -> dict:
+        """Carga masiva de precios. Valida por lotes de ``BULK_CHUNK_SIZE`` filas y hace
+        upsert por (company_uid, product_uid) con un commit por lote; las filas
+        borradas se rehabilitan. Si un par se repite dentro del lote gana la ultima
+        fila y las anteriores se cuentan en ``superseded``."""
+        report = {"processed": 0, "created": 0, "updated": 0, "restored": 0, "superseded": 0, "failed": 0, "errors": []}
+
+        def reject(row: int, errors: list[str]) -> None:
+            report["failed"] += 1
+            if len(report["errors"]) < Config.BULK_MAX_ERRORS:
+                report["errors"].append({"row": row, "errors": errors})
+
+        chunk: list[tuple[int, StoreCreateModel]] = []
+        companies: set[uuid.UUID] = set()
+        async for row, record, error in records:
+            report["processed"] += 1
+            if error is not None:
+                reject(row, [error])
+                continue
+            try:
+                chunk.append((row, StoreCreateModel.model_validate(record)))
+            except ValidationError as exc:
+                reject(row, [f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()])
+                continue
+            if len(chunk) >= Config.BULK_CHUNK_SIZE:
+                await self._upsert_store_chunk(chunk, user_uid, report, reject, session)
+                companies.update(data.company_uid for _, data in chunk)
+                chunk = []
+        if chunk:
+            await self._upsert_store_chunk(chunk, user_uid, report, reject, session)
+            companies.update(data.company_uid for _, data in chunk)
+        if report["created"] or report["updated"]:
+            invalidate(*(("stores", company_uid) for company_uid in companies))
+        report["errors"].sort(key=lambda error: error["row"])
+        return report
+
+    async def _upsert_store_chunk(self, chunk, user_uid: uuid.UUID, report: dict, reject, session: AsyncSession) -> None:
+        # Si un par se repite dentro del lote gana la ultima fila
+        rows = {(data.company_uid, data.product_uid): (row, data) for row, data in chunk}
+        report["superseded"] += len(chunk) - len(rows)
+        company_uids = {company_uid for company_uid, _ in rows}
+        product_uids = {product_uid for _, product_uid in rows}
+
+        result = await session.exec(
+            select(Company.uid).where(Company.uid.in_(json_set(company_uids))).where(Company.is_deleted == False)
+        )
+        companies = set(result.all())
+        result = await session.exec(select(Product.uid).where(Product.uid.in_(json_set(product_uids))))
+        products = set(result.all())
+        result = await session.exec(
+            select(Store.uid, Store.company_uid, Store.product_uid, Store.is_deleted,
+                   Store.price, Store.wholesale_price, Store.discount)
+            .where(Store.product_uid.in_(json_set(product_uids)))
+            .where(Store.company_uid.in_(json_set(company_uids)))
+        )
+        existing: dict[tuple, list] = {}
+        for uid, company_uid, product_uid, is_deleted, *prices in result.all():
+            existing.setdefault((company_uid, product_uid), []).append((uid, is_deleted, tuple(prices)))
+
+        now = datetime.now()
+        inserts, updates, history = [], [], []
+        refreshed = set()
+        for pair, (row, data) in rows.items():
+            errors = []
+            if data.company_uid not in companies:
+                errors.append("company_uid: La compañia no existe")
+            if data.product_uid not in products:
+                errors.append("product_uid: El producto no existe")
+            if errors:
+                reject(row, errors)
+                continue
+            refreshed.add(data.product_uid)
+            matches = existing.get(pair)
+            if matches:
+                # Un par puede tener varias filas en stores (datos previos a la carga masiva);
+                # se actualizan todas y cada una se compara con sus propios precios
+                changes = {}
+                for uid, is_deleted, old_prices in matches:
+                    updates.append({
+                        "store_uid": uid,
+                        "price": data.price,
+                        "wholesale_price": data.wholesale_price,
+                        "discount": data.discount,
+                        "update_at": now,
+                    })
+                    new_prices = (
+                        data.price,
+                        data.wholesale_price if data.wholesale_price is not None else old_prices[1],
+                        data.discount if data.discount is not None else old_prices[2],
+                    )
+                    if new_prices != old_prices:
+                        changes[new_prices] = True
+                # Filas que quedan con los mismos precios generan una sola entrada
+                for new_prices in changes:
+                    history.append(dict(zip(HISTORY_FIELDS, (data.product_uid, data.company_uid, *new_prices, now))))
+                if any(is_deleted for _, is_deleted, _ in matches):
+                    report["restored"] += 1
+                report["updated"] += 1
+            else:
+                inserts.append({
+                    "uid": uuid.uuid4(),
+                    "price": data.price,
+                    "wholesale_price": data.wholesale_price if data.wholesale_price is not None else 0.0,
+                    "discount": data.discount if data.discount is not None else 0,
+                    "is_deleted": False,
+                    "company_uid": data.company_uid,
+                    "product_uid": data.product_uid,
+                    "user_uid": user_uid,
+                    "created_at": now,
+                    "update_at": now,
+                })
+                history.append({key: inserts[-1][key] for key in HISTORY_FIELDS[:-1]} | {"changed_at": now})
+                report["created"] += 1
+
+        if inserts:
+            await session.exec(insert(stores_table), params=inserts)
+        if updates:
+            await session.exec(bulk_update_store, params=updates)
+        if history:
+            await session.exec(insert(PriceHistory.__table__), params=history)
+        await refresh_price_summary(refreshed, session)
+        if refreshed:
+            await bump_versions(session, "stores")
+        await session.commit()
+
+    async def get_offers(self, product_uids: list[uuid.UUID], top: int, session: AsyncSession) -> list[dict]:
+        """Resume las ofertas activas de cada producto en una sola consulta: precio
+        efectivo minimo, maximo, promedio, mediana y las ``top`` compañias mas baratas."""
+        effective_price = Store.effective_price()
+        ranked = (
+            select(
+                Store.product_uid,
+                Store.company_uid,
+                Store.price,
+                Store.discount,
+                effective_price.label("effective_price"),
+                func.row_number().over(
+                    partition_by=Store.product_uid, order_by=(effective_price, Store.company_uid)
+                ).label("rank"),
+                func.count().over(partition_by=Store.product_uid).label("offers_count"),
+            )
+            # delete_company solo marca la compañia: sus ofertas siguen activas en stores
+            .join(Company, Company.uid == Store.company_uid)
+            .where(Store.product_uid.in_(product_uids))
+            .where(Store.is_deleted == False)
+            .where(Company.is_deleted == False)
+            .cte("ranked")
+        )
+        is_median = ranked.c.rank.between((ranked.c.offers_count + 1) // 2, (ranked.c.offers_count + 2) // 2)
+        stats = (
+            select(
+                ranked.c.product_uid,
+                func.min(ranked.c.effective_price).label("min_price"),
+                func.max(ranked.c.effective_price).label("max_price"),
+                func.avg(ranked.c.effective_price).label("avg_price"),
+                func.avg(case((is_median, ranked.c.effective_price))).label("median_price"),
+            )
+            .group_by(ranked.c.product_uid)
+            .cte("stats")
+        )
+        statement = (
+            select(
+                ranked.c.product_uid,
+                ranked.c.company_uid,
+                Company.name,
+                ranked.c.price,
+                ranked.c.discount,
+                ranked.c.effective_price,
+                ranked.c.offers_count,
+                stats.c.min_price,
+                stats.c.max_price,
+                stats.c.avg_price,
+                stats.c.median_price,
+            )
+            .join(stats, stats.c.product_uid == ranked.c.product_uid)
+            .join(Company, Company.uid == ranked.c.company_uid)
+            .where(ranked.c.rank <= top)
+            .order_by(ranked.c.product_uid, ranked.c.rank)
+        )
+        result = await session.exec(statement)
+
+        summaries = {uid: {"product_uid": uid, "offers": []} for uid in product_uids}
+        for row in result.all():
+            summary = summaries[row.product_uid]
+            if not summary["offers"]:
+                summary.update(
+                    offers_count=row.offers_count,
+                    min_price=row.min_price,
+                    max_price=row.max_price,
+                    avg_price=row.avg_price,
+                    median_price=row.median_price,
+                    spread=row.max_price - row.min_price,
+                )
+            summary["offers"].append({
+                "company_uid": row.company_uid,
+                "company_name": row.name,
+                "price": row.price,
+                "discount": row.discount,
+                "effective_price": row.effective_price,
+            })
+        return list(summaries.values())
+
+    async def get_nearby_offers(
+        self, product_uid: uuid.UUID, lat: float, lon: float, radius_km: float, limit: int, session: AsyncSession
+    ) -> list[dict]:
+        """Ofertas activas del producto en compañias a ``radius_km`` o menos, de la mas
+        barata a la mas cara. El R*Tree descarta lo que queda fuera de la caja que
+        contiene el circulo; haversine_km deja solo lo que esta dentro del radio."""
+        distance = distance_km(lat, lon, Company.latitude, Company.longitude)
+        nearby = (
+            select(Company.uid, Company.name, Company.latitude, Company.longitude, distance.label("distance_km"))
+            .select_from(companies_geo)
+            .join(Company, geo_join)
+            .where(in_bounding_box(lat, lon, radius_km))
+            .where(Company.is_deleted == False)
+            .where(distance <= radius_km)
+            .cte("nearby")
+        )
+        effective_price = Store.effective_price()
+        statement = (
+            select(
+                nearby.c.uid,
+                nearby.c.name,
+                nearby.c.latitude,
+                nearby.c.longitude,
+                nearby.c.distance_km,
+                Store.price,
+                Store.discount,
+                effective_price.label("effective_price"),
+            )
+            .join(Store, Store.company_uid == nearby.c.uid)
+            .where(Store.product_uid == product_uid)
+            .where(Store.is_deleted == False)
+            .order_by(effective_price, nearby.c.distance_km, nearby.c.uid)
+            .limit(limit)
+        )
+        result = await session.exec(statement)
+        return [
+            {
+                "company_uid": row.uid,
+                "company_name": row.name,
+                "price": row.price,
+                "discount": row.discount,
+                "effective_price": row.effective_price,
+                "latitude": row.latitude,
+                "longitude": row.longitude,
+                "distance_km": row.distance_km,
+            }
+            for row in result.all()
+        ]
+
+    async def get_price_history(
+        self,
+        product_uid: uuid.UUID,
+        bucket: str,
+        days: int,
+        company_uid: Optional[uuid.UUID],
+        session: AsyncSession,
+    ) -> list[dict]:
+        """Minimo, promedio y maximo del precio por dia o por semana (desde el lunes).
+
+        Combina los cambios que siguen en price_history con los dias ya compactados
+        en price_history_daily; el promedio se pondera por ``samples``."""
+        since = datetime.now() - timedelta(days=days)
+        raw = (
+            select(
+                func.date(PriceHistory.changed_at).label("day"),
+                PriceHistory.price.label("min_price"),
+                PriceHistory.price.label("max_price"),
+                PriceHistory.price.label("total"),
+                literal(1).label("samples"),
+            )
+            .where(PriceHistory.product_uid == product_uid)
+            .where(PriceHistory.changed_at >= since)
+        )
+        daily = (
+            select(
+                PriceHistoryDaily.day,
+                PriceHistoryDaily.min_price,
+                PriceHistoryDaily.max_price,
+                (PriceHistoryDaily.avg_price * PriceHistoryDaily.samples).label("total"),
+                PriceHistoryDaily.samples,
+            )
+            .where(PriceHistoryDaily.product_uid == product_uid)
+            .where(PriceHistoryDaily.day >= since.date())
+        )
+        if company_uid is not None:
+            raw = raw.where(PriceHistory.company_uid == company_uid)
+            daily = daily.where(PriceHistoryDaily.company_uid == company_uid)
+        rows = union_all(raw, daily).subquery()
+        if bucket == "week":
+            period = func.date(rows.c.day, "-6 days", "weekday 1")
+        else:
+            period = rows.c.day
+        statement = (
+            select(
+                period.label("bucket"),
+                func.min(rows.c.min_price).label("min_price"),
+                (func.sum(rows.c.total) / func.sum(rows.c.samples)).label("avg_price"),
+                func.max(rows.c.max_price).label("max_price"),
+                func.sum(rows.c.samples).label("samples"),
+            )
+            .group_by(period)
+            .order_by(period)
+        )
+        result = await session.exec(statement)
+        return [row._asdict() for row in result.all()]
+
+    async def prune_price_history(self, raw_days: int, retention_days: int, session: AsyncSession) -> dict:
+        """Borra el historial mas viejo que ``retention_days`` y compacta el que pasa de
+        ``raw_days`` en price_history_daily (minimo, promedio, maximo y ultimo precio
+        del dia por producto y compañia) antes de borrar sus registros."""
+        now = datetime.now()
+        oldest = now - timedelta(days=retention_days)
+        expired = await session.exec(delete(PriceHistory).where(PriceHistory.changed_at < oldest))
+        expired_days = await session.exec(delete(PriceHistoryDaily).where(PriceHistoryDaily.day < oldest.date()))
+
+        cutoff = now - timedelta(days=raw_days)
+        day = func.date(PriceHistory.changed_at)
+        old = (
+            select(
+                PriceHistory.product_uid,
+                PriceHistory.company_uid,
+                day.label("day"),
+                PriceHistory.price,
+                func.first_value(PriceHistory.price).over(
+                    partition_by=(PriceHistory.product_uid, PriceHistory.company_uid, day),
+                    order_by=(PriceHistory.changed_at.desc(), PriceHistory.id.desc()),
+                ).label("last_price"),
+            )
+            .where(PriceHistory.changed_at < cutoff)
+            .subquery()
+        )
+        rollup = (
+            select(
+                old.c.product_uid,
+                old.c.company_uid,
+                old.c.day,
+                func.min(old.c.price),
+                func.avg(old.c.price),
+                func.max(old.c.price),
+                func.max(old.c.last_price),
+                func.count(),
+            )
+            .group_by(old.c.product_uid, old.c.company_uid, old.c.day)
+        )
+        daily = PriceHistoryDaily.__table__
+        statement = insert(daily).from_select(
+            ["product_uid", "company_uid", "day", "min_price", "avg_price", "max_price", "last_price", "samples"], rollup
+        )
+        # Un dia que cruza el corte se compacta en dos pasadas; la segunda trae los cambios mas recientes
+        statement = statement.on_conflict_do_update(
+            index_elements=["product_uid", "company_uid", "day"],
+            set_={
+                "min_price": func.min(daily.c.min_price, statement.excluded.min_price),
+                "max_price": func.max(daily.c.max_price, statement.excluded.max_price),
+                "avg_price": (daily.c.avg_price * daily.c.samples + statement.excluded.avg_price * statement.excluded.samples)
+                / (daily.c.samples + statement.excluded.samples),
+                "last_price": statement.excluded.last_price,
+                "samples": daily.c.samples + statement.excluded.samples,
+            },
+        )
+        await session.exec(statement)
+        downsampled = await session.exec(delete(PriceHistory).where(PriceHistory.changed_at < cutoff))
+        await session.commit()
+        return {"expired": expired.rowcount + expired_days.rowcount, "downsampled": downsampled.rowcount}
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, exists, func, insert, literal, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .model import ProductPriceSummary, Store
+from ..company.model import Company
+from ..db import on_create_schema
+from ..utils.sql import json_set
+
+summary_table = ProductPriceSummary.__table__
+SUMMARY_COLUMNS = ("product_uid", "offers_count", "min_price", "max_price", "avg_price", "best_company_uid", "updated_at")
+
+
+def summary_statements(product_uids: Optional[Iterable] = None) -> tuple:
+    """Borra y recalcula el resumen de los productos dados (o de todos si es None)
+    a partir de sus ofertas activas, con el mismo precio efectivo que get_offers."""
+    effective_price = Store.effective_price()
+    by_product = {"partition_by": Store.product_uid}
+    ranked = (
+        select(
+            Store.product_uid,
+            func.count().over(**by_product).label("offers_count"),
+            func.min(effective_price).over(**by_product).label("min_price"),
+            func.max(effective_price).over(**by_product).label("max_price"),
+            func.avg(effective_price).over(**by_product).label("avg_price"),
+            Store.company_uid,
+            func.row_number().over(order_by=(effective_price, Store.company_uid), **by_product).label("rank"),
+        )
+        .join(Company, Company.uid == Store.company_uid)
+        .where(Store.is_deleted == False)
+        .where(Company.is_deleted == False)
+    )
+    clear = delete(summary_table)
+    if product_uids is not None:
+        product_uids = set(product_uids)
+        ranked = ranked.where(Store.product_uid.in_(json_set(product_uids)))
+        clear = clear.where(summary_table.c.product_uid.in_(json_set(product_uids)))
+    ranked = ranked.subquery("ranked")
+    fill = insert(summary_table).from_select(
+        SUMMARY_COLUMNS,
+        select(
+            ranked.c.product_uid,
+            ranked.c.offers_count,
+            ranked.c.min_price,
+            ranked.c.max_price,
+            ranked.c.avg_price,
+            ranked.c.company_uid,
+            literal(datetime.now(), summary_table.c.updated_at.type),
+        ).where(ranked.c.rank == 1),
+    )
+    return clear, fill
+
+
+async def refresh_price_summary(product_uids: Optional[Iterable], session: AsyncSession) -> None:
+    """Recalcula el resumen dentro de la transaccion de la sesion; el llamador hace commit.
+
+    Con ``product_uids=None`` reconstruye la tabla completa.
+    """
+    if product_uids is not None and not product_uids:
+        return
+    # Las sentencias Core no hacen autoflush de los cambios pendientes del ORM
+    await session.flush()
+    for statement in summary_statements(product_uids):
+        await session.exec(statement)
+
+
+@on_create_schema
+def backfill_price_summary(connection) -> None:
+    # Tabla recien creada sobre una base con ofertas: se llena una sola vez
+    has_summary = connection.execute(select(exists().select_from(summary_table))).scalar()
+    has_offers = connection.execute(select(exists().where(Store.is_deleted == False))).scalar()
+    if has_offers and not has_summary:
+        for statement in summary_statements():
+            connection.execute(statement)
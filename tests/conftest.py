@@ -0,0 +1,139 @@
+"""Fixtures compartidas: la aplicacion contra una base SQLite temporal con un
+catalogo pequeño y un cliente HTTP que corre el lifespan (migraciones incluidas).
+
+El paquete se importa por el nombre de su directorio, como en benchmarks/common.py.
+"""
+import importlib
+import os
+import sqlite3
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+import bcrypt
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+DATABASE = Path(tempfile.mkdtemp(prefix="miprecio-tests-")) / "test.db"
+PASSWORD = "clave-segura"
+BCRYPT_ROUNDS = 4
+
+for line in (ROOT / "env-example").read_text().splitlines():
+    if "=" in line:
+        key, value = line.split("=", 1)
+        os.environ.setdefault(key.strip(), value.strip())
+os.environ.update(
+    ASYNC_DATABASE_URL=f"sqlite+aiosqlite:///{DATABASE}",
+    DB_MIGRATE_ON_STARTUP="True",
+    BCRYPT_ROUNDS=str(BCRYPT_ROUNDS),
+    ACCESS_LOG_ENABLED="False",
+    OUTBOX_ENABLED="False",
+    RATE_LIMIT_ENABLED="False",
+    QUERY_AUDIT_ENABLED="True",
+    QUERY_BUDGET_MODE="log",
+)
+sys.path.insert(0, str(ROOT.parent))
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    return importlib.import_module(ROOT.name)
+
+
+def _seed(database: Path) -> dict:
+    hexid = lambda: uuid.uuid4().hex
+    password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+    data = {
+        "admin": hexid(), "user": hexid(),
+        "categories": [hexid() for _ in range(2)],
+        "companies": [hexid() for _ in range(3)],
+        "products": [hexid() for _ in range(4)],
+    }
+    conn = sqlite3.connect(database)
+    conn.executemany(
+        "INSERT INTO users (uid, email, fullname, role, is_verified, password) VALUES (?, ?, ?, ?, 1, ?)",
+        [(data["admin"], "admin@test.local", "Admin", "admin", password),
+         (data["user"], "user@test.local", "Usuario", "user", password)],
+    )
+    conn.executemany(
+        "INSERT INTO categories (uid, name, description) VALUES (?, ?, 'Categoria de prueba')",
+        [(uid, f"Categoria {i}") for i, uid in enumerate(data["categories"])],
+    )
+    conn.executemany(
+        "INSERT INTO companies (uid, name, description, is_deleted, latitude, longitude, user_uid, partner_uid)"
+        " VALUES (?, ?, 'Compañia de prueba', 0, ?, ?, ?, ?)",
+        [(uid, f"Compañia {i}", 10.5 + i * 0.01, -66.9, data["admin"], data["admin"])
+         for i, uid in enumerate(data["companies"])],
+    )
+    conn.executemany(
+        "INSERT INTO products (uid, name, price, description, user_uid, category_uid) VALUES (?, ?, 0, 'Producto de prueba', ?, ?)",
+        [(uid, f"Producto {i}", data["admin"], data["categories"][i % 2]) for i, uid in enumerate(data["products"])],
+    )
+    conn.executemany(
+        "INSERT INTO stores (uid, price, wholesale_price, discount, user_uid, product_uid, company_uid, is_deleted)"
+        " VALUES (?, ?, 0, 0, ?, ?, ?, 0)",
+        [(hexid(), 10.0 + i + j, data["admin"], product, company)
+         for i, product in enumerate(data["products"]) for j, company in enumerate(data["companies"])],
+    )
+    conn.commit()
+    conn.close()
+    return {key: [str(uuid.UUID(v)) for v in value] if isinstance(value, list) else str(uuid.UUID(value))
+            for key, value in data.items()}
+
+
+@pytest.fixture(scope="session")
+def database() -> Path:
+    return DATABASE
+
+
+@pytest.fixture(scope="session")
+def client(app_module):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_module.app, base_url="http://localhost") as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def seeded(client, app_module):
+    """Datos de prueba; el cliente ya aplico las migraciones al arrancar."""
+    data = _seed(DATABASE)
+    # Los resumenes derivados se calculan al crear el esquema; se reconstruyen con los datos
+    async def rebuild():
+        async with app_module.db.async_session() as session:
+            await app_module.store.summary.refresh_price_summary(None, session)
+            await session.commit()
+
+    # En el event loop del cliente, que es el dueño del pool de conexiones
+    client.portal.call(rebuild)
+    return data
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(app_module):
+    app_module.cache.catalog_cache.clear()
+    app_module.cache.principal_cache.clear()
+    yield
+
+
+@pytest.fixture
+def count_queries(client, app_module):
+    """Hace una peticion y devuelve ``(response, sentencias SQL ejecutadas)``."""
+    auditor = app_module.query_audit.query_auditor
+
+    def request(method: str, path: str, **kwargs):
+        auditor.clear()
+        response = client.request(method, path, **kwargs)
+        counts = [stats["total_queries"] for stats in auditor.routes.values()]
+        assert len(counts) == 1, auditor.routes
+        return response, counts[0]
+
+    return request
+
+
+@pytest.fixture
+def auth_headers(client, seeded):
+    response = client.post("/api/v1/auth/login", json={"email": "user@test.local", "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
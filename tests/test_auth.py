@@ -0,0 +1,34 @@
+import importlib
+import sqlite3
+
+
+def test_logout_is_shared_through_the_database(client, seeded, database, app_module):
+    revocation = app_module.auth.revocation
+    assert revocation.revocation_backend() == "database"
+    login = client.post("/api/v1/auth/login", json={"email": "user@test.local", "password": "clave-segura"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    assert client.get("/api/v1/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+    # Otro proceso, con su propio almacen, ve el mismo logout
+    conn = sqlite3.connect(database)
+    (jti,) = conn.execute("SELECT token FROM blacklist ORDER BY created_at DESC LIMIT 1").fetchone()
+    conn.close()
+    other = revocation.DatabaseRevocationStore()
+    assert client.portal.call(other.is_revoked, jti) is True
+    assert client.portal.call(other.is_revoked, "otro-jti") is False
+
+
+def test_expiring_dict_sweeps_expired_entries(app_module):
+    expiring = importlib.import_module(app_module.__name__ + ".utils.expiring")
+    now = [0.0]
+    store = expiring.ExpiringDict(lambda: now[0], interval=10)
+    store.set("vencida", 1, 5)
+    store.set("vigente", 2, 50)
+    assert store.get("vencida", 4) == 1
+    now[0] = 10
+    store.set("otra", 3, 60)
+    assert len(store) == 2
+    assert store.get("vigente") == 2
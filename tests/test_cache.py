@@ -0,0 +1,63 @@
+import sqlite3
+import uuid
+
+
+def test_invalidate_only_removes_tagged_keys(app_module):
+    cache = app_module.cache.TTLCache(maxsize=10, ttl=60)
+    a, b = uuid.uuid4(), uuid.uuid4()
+    cache.set(("stores", "top", (), ()), b"a", tags=[("stores", a)])
+    cache.set(("stores", "top", (1,), ()), b"b", tags=[("stores", b)])
+    cache.set(("companies", "page", (), ()), b"c", tags=[("companies", a)])
+
+    cache.invalidate(("stores", a))
+    assert cache.get(("stores", "top", (), ()))[0] is False
+    assert cache.get(("stores", "top", (1,), ()))[1] == b"b"
+    assert cache.get(("companies", "page", (), ()))[1] == b"c"
+
+    cache.invalidate("stores")
+    assert cache.get(("stores", "top", (1,), ()))[0] is False
+    assert cache.get(("companies", "page", (), ()))[1] == b"c"
+
+
+def test_cache_holds_serialized_responses(client, seeded, app_module):
+    for path in ("/api/v1/category/", "/api/v1/company/", "/api/v1/store/top"):
+        assert client.get(path).status_code == 200
+    values = [value for _, value in app_module.cache.catalog_cache._data.values()]
+    assert len(values) == 3
+    assert all(isinstance(value, bytes) for value in values)
+
+
+def test_store_edit_keeps_unrelated_entries(client, seeded, count_queries, auth_headers):
+    company, product = seeded["companies"][1], seeded["products"][1]
+    for path in ("/api/v1/category/", "/api/v1/company/", "/api/v1/store/top"):
+        assert client.get(path).status_code == 200
+
+    body = {"product_uid": product, "company_uid": company, "price": 77.0, "wholesale_price": 0, "discount": 0}
+    assert client.patch(f"/api/v1/store/{company}", json=body, headers=auth_headers).status_code == 200
+
+    assert count_queries("GET", "/api/v1/category/")[1] == 1
+    assert count_queries("GET", "/api/v1/company/")[1] == 1
+    response, queries = count_queries("GET", "/api/v1/store/top")
+    assert queries > 1
+    offers = next(item for item in response.json() if item["uid"] == company)["store"]
+    assert 77.0 in [offer["price"] for offer in offers if offer["product"]["uid"] == product]
+
+
+def test_versions_bumped_elsewhere_skip_cached_body(client, seeded, database):
+    first = client.get("/api/v1/category/")
+    category = first.json()["items"][0]
+
+    # Otro proceso edita la categoria: sube las versiones sin pasar por invalidate()
+    conn = sqlite3.connect(database)
+    conn.execute("UPDATE categories SET description = 'Editada en otro proceso' WHERE uid = ?", (uuid.UUID(category["uid"]).hex,))
+    conn.execute(
+        "INSERT INTO resource_versions (name, version, updated_at) VALUES ('categories', 1, '2026-01-01 00:00:00')"
+        " ON CONFLICT(name) DO UPDATE SET version = version + 1"
+    )
+    conn.commit()
+    conn.close()
+
+    second = client.get("/api/v1/category/")
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.json()["items"][0]["description"] == "Editada en otro proceso"
+    assert client.get("/api/v1/category/", headers={"If-None-Match": second.headers["ETag"]}).status_code == 304
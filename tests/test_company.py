@@ -0,0 +1,36 @@
+def nearby(client, product):
+    response = client.get(f"/api/v1/product/{product}/nearby", params={"lat": 10.5, "lon": -66.9, "radius": 10})
+    assert response.status_code == 200
+    return {offer["company_uid"] for offer in response.json()}
+
+
+def test_edit_without_location_keeps_coordinates(client, seeded, auth_headers):
+    company, product = seeded["companies"][0], seeded["products"][0]
+    assert company in nearby(client, product)
+
+    response = client.patch(
+        f"/api/v1/company/{company}", json={"name": "Compañia 0", "description": "Otra descripcion"}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert company in nearby(client, product)
+    detail = client.get(f"/api/v1/company/{company}").json()
+    assert (detail["latitude"], detail["longitude"]) == (10.5, -66.9)
+
+
+def test_edit_location_requires_both_coordinates(client, seeded, auth_headers):
+    company = seeded["companies"][1]
+    response = client.patch(
+        f"/api/v1/company/{company}", json={"name": "Compañia 1", "description": "x", "latitude": 1.0}, headers=auth_headers
+    )
+    assert response.status_code == 422
+
+
+def test_edit_with_null_location_clears_it(client, seeded, auth_headers):
+    company, product = seeded["companies"][2], seeded["products"][0]
+    body = {"name": "Compañia 2", "description": "x", "latitude": None, "longitude": None}
+    assert client.patch(f"/api/v1/company/{company}", json=body, headers=auth_headers).status_code == 200
+    assert company not in nearby(client, product)
+
+    body.update(latitude=10.52, longitude=-66.9)
+    assert client.patch(f"/api/v1/company/{company}", json=body, headers=auth_headers).status_code == 200
+    assert company in nearby(client, product)
@@ -0,0 +1,70 @@
+import sqlite3
+import uuid
+
+
+def admin_headers(client):
+    login = client.post("/api/v1/auth/login", json={"email": "admin@test.local", "password": "clave-segura"}).json()
+    return {"Authorization": f"Bearer {login['access_token']}"}
+
+
+def add_history(conn, product, company):
+    conn.execute(
+        "INSERT INTO price_history (product_uid, company_uid, price, changed_at) VALUES (?, ?, 1.0, '2026-01-01 00:00:00')",
+        (product, company),
+    )
+    conn.execute(
+        "INSERT INTO price_history_daily (product_uid, company_uid, day, min_price, avg_price, max_price, last_price, samples)"
+        " VALUES (?, ?, '2026-01-01', 1, 1, 1, 1, 1)",
+        (product, company),
+    )
+
+
+def history_count(conn, product=None, company=None):
+    return sum(
+        conn.execute(f"SELECT count(*) FROM {table} WHERE product_uid = ? OR company_uid = ?", (product, company)).fetchone()[0]
+        for table in ("price_history", "price_history_daily")
+    )
+
+
+def test_deleting_category_or_user_removes_history(client, seeded, database):
+    admin = uuid.UUID(seeded["admin"]).hex
+    kept_product, kept_company = uuid.UUID(seeded["products"][0]).hex, uuid.UUID(seeded["companies"][0]).hex
+    category, category_product = uuid.uuid4().hex, uuid.uuid4().hex
+    user, user_product, user_company = uuid.uuid4().hex, uuid.uuid4().hex, uuid.uuid4().hex
+
+    conn = sqlite3.connect(database)
+    conn.execute("INSERT INTO categories (uid, name, description) VALUES (?, 'Borrable', '')", (category,))
+    conn.execute(
+        "INSERT INTO users (uid, email, fullname, role, is_verified, password) VALUES (?, 'socio@test.local', 'Socio', 'socio', 1, 'x')",
+        (user,),
+    )
+    conn.execute(
+        "INSERT INTO products (uid, name, price, description, user_uid, category_uid) VALUES (?, 'De categoria', 0, '', ?, ?)",
+        (category_product, admin, category),
+    )
+    conn.execute(
+        "INSERT INTO products (uid, name, price, description, user_uid, category_uid) VALUES (?, 'De socio', 0, '', ?, ?)",
+        (user_product, user, uuid.UUID(seeded["categories"][0]).hex),
+    )
+    conn.execute(
+        "INSERT INTO companies (uid, name, description, is_deleted, user_uid, partner_uid) VALUES (?, 'Del socio', '', 0, ?, ?)",
+        (user_company, admin, user),
+    )
+    add_history(conn, category_product, kept_company)
+    add_history(conn, user_product, kept_company)
+    add_history(conn, kept_product, user_company)
+    add_history(conn, kept_product, kept_company)
+    conn.commit()
+
+    headers = admin_headers(client)
+    assert client.delete(f"/api/v1/category/{uuid.UUID(category)}", headers=headers).status_code == 200
+    assert history_count(conn, product=category_product) == 0
+    assert client.delete(f"/api/v1/user/{uuid.UUID(user)}", headers=headers).status_code == 200
+    assert history_count(conn, product=user_product) == 0
+    assert history_count(conn, company=user_company) == 0
+
+    kept = conn.execute(
+        "SELECT count(*) FROM price_history_daily WHERE product_uid = ? AND company_uid = ?", (kept_product, kept_company)
+    ).fetchone()[0]
+    conn.close()
+    assert kept == 1
@@ -0,0 +1,30 @@
+import importlib
+import sqlite3
+
+
+def test_rebuild_search_index(client, seeded, database, app_module):
+    manage = importlib.import_module(f"{app_module.__name__}.manage")
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM products_fts")
+    conn.commit()
+    assert client.get("/api/v1/product/search", params={"q": "Producto"}).json() == []
+
+    client.portal.call(manage.rebuild_search, None)
+    names = {product["name"] for product in client.get("/api/v1/product/search", params={"q": "Producto"}).json()}
+    assert {f"Producto {i}" for i in range(4)} <= names
+    conn.close()
+
+
+def test_rebuild_location_index(client, seeded, database, app_module):
+    manage = importlib.import_module(f"{app_module.__name__}.manage")
+    product = seeded["products"][1]
+    nearby = f"/api/v1/product/{product}/nearby?lat=10.5&lon=-66.9&radius=10"
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM companies_geo")
+    conn.commit()
+    assert client.get(nearby).json() == []
+
+    client.portal.call(manage.rebuild_location, None)
+    companies = {offer["company_uid"] for offer in client.get(nearby).json()}
+    assert set(seeded["companies"]) <= companies
+    conn.close()
@@ -0,0 +1,37 @@
+import re
+
+from sqlalchemy import create_engine
+
+
+def describe(connection) -> dict:
+    """Tablas con sus columnas e indices, y triggers con su SQL normalizado."""
+    schema = {}
+    rows = connection.exec_driver_sql("SELECT type, name, tbl_name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'").all()
+    for kind, name, table, sql in rows:
+        if kind == "table":
+            columns = connection.exec_driver_sql(f"PRAGMA table_info('{name}')").all()
+            schema[name] = sorted((column[1], column[2], column[3], column[5]) for column in columns)
+        elif kind == "index" and sql is not None:
+            columns = [row[2] for row in connection.exec_driver_sql(f"PRAGMA index_info('{name}')")]
+            unique = "UNIQUE" in sql.upper().split("INDEX")[0]
+            schema[name] = (table, columns, unique)
+        elif kind == "trigger":
+            schema[name] = re.sub(r"\s+", " ", sql.replace("IF NOT EXISTS ", "")).strip()
+    return schema
+
+
+def test_migrations_match_models(app_module, tmp_path):
+    migrations = app_module.migrations
+    fresh = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    with fresh.begin() as connection:
+        assert migrations.migrate(connection) == sorted(migrations.MIGRATIONS)
+        assert migrations.schema_version(connection) == migrations.latest_version()
+        expected = describe(connection)
+
+    # Una base de la version 0 con datos recorre todas las migraciones literales
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    with migrated.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE legacy (id INTEGER)")
+        migrations.migrate(connection)
+        connection.exec_driver_sql("DROP TABLE legacy")
+        assert describe(connection) == expected
@@ -0,0 +1,51 @@
+import sqlite3
+import uuid
+
+
+def test_deleted_company_is_not_ranked(client, seeded, database, auth_headers):
+    product = seeded["products"][3]
+    company = uuid.uuid4()
+    conn = sqlite3.connect(database)
+    conn.execute(
+        "INSERT INTO companies (uid, name, description, is_deleted, user_uid, partner_uid) VALUES (?, 'Cerrada', '', 0, ?, ?)",
+        (company.hex, uuid.UUID(seeded["admin"]).hex, uuid.UUID(seeded["admin"]).hex),
+    )
+    conn.execute(
+        "INSERT INTO stores (uid, price, wholesale_price, discount, user_uid, product_uid, company_uid, is_deleted)"
+        " VALUES (?, 1.0, 0, 0, ?, ?, ?, 0)",
+        (uuid.uuid4().hex, uuid.UUID(seeded["admin"]).hex, uuid.UUID(product).hex, company.hex),
+    )
+    conn.commit()
+    conn.close()
+
+    offers = client.get(f"/api/v1/product/{product}/offers").json()
+    assert offers["offers"][0]["company_uid"] == str(company)
+
+    assert client.delete(f"/api/v1/company/{company}", headers=auth_headers).status_code == 200
+    offers = client.get(f"/api/v1/product/{product}/offers").json()
+    assert str(company) not in {offer["company_uid"] for offer in offers["offers"]}
+    assert offers["offers_count"] == len(seeded["companies"])
+    batch = client.post("/api/v1/product/offers", json={"uids": [product], "top": 20}).json()
+    assert str(company) not in {offer["company_uid"] for offer in batch[0]["offers"]}
+
+
+def test_deleted_company_leaves_price_summary(client, seeded, database, auth_headers):
+    product = seeded["products"][2]
+    company = uuid.uuid4()
+    admin = uuid.UUID(seeded["admin"]).hex
+    conn = sqlite3.connect(database)
+    conn.execute(
+        "INSERT INTO companies (uid, name, description, is_deleted, user_uid, partner_uid) VALUES (?, 'Cerrada 2', '', 0, ?, ?)",
+        (company.hex, admin, admin),
+    )
+    conn.commit()
+    conn.close()
+    body = {"product_uid": product, "company_uid": str(company), "price": 0.5, "wholesale_price": 0, "discount": 0}
+    assert client.post("/api/v1/store/", json=body, headers=auth_headers).status_code == 201
+    summary = client.get(f"/api/v1/product/{product}").json()["price_summary"]
+    assert summary["best_company_uid"] == str(company)
+
+    assert client.delete(f"/api/v1/company/{company}", headers=auth_headers).status_code == 200
+    summary = client.get(f"/api/v1/product/{product}").json()["price_summary"]
+    assert summary["best_company_uid"] != str(company)
+    assert summary["offers_count"] == len(seeded["companies"])
@@ -0,0 +1,42 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+
+class FlakySender:
+    """Falla con un error que no es de SMTP en el correo con asunto "malo"."""
+
+    connected = False
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        if message["Subject"] == "malo":
+            raise ValueError("destinatario mal formado")
+        self.sent.append(message["Subject"])
+
+    async def close(self):
+        pass
+
+
+def test_non_smtp_error_does_not_abort_batch(client, database, app_module):
+    conn = sqlite3.connect(database)
+    conn.execute("DELETE FROM email_outbox")
+    now = (datetime.now() - timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S.%f")
+    conn.executemany(
+        "INSERT INTO email_outbox (recipients, subject, body, subtype, status, attempts, next_attempt_at, created_at)"
+        " VALUES (?, ?, '', 'plain', 'pending', 0, ?, ?)",
+        [(json.dumps(["a@test.local"]), subject, now, now) for subject in ("uno", "malo", "tres")],
+    )
+    conn.commit()
+
+    worker = app_module.outbox.OutboxWorker(sender=FlakySender())
+    assert client.portal.call(worker.deliver_batch) == 3
+    assert worker.sender.sent == ["uno", "tres"]
+    rows = conn.execute("SELECT subject, status, last_error FROM email_outbox ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [("uno", "sent", None), ("malo", "failed", "destinatario mal formado"), ("tres", "sent", None)]
+
+    # Nada queda pendiente de reenviar al vencer el plazo del lote
+    assert client.portal.call(worker.deliver_batch) == 0
@@ -0,0 +1,37 @@
+import base64
+import json
+
+import pytest
+
+
+def cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("path, value", [
+    ("/api/v1/product/", "WzEsMl0"),             # [1, 2]: uid no es texto
+    ("/api/v1/store/stores", "WzFd"),            # [1]
+    ("/api/v1/product/", cursor(["a"])),         # largo incorrecto
+    ("/api/v1/product/", cursor({"a": 1})),      # no es una lista
+    ("/api/v1/product/", cursor(["a", "no-uuid"])),
+    ("/api/v1/company/", cursor([["x"], "0" * 32])),
+    ("/api/v1/product/", "%%%"),
+])
+def test_malformed_cursor_is_400(client, seeded, path, value):
+    response = client.get(path, params={"cursor": value})
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "invalid_cursor"
+
+
+def test_catalog_cursor_checks_sort_type(client, seeded):
+    company = seeded["companies"][0]
+    response = client.get(f"/api/v1/store/company/{company}", params={"cursor": cursor(["barato", "0" * 32])})
+    assert response.status_code == 400
+
+
+def test_cursor_round_trip(client, seeded):
+    first = client.get("/api/v1/product/", params={"limit": 2}).json()
+    assert first["next_cursor"]
+    second = client.get("/api/v1/product/", params={"limit": 2, "cursor": first["next_cursor"]}).json()
+    names = [item["name"] for item in first["items"] + second["items"]]
+    assert names == sorted(names) and len(set(names)) == 4
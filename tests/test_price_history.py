@@ -0,0 +1,54 @@
+import sqlite3
+import uuid
+from datetime import datetime, timedelta
+
+
+def add_history(database, product, company, changes):
+    conn = sqlite3.connect(database)
+    conn.executemany(
+        "INSERT INTO price_history (product_uid, company_uid, price, changed_at) VALUES (?, ?, ?, ?)",
+        [(uuid.UUID(product).hex, company.hex, price, at.strftime("%Y-%m-%d %H:%M:%S.%f")) for at, price in changes],
+    )
+    conn.commit()
+    conn.close()
+
+
+def prune(client, app_module):
+    async def run():
+        async with app_module.db.async_session() as session:
+            return await app_module.store.service.StoreService().prune_price_history(90, 730, session)
+
+    return client.portal.call(run)
+
+
+def test_prune_keeps_daily_aggregates(client, seeded, database, app_module):
+    product, company = seeded["products"][0], uuid.uuid4()
+    day = (datetime.now() - timedelta(days=100)).replace(hour=8, minute=0, second=0, microsecond=0)
+    add_history(database, product, company, [
+        (day, 5.0), (day + timedelta(hours=2), 9.0), (day + timedelta(hours=4), 7.0),
+        (day + timedelta(days=1), 4.0),
+    ])
+    path = f"/api/v1/product/{product}/history?days=200&company_uid={company}"
+    before = client.get(path).json()
+    assert before[0] == {"bucket": day.date().isoformat(), "min_price": 5.0, "avg_price": 7.0, "max_price": 9.0, "samples": 3}
+
+    prune(client, app_module)
+    assert client.get(path).json() == before
+
+    conn = sqlite3.connect(database)
+    assert conn.execute("SELECT count(*) FROM price_history WHERE company_uid = ?", (company.hex,)).fetchone() == (0,)
+    last = conn.execute(
+        "SELECT last_price, samples FROM price_history_daily WHERE company_uid = ? ORDER BY day", (company.hex,)
+    ).fetchall()
+    conn.close()
+    assert last == [(7.0, 3), (4.0, 1)]
+
+    # Cambios del mismo dia compactados en otra pasada se suman al agregado
+    add_history(database, product, company, [(day + timedelta(hours=6), 1.0)])
+    prune(client, app_module)
+    bucket = client.get(path).json()[0]
+    assert bucket == {"bucket": day.date().isoformat(), "min_price": 1.0, "avg_price": 5.5, "max_price": 9.0, "samples": 4}
+
+    week = client.get(path + "&bucket=week").json()
+    assert sum(row["samples"] for row in week) == 5
+    assert min(row["min_price"] for row in week) == 1.0
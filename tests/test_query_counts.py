@@ -0,0 +1,32 @@
+import pytest
+
+
+LOGIN = {"email": "user@test.local", "password": "clave-segura"}
+
+
+# (metodo, ruta, sentencias con cache vacia, sentencias con cache caliente)
+ROUTES = [
+    # La revocacion por defecto consulta la tabla blacklist en cada peticion autenticada
+    ("GET", "/api/v1/auth/me", 3, 2),
+    ("POST", "/api/v1/auth/login", 1, 1),
+    ("GET", "/api/v1/store/", 6, 6),
+    ("GET", "/api/v1/company/", 4, 1),
+    ("GET", "/api/v1/category/", 3, 1),
+    ("GET", "/api/v1/product/{product}", 4, 4),
+]
+
+
+@pytest.mark.parametrize("method,path,cold,warm", ROUTES)
+def test_route_query_count(count_queries, auth_headers, seeded, method, path, cold, warm):
+    kwargs = {"headers": auth_headers}
+    if path.endswith("/login"):
+        kwargs = {"json": LOGIN}
+    path = path.format(product=seeded["products"][0])
+
+    response, queries = count_queries(method, path, **kwargs)
+    assert response.status_code == 200, response.text
+    assert queries == cold
+
+    response, queries = count_queries(method, path, **kwargs)
+    assert response.status_code == 200, response.text
+    assert queries == warm
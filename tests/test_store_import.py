@@ -0,0 +1,59 @@
+import json
+import sqlite3
+import uuid
+
+
+def test_import_compares_every_duplicate_row(client, seeded, database, auth_headers):
+    admin = uuid.UUID(seeded["admin"]).hex
+    product = seeded["products"][0]
+    companies = [uuid.uuid4(), uuid.uuid4()]
+    conn = sqlite3.connect(database)
+    for name, company, prices in (("Duplicada A", companies[0], (5.0, 8.0)), ("Duplicada B", companies[1], (8.0, 5.0))):
+        conn.execute(
+            "INSERT INTO companies (uid, name, description, is_deleted, user_uid, partner_uid) VALUES (?, ?, '', 0, ?, ?)",
+            (company.hex, name, admin, admin),
+        )
+        # Dos filas para el mismo par; la que ya tiene el precio nuevo queda primera o ultima
+        for price in prices:
+            conn.execute(
+                "INSERT INTO stores (uid, price, wholesale_price, discount, user_uid, product_uid, company_uid, is_deleted)"
+                " VALUES (?, ?, 0, 0, ?, ?, ?, 0)",
+                (uuid.uuid4().hex, price, admin, uuid.UUID(product).hex, company.hex),
+            )
+    conn.commit()
+
+    body = "\n".join(
+        json.dumps({"company_uid": str(company), "product_uid": product, "price": 8.0, "wholesale_price": None, "discount": None})
+        for company in companies
+    )
+    headers = auth_headers | {"Content-Type": "application/x-ndjson"}
+    report = client.post("/api/v1/store/bulk", content=body, headers=headers).json()
+    assert report["updated"] == 2 and report["failed"] == 0
+
+    for company in companies:
+        prices = conn.execute("SELECT price FROM stores WHERE company_uid = ?", (company.hex,)).fetchall()
+        assert prices == [(8.0,), (8.0,)]
+        history = conn.execute("SELECT price FROM price_history WHERE company_uid = ?", (company.hex,)).fetchall()
+        assert history == [(8.0,)]
+    conn.close()
+
+
+def test_import_counts_superseded_duplicates(client, seeded, database, auth_headers):
+    company, product = seeded["companies"][2], seeded["products"][2]
+    lines = [
+        {"company_uid": company, "product_uid": product, "price": price, "wholesale_price": None, "discount": None}
+        for price in (30.0, 31.0, 32.0)
+    ]
+    headers = auth_headers | {"Content-Type": "application/x-ndjson"}
+    report = client.post("/api/v1/store/bulk", content="\n".join(map(json.dumps, lines)), headers=headers).json()
+    assert report["processed"] == 3
+    assert report["superseded"] == 2
+    assert report["created"] + report["updated"] + report["superseded"] + report["failed"] == report["processed"]
+
+    conn = sqlite3.connect(database)
+    prices = conn.execute(
+        "SELECT price FROM stores WHERE company_uid = ? AND product_uid = ?",
+        (uuid.UUID(company).hex, uuid.UUID(product).hex),
+    ).fetchall()
+    conn.close()
+    assert prices == [(32.0,)]
@@ -24,24 +24,24 @@ class User(SQLModel, table=True):
     products: list["Product"] = Relationship(
         back_populates="createdBy",
         #sa_relationship={RelationshipProperty("Product", primaryjoin="Product.createdBy == User.uid", uselist=True)},
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise"},
         cascade_delete=True
     )
     stores: list["Store"] = Relationship(
         back_populates="createdBy",
         #sa_relationship={RelationshipProperty("Product", primaryjoin="Product.createdBy == User.uid", uselist=True)},
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise"},
         cascade_delete=True
     )
     user_registered_companies: list["Company"] = Relationship(
         back_populates="user",
-        sa_relationship_kwargs={"lazy": "selectin", "foreign_keys": "[Company.user_uid]"},
+        sa_relationship_kwargs={"lazy": "raise", "foreign_keys": "[Company.user_uid]"},
         cascade_delete=True
     )
     companies: list["Company"] = Relationship(
         back_populates="partner",
         #sa_relationship={RelationshipProperty("Product", primaryjoin="Product.createdBy == User.uid", uselist=True)},
-        sa_relationship_kwargs={"lazy": "selectin", "foreign_keys": "[Company.partner_uid]"},
+        sa_relationship_kwargs={"lazy": "raise", "foreign_keys": "[Company.partner_uid]"},
         cascade_delete=True
     )
 
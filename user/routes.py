@@ -10,7 +10,7 @@ from ..config import Config
 
 from ..auth.utils import create_url_safe_token
 
-from ..auth.dependencies import RoleChecker, get_current_user
+from ..auth.dependencies import RoleChecker, get_current_principal
 
 from ..utils.uuid_validator import is_valid_uuid
 
@@ -48,7 +48,7 @@ async def get_user(id:str, session: AsyncSession = Depends(get_session)):
 async def update_password(
     user_data: UserPasswordEditModel, 
     _: bool = Depends(role_checker),
-    current_user = Depends(get_current_user),
+    current_user = Depends(get_current_principal),
     session: AsyncSession = Depends(get_session)):
     id = current_user.uid
     if user_data.newpassword != user_data.confirm_newpassword:
@@ -60,7 +60,7 @@ async def update_password(
     user = await user_service.get_user_by_id(id=id, session=session)
     if user is None:
         raise UserNotFound()
-    if user.uid is not current_user.uid and current_user.role is not Role.admin.value:
+    if user.uid != current_user.uid and current_user.role != Role.admin.value:
         raise InsufficientPermission()
     edited_user_password = await user_service.edit_user_password(user=user, formpassword=user_data.newpassword, session=session)
     return {"message": "Contraseña editada"}
@@ -68,7 +68,7 @@ async def update_password(
 @user_router.patch("/profile", status_code=status.HTTP_200_OK)
 async def update_user(
     user_data: UserEditModel, 
-    current_user = Depends(get_current_user),
+    current_user = Depends(get_current_principal),
     role: bool = Depends(role_checker),
     session: AsyncSession = Depends(get_session)):
     id = current_user.uid
@@ -76,7 +76,7 @@ async def update_user(
     if user is None:
         raise UserNotFound()
     
-    if user.uid is not current_user.uid and current_user.role is not Role.admin.value:
+    if user.uid != current_user.uid and current_user.role != Role.admin.value:
         raise InsufficientPermission()
 
     edited_user = await user_service.edit_user(user=user, user_data=user_data, session=session)
@@ -86,7 +86,7 @@ async def update_user(
 async def update_user(
     id:str, 
     user_data: UserEditModel, 
-    current_user = Depends(get_current_user),
+    current_user = Depends(get_current_principal),
     role: bool = Depends(role_checker),
     session: AsyncSession = Depends(get_session)):
 
@@ -96,7 +96,7 @@ async def update_user(
     if user is None:
         raise UserNotFound()
     
-    if user.uid is not current_user.uid and current_user.role is not Role.admin.value:
+    if user.uid != current_user.uid and current_user.role != Role.admin.value:
         raise InsufficientPermission()
 
     edited_user = await user_service.edit_user(user=user, user_data=user_data, session=session)
@@ -1,23 +1,36 @@
 import uuid
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import load_only
 from .schemas import Role, UserCreateModel
 
 from .model import User
-from ..auth.utils import generate_passwd_hash
+from ..company.model import Company
+from ..product.model import Product
+from ..auth.utils import generate_passwd_hash_async
+from ..utils.loaders import LoaderProfiles
+from ..store.history import delete_price_history
+from ..store.summary import refresh_price_summary
+from ..cache import invalidate, invalidate_principal
+from ..versions import bump_versions
+
+# El perfil "principal" solo trae las columnas que necesita get_current_principal.
+USER_LOADERS = LoaderProfiles(
+    base=lambda: (),
+    principal=lambda: (load_only(User.uid, User.email, User.role, User.is_verified),),
+)
 
 class UserService:
     async def get_all_users(self, offset:int, limit:int, session: AsyncSession) -> list[User]:
-        stmt = select(User).options(selectinload(User.products)).where(User.role is not Role.admin.value).offset(offset).limit(limit)
+        stmt = select(User).where(User.role is not Role.admin.value).offset(offset).limit(limit)
         result = await session.exec(stmt)
         return result.all()
     async def get_top_users(self, session: AsyncSession) -> list[User]:
         stmt = select(User).where(User.role != Role.admin.value).limit(5).order_by(User.update_at.desc())
         result = await session.exec(stmt)
         return result.all()
-    async def get_user_by_email(self, email: str, session: AsyncSession):
-        statement = select(User).where(User.email == email)
+    async def get_user_by_email(self, email: str, session: AsyncSession, profile: str = "base"):
+        statement = select(User).options(*USER_LOADERS[profile]).where(User.email == email)
         result = await session.exec(statement)
         user = result.first()
         return user
@@ -41,8 +54,9 @@ class UserService:
         new_user.uid = uuid.uuid4()
         if is_partner: new_user.role = Role.partner.value
         else: new_user.role = Role.user.value
-        new_user.password = generate_passwd_hash(user_data_dict["password"])
+        new_user.password = await generate_passwd_hash_async(user_data_dict["password"])
         session.add(new_user)
+        await bump_versions(session, "users")
         await session.commit()
         return new_user
     
@@ -51,8 +65,9 @@ class UserService:
         new_user = User(**user_data_dict)
         new_user.uid = uuid.uuid4()
         new_user.role = Role.partner.value
-        new_user.password = generate_passwd_hash(user_data_dict["password"])
+        new_user.password = await generate_passwd_hash_async(user_data_dict["password"])
         session.add(new_user)
+        await bump_versions(session, "users")
         await session.commit()
         return new_user
 
@@ -60,8 +75,10 @@ class UserService:
     async def update_user(self, user:User , user_data: dict,session:AsyncSession):
         for k, v in user_data.items():
             setattr(user, k, v)
-
+        await bump_versions(session, "users")
         await session.commit()
+        invalidate_principal(user.uid)
+        invalidate(("companies", user.uid), ("stores", user.uid))
         return user
 
     async def edit_user(self, user:User , user_data: dict, session: AsyncSession) -> User:
@@ -69,19 +86,32 @@ class UserService:
         user.price = user_data.price
         user.description =user_data.description
         session.add(user)
+        await bump_versions(session, "users")
         await session.commit()
+        invalidate_principal(user.uid)
+        invalidate(("companies", user.uid), ("stores", user.uid))
         return user
     
     async def edit_user_password(self, user:User , formpassword: str, session: AsyncSession) -> User:
-        newpassword = generate_passwd_hash(formpassword)
+        newpassword = await generate_passwd_hash_async(formpassword)
         user.password = newpassword
         session.add(user)
         await session.commit()
+        invalidate_principal(user.uid)
         return user
 
     async def delete_user(self, id: uuid.UUID, session: AsyncSession):
         statement = select(User).where(User.uid == id)
         result = await session.exec(statement)
         user = result.first()
+        # Productos y compañias que se borran en cascada con el usuario
+        products = await session.exec(select(Product.uid).where(Product.user_uid == id))
+        companies = await session.exec(select(Company.uid).where((Company.user_uid == id) | (Company.partner_uid == id)))
+        await delete_price_history(session, product_uids=products.all(), company_uids=companies.all())
         await session.delete(user)
-        await session.commit()
\ No newline at end of file
+        # El borrado en cascada alcanza productos y ofertas de cualquier producto
+        await refresh_price_summary(None, session)
+        await bump_versions(session, "users", "products", "categories", "companies", "stores")
+        await session.commit()
+        invalidate_principal(id)
+        invalidate("categories", "companies", "stores")
\ No newline at end of file
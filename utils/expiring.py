@@ -0,0 +1,42 @@
+import time
+from typing import Any, Callable, Hashable, Optional
+
+PRUNE_INTERVAL = 60
+
+
+class ExpiringDict:
+    """Diccionario en memoria cuyas entradas vencen en un instante del reloj dado.
+
+    Una entrada vencida se trata como inexistente al leerla; el resto se barre al
+    escribir, como mucho una vez cada ``interval`` segundos, para que las llaves
+    que no se vuelven a consultar no se acumulen.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, interval: float = PRUNE_INTERVAL) -> None:
+        self.clock = clock
+        self.interval = interval
+        self._data: dict[Hashable, tuple[Any, float]] = {}
+        self._next_prune = clock() + interval
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= (self.clock() if now is None else now):
+            del self._data[key]
+            return None
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: float, now: Optional[float] = None) -> None:
+        self._data[key] = (value, expires_at)
+        self._prune(self.clock() if now is None else now)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _prune(self, now: float) -> None:
+        if now < self._next_prune:
+            return
+        self._next_prune = now + self.interval
+        for key in [key for key, (_, expires_at) in self._data.items() if expires_at <= now]:
+            del self._data[key]
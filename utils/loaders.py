@@ -0,0 +1,20 @@
+from typing import Callable
+
+
+class LoaderProfiles:
+    """Opciones de carga de relaciones por perfil ("base", "list", "detail", ...).
+
+    Las relaciones de los modelos son lazy="raise", asi que cada consulta declara
+    lo que su respuesta necesita. Las opciones se construyen en el primer uso,
+    cuando todos los modelos ya estan mapeados.
+    """
+
+    def __init__(self, **profiles: Callable[[], tuple]) -> None:
+        self._factories = profiles
+        self._options: dict[str, tuple] = {}
+
+    def __getitem__(self, profile: str) -> tuple:
+        options = self._options.get(profile)
+        if options is None:
+            options = self._options[profile] = tuple(self._factories[profile]())
+        return options
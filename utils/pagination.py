@@ -0,0 +1,118 @@
+import base64
+import datetime
+import json
+import uuid
+from typing import Any, Callable, Generic, Optional, Sequence, TypeVar
+
+from fastapi import Query
+from pydantic import BaseModel
+from sqlalchemy import tuple_
+
+from ..errors import InvalidCursor
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(default=None, max_length=512),
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PageParams) and (self.limit, self.cursor) == (other.limit, other.cursor)
+
+    def __hash__(self) -> int:
+        return hash((self.limit, self.cursor))
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return value.hex
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _load(column, value: Any) -> Any:
+    """Convierte un valor del cursor al tipo de la columna. El cursor viene del
+    cliente: cualquier valor que no sea del tipo JSON esperado es un ValueError."""
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if python_type in (uuid.UUID, datetime.datetime, str):
+        if not isinstance(value, str):
+            raise ValueError(value)
+        if python_type is uuid.UUID:
+            return uuid.UUID(value)
+        if python_type is datetime.datetime:
+            return datetime.datetime.fromisoformat(value)
+        return value
+    if python_type in (int, float):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(value)
+        return value
+    if not isinstance(value, (str, int, float)):
+        raise ValueError(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_dump(v) for v in values], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_load(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise InvalidCursor()
+
+
+def keyset(statement, columns: Sequence, page: PageParams, descending: bool = False):
+    """Ordena por ``columns`` y continua despues del cursor, pidiendo una fila extra
+    para saber si existe una pagina siguiente. Todas las columnas van en la misma
+    direccion para que la comparacion por tupla siga el orden."""
+    order = [column.desc() for column in columns] if descending else columns
+    statement = statement.order_by(*order).limit(page.limit + 1)
+    if page.cursor:
+        values = decode_cursor(page.cursor, columns)
+        if descending:
+            statement = statement.where(tuple_(*columns) < tuple_(*values))
+        else:
+            statement = statement.where(tuple_(*columns) > tuple_(*values))
+    return statement
+
+
+def make_page(
+    rows: Sequence[Any], columns: Sequence, page: PageParams, cursor_values: Optional[Callable[[Any], Sequence]] = None
+) -> dict:
+    """``cursor_values`` extrae los valores del cursor cuando las columnas no son
+    atributos de la fila (por ejemplo, expresiones ordenadas con ``label``)."""
+    items = list(rows[: page.limit])
+    next_cursor = None
+    if len(rows) > page.limit:
+        last = items[-1]
+        if cursor_values is None:
+            next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+        else:
+            next_cursor = encode_cursor(cursor_values(last))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,113 @@
+import codecs
+import csv
+import io
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+
+CSV_TYPES = {"text/csv", "application/csv"}
+NDJSON_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+
+
+def record_format(content_type: Optional[str]) -> Optional[str]:
+    """Devuelve "csv" o "ndjson" segun el Content-Type, o None si no es soportado."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CSV_TYPES:
+        return "csv"
+    if media_type in NDJSON_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Parte un flujo de bytes UTF-8 en lineas sin cargarlo completo en memoria."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(
+    stream: AsyncIterator[bytes], format: str
+) -> AsyncIterator[tuple[int, Optional[dict[str, Any]], Optional[str]]]:
+    """Produce ``(linea, registro, error)`` por cada fila no vacia del flujo.
+
+    En CSV la primera linea es la cabecera y las celdas vacias se leen como None.
+    """
+    header = None
+    number = 0
+    async for line in iter_lines(stream):
+        number += 1
+        if not line.strip():
+            continue
+        if format == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield number, None, "JSON invalido"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "Se esperaba un objeto JSON"
+                continue
+            yield number, record, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) != len(header):
+            yield number, None, f"Se esperaban {len(header)} columnas y hay {len(values)}"
+            continue
+        yield number, {key: (value if value != "" else None) for key, value in zip(header, values)}, None
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def ndjson_chunks(batches: AsyncIterator[Sequence[Sequence]], columns: Sequence[str]) -> AsyncIterator[str]:
+    """Serializa lotes de filas como NDJSON, un bloque de texto por lote."""
+    async for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(columns, map(_plain, row))), ensure_ascii=False) + "\n" for row in rows
+        )
+
+
+async def csv_chunks(batches: AsyncIterator[Sequence[Sequence]], columns: Sequence[str]) -> AsyncIterator[str]:
+    """Serializa lotes de filas como CSV con cabecera, un bloque de texto por lote."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for rows in batches:
+        writer.writerows([_plain(value) for value in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def export_response(batches: AsyncIterator[Sequence[Sequence]], columns: Sequence[str], format: str, filename: str) -> StreamingResponse:
+    if format == "csv":
+        body, media_type = csv_chunks(batches, columns), "text/csv"
+    else:
+        body, media_type = ndjson_chunks(batches, columns), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
@@ -0,0 +1,41 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from ..config import Config
+
+
+class JSONBytesResponse(Response):
+    """Respuesta con un cuerpo JSON ya serializado."""
+
+    media_type = "application/json"
+
+
+class FastSerializer:
+    """Serializa el resultado de una ruta con un TypeAdapter armado una sola vez.
+
+    FastAPI valida el objeto ORM contra ``response_model``, lo vuelca a dicts con
+    jsonable_encoder y luego lo codifica con ``json``. Aqui se valida una vez desde
+    los atributos y pydantic escribe los bytes JSON directamente. La ruta conserva
+    ``response_model`` para la documentacion; al devolver un Response FastAPI no lo
+    vuelve a validar.
+    """
+
+    def __init__(self, type_: Any) -> None:
+        self.adapter = TypeAdapter(type_)
+
+    def encode(self, content: Any) -> tuple[bytes, Any]:
+        """JSON de ``content`` y su volcado a tipos de Python, para caches que guardan
+        la respuesta serializada en lugar de los objetos ORM."""
+        model = self.adapter.validate_python(content, from_attributes=True)
+        return self.adapter.dump_json(model, by_alias=True), self.adapter.dump_python(model)
+
+    def __call__(self, content: Any, response: Optional[Response] = None) -> Any:
+        """``response`` es el Response inyectado en la ruta; sus headers (p. ej. el
+        ETag de las dependencias) se copian porque FastAPI no los agrega a un
+        Response devuelto por la ruta."""
+        if not Config.FAST_JSON_RESPONSES:
+            return content
+        body = self.adapter.dump_json(self.adapter.validate_python(content, from_attributes=True), by_alias=True)
+        return JSONBytesResponse(body, headers=response.headers if response is not None else None)
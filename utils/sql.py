@@ -0,0 +1,16 @@
+import json
+import uuid
+from typing import Iterable
+
+from sqlalchemy import column, func, select
+
+
+def json_set(values: Iterable):
+    """Subconsulta ``SELECT value FROM json_each(?)`` para usar con ``in_``.
+
+    Envia todo el conjunto como un solo parametro JSON en lugar de un ``IN`` con
+    un parametro por valor, que es lo que domina el costo en lotes grandes. Los
+    uuid se envian en hex, igual que los guarda SQLModel.
+    """
+    payload = json.dumps([value.hex if isinstance(value, uuid.UUID) else value for value in values])
+    return select(column("value")).select_from(func.json_each(payload))
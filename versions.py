@@ -0,0 +1,86 @@
+"""Contadores de version por tabla para ETag y peticiones condicionales.
+
+Cada metodo de servicio que escribe llama a ``bump_versions`` antes de su commit,
+en la misma transaccion. Las rutas de lectura declaran de que tablas depende su
+respuesta con ``Depends(conditional(...))``: si el ``If-None-Match`` del cliente
+coincide se responde 304 sin ejecutar la consulta de la ruta.
+
+Las versiones leidas quedan en ``request_versions`` y forman parte de la llave de
+``cache.cached``: otro proceso que escribe sube los contadores y la cache local
+deja de servir un cuerpo que no corresponde al ETag.
+"""
+import hashlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Optional
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Field, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .db import get_session
+from .errors import NotModified
+
+
+class ResourceVersion(SQLModel, table=True):
+    __tablename__ = "resource_versions"
+    name: str = Field(primary_key=True)
+    version: int = Field(nullable=False, default=0)
+    updated_at: datetime = Field(nullable=False)
+
+
+versions_table = ResourceVersion.__table__
+
+# Versiones que leyo ``conditional`` en la peticion actual, como tupla ordenada
+request_versions: ContextVar[Optional[tuple]] = ContextVar("request_versions", default=None)
+
+
+async def bump_versions(session: AsyncSession, *names: str) -> None:
+    """Incrementa el contador de cada tabla; el llamador hace commit."""
+    now = datetime.now()
+    statement = insert(versions_table).values([{"name": name, "version": 1, "updated_at": now} for name in names])
+    statement = statement.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": versions_table.c.version + 1, "updated_at": statement.excluded.updated_at},
+    )
+    await session.exec(statement)
+
+
+def make_etag(versions: dict[str, int]) -> str:
+    digest = hashlib.blake2b(
+        "|".join(f"{name}:{version}" for name, version in sorted(versions.items())).encode(), digest_size=8
+    )
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match usa comparacion debil: se ignora el prefijo W/
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def conditional(*names: str):
+    """Dependencia que agrega ETag y Last-Modified segun las versiones de ``names``
+    y corta la peticion con 304 si el cliente ya tiene esa version."""
+
+    async def dependency(request: Request, response: Response, session: AsyncSession = Depends(get_session)) -> None:
+        result = await session.exec(
+            select(ResourceVersion.name, ResourceVersion.version, ResourceVersion.updated_at)
+            .where(ResourceVersion.name.in_(names))
+        )
+        rows = result.all()
+        versions = dict.fromkeys(names, 0) | {name: version for name, version, _ in rows}
+        headers = {"ETag": make_etag(versions)}
+        if rows:
+            last_modified = max(updated_at for _, _, updated_at in rows).astimezone(timezone.utc)
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            raise NotModified(headers)
+        response.headers.update(headers)
+        request_versions.set(tuple(sorted(versions.items())))
+
+    return dependency